@@ -1,35 +1,28 @@
 import sys
 
-from utilities import calculate_solution_value, select_best_penalized_item_to_add
+from utilities import calculate_solution_value, penalty_aware_greedy_fill, get_forfeit_neighbors
 
 def penalty_aware_greedy_constructor(num_items, capacity, profits, weights, forfeit_costs_matrix,
-                                     items_to_ignore=None):
+                                     items_to_ignore=None, forfeit_neighbors=None):
     """
     Constrói uma solução completa a partir do zero, de forma gulosa e consciente de penalidades.
     Retorna uma lista de índices de itens.
     items_to_ignore: um set de itens que não devem ser considerados.
+    forfeit_neighbors: listas de vizinhos (get_forfeit_neighbors), se já calculadas.
     """
     solution_indices = []
-    solution_set = set()
-    current_weight = 0
     
     if items_to_ignore is None:
         items_to_ignore = set()
 
     available_items = set(range(num_items)) - items_to_ignore
 
-    while True:
-        best_item_to_add = select_best_penalized_item_to_add(
-            available_items, solution_indices, current_weight, capacity,
-            profits, weights, forfeit_costs_matrix
-        )
-        if best_item_to_add is not None:
-            solution_indices.append(best_item_to_add)
-            solution_set.add(best_item_to_add)
-            current_weight += weights[best_item_to_add]
-            available_items.remove(best_item_to_add)
-        else:
-            break
+    # Max-heap com reavaliação apenas dos vizinhos do item adicionado
+    penalty_aware_greedy_fill(
+        solution_indices, available_items, 0, capacity,
+        profits, weights, forfeit_costs_matrix,
+        forfeit_neighbors=forfeit_neighbors
+    )
     return solution_indices
 
 def penalty_aware_greedy_construction(instance_data):
@@ -44,7 +37,8 @@ def penalty_aware_greedy_construction(instance_data):
     forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
 
     solution_indices = penalty_aware_greedy_constructor(
-        num_items, capacity, profits, weights, forfeit_costs_matrix
+        num_items, capacity, profits, weights, forfeit_costs_matrix,
+        forfeit_neighbors=get_forfeit_neighbors(instance_data)
     )
     
     final_profit, final_forfeit_cost, objective_value = calculate_solution_value(
@@ -1,17 +1,117 @@
 import collections
+import heapq
 
-from utilities import calculate_solution_value
-from build_carrosel import select_best_penalized_item_to_add
+from search_budget import SearchBudget
+from utilities import (_penalized_ratio, calculate_solution_value, get_forfeit_neighbors, penalty_aware_greedy_fill,
+                       select_best_penalized_item_to_add)
 
-def carousel_local_search(initial_solution_indices, instance_data, alpha, beta):
+class _CarouselIndex:
+    """
+    Índice dos itens disponíveis para o carrossel: penalidade de cada item com
+    o conjunto elite (atualizada só para os vizinhos do item que entra ou sai)
+    e max-heap por (métrica penalizada, menor índice) com invalidação
+    preguiçosa. Escolhe o mesmo item que select_best_penalized_item_to_add.
+    """
+
+    def __init__(self, elite_items, num_items, profits, weights, forfeit_neighbors):
+        self.profits = profits
+        self.weights = weights
+        self.forfeit_neighbors = forfeit_neighbors
+        self.penalty_with_elite = [0] * num_items
+        for item_idx in elite_items:
+            for neighbor_idx, cost in forfeit_neighbors[item_idx]:
+                self.penalty_with_elite[neighbor_idx] += cost
+
+        # Métrica atual dos itens disponíveis (None para os que estão no elite)
+        self.metrics = [None] * num_items
+        elite_set = set(elite_items)
+        for item_idx in range(num_items):
+            if item_idx not in elite_set:
+                self.metrics[item_idx] = self._metric(item_idx)
+        self._rebuild_heap()
+
+    def _metric(self, item_idx):
+        return _penalized_ratio(self.profits[item_idx] - self.penalty_with_elite[item_idx], self.weights[item_idx])
+
+    def _rebuild_heap(self):
+        self.heap = [(-metric, item_idx) for item_idx, metric in enumerate(self.metrics) if metric is not None]
+        heapq.heapify(self.heap)
+
+    def _refresh(self, item_idx):
+        metric = self._metric(item_idx)
+        self.metrics[item_idx] = metric
+        heapq.heappush(self.heap, (-metric, item_idx))
+
+    def _update_neighbors(self, item_idx, sign):
+        penalty_with_elite = self.penalty_with_elite
+        metrics = self.metrics
+        for neighbor_idx, cost in self.forfeit_neighbors[item_idx]:
+            penalty_with_elite[neighbor_idx] += sign * cost
+            if metrics[neighbor_idx] is not None:
+                self._refresh(neighbor_idx)
+
+    def leave_elite(self, item_idx):
+        """O item sai do elite e volta a ficar disponível."""
+        self._update_neighbors(item_idx, -1)
+        self._refresh(item_idx)
+
+    def enter_elite(self, item_idx):
+        """O item entra no elite e deixa de ficar disponível."""
+        self.metrics[item_idx] = None
+        self._update_neighbors(item_idx, 1)
+
+    def best_item(self, free_capacity):
+        """
+        Item disponível de maior métrica (menor índice no empate) que cabe em
+        'free_capacity', ou None se não houver um com métrica não negativa.
+        Itens que não cabem agora voltam ao heap: podem caber nos próximos giros.
+        """
+        heap = self.heap
+        metrics = self.metrics
+        weights = self.weights
+        skipped = []
+        best = None
+        while heap:
+            negative_metric, item_idx = heap[0]
+            if metrics[item_idx] != -negative_metric:
+                heapq.heappop(heap)  # Entrada desatualizada ou item no elite
+                continue
+            if -negative_metric < 0:
+                break
+            if weights[item_idx] <= free_capacity:
+                best = item_idx
+                break
+            skipped.append(heapq.heappop(heap))
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+
+        # Entradas desatualizadas que ficaram no meio do heap: reconstrói de tempos em tempos
+        if len(heap) > 4 * len(metrics) + 64:
+            self._rebuild_heap()
+        return best
+
+def carousel_local_search(initial_solution_indices, instance_data, alpha, beta, on_improvement=None):
     """
     Aplica a busca local do tipo Carrossel sobre uma solução inicial fornecida.
+
+    Versão incremental: a penalidade de cada item com o conjunto elite é
+    atualizada só para os vizinhos do item que sai da cabeça ou entra na
+    cauda do deque, e o melhor item para entrar vem de um max-heap
+    (_CarouselIndex). Cada giro custa O(grau * log n) (mais os itens que não
+    cabem e são devolvidos ao heap), em vez de O(n * s). A solução é a mesma
+    da versão original (carousel_local_search_reference).
     
     Args:
         initial_solution_indices (list): A solução inicial a ser melhorada.
         instance_data (dict): Dicionário contendo os dados do problema.
         alpha (float): Parâmetro que define o número de iterações do carrossel.
         beta (float): Parâmetro que define o tamanho do conjunto elite.
+        on_improvement (callable, opcional): Recebe cada melhoria da
+            incumbente (ver SearchBudget): o conjunto elite S' é viável a cada
+            giro (as avaliações) e é reportado quando supera o melhor valor
+            visto; a solução final, após o preenchimento guloso, também. A
+            solução devolvida continua sendo a final, que pode ficar abaixo
+            de um S' intermediário.
 
     Returns:
         dict: A solução final encontrada, no mesmo formato de dicionário.
@@ -22,6 +122,114 @@ def carousel_local_search(initial_solution_indices, instance_data, alpha, beta):
     weights = instance_data['weights']
     capacity = instance_data['capacity']
     forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
+    forfeit_neighbors = get_forfeit_neighbors(instance_data)
+    budget = SearchBudget(on_improvement=on_improvement)
+
+    # Se a solução inicial for vazia, não há o que fazer.
+    if not initial_solution_indices:
+        final_profit, final_forfeit, objective = calculate_solution_value(
+            [], profits, forfeit_costs_matrix
+        )
+        return {
+            'selected_items_indices': [], 'total_weight': 0,
+            'total_profit': final_profit, 'total_forfeit_cost': final_forfeit,
+            'objective_value': objective,
+            'params': {'alpha': alpha, 'beta': beta, 'type': 'carousel_on_empty_initial'}
+        }
+
+    # 2. Formação do Conjunto Elite (S_prime)
+    t = len(initial_solution_indices)
+    elite_size = int(round(beta * t))
+    if elite_size == 0 and t > 0:
+        elite_size = 1
+
+    S_prime_deque = collections.deque(initial_solution_indices[:elite_size])
+    current_prime_weight = sum(weights[i] for i in S_prime_deque)
+    carousel_index = _CarouselIndex(S_prime_deque, num_items, profits, weights, forfeit_neighbors)
+    penalty_with_elite = carousel_index.penalty_with_elite
+
+    # Objetivo de S' (cada par penalizado é contado duas vezes na soma das penalidades)
+    prime_objective = (sum(profits[i] for i in S_prime_deque)
+                       - sum(penalty_with_elite[i] for i in S_prime_deque) // 2)
+    budget.report(prime_objective, S_prime_deque, iteration=0)
+
+    num_iterations = int(round(alpha * t)) 
+
+    for iteration in range(1, num_iterations + 1):
+        if not S_prime_deque:
+            break
+        budget.count_evaluation()
+        
+        item_removed = S_prime_deque.popleft()
+        current_prime_weight -= weights[item_removed]
+        carousel_index.leave_elite(item_removed)
+        prime_objective -= profits[item_removed] - penalty_with_elite[item_removed]
+
+        item_to_add_to_prime = carousel_index.best_item(capacity - current_prime_weight)
+
+        if item_to_add_to_prime is not None:
+            S_prime_deque.append(item_to_add_to_prime)
+            current_prime_weight += weights[item_to_add_to_prime]
+            prime_objective += profits[item_to_add_to_prime] - penalty_with_elite[item_to_add_to_prime]
+            carousel_index.enter_elite(item_to_add_to_prime)
+        budget.report(prime_objective, S_prime_deque, iteration=iteration)
+    
+    final_solution_list = list(S_prime_deque)
+    elite_set = set(S_prime_deque)
+    available_for_fill_set = {item_idx for item_idx in range(num_items) if item_idx not in elite_set}
+
+    final_weight = penalty_aware_greedy_fill(
+        final_solution_list, available_for_fill_set,
+        current_prime_weight, capacity,
+        profits, weights, forfeit_costs_matrix,
+        forfeit_neighbors=forfeit_neighbors
+    )
+            
+    final_solution_indices = sorted(final_solution_list)
+
+    final_profit, final_forfeit_cost, objective_value = calculate_solution_value(
+        final_solution_indices, profits, forfeit_costs_matrix
+    )
+    budget.report(objective_value, final_solution_indices, iteration=num_iterations)
+
+    return {
+        'selected_items_indices': final_solution_indices,
+        'total_weight': final_weight,
+        'total_profit': final_profit,
+        'total_forfeit_cost': final_forfeit_cost,
+        'objective_value': objective_value,
+        'params': {'alpha': alpha, 'beta': beta, 'type': 'penalty_aware_carousel'}
+    }
+
+def carousel_local_search_reference(initial_solution_indices, instance_data, alpha, beta, on_improvement=None):
+    """
+    Aplica a busca local do tipo Carrossel sobre uma solução inicial fornecida.
+
+    Versão original, que reavalia todos os itens disponíveis a cada giro
+    (O(n * s) por giro); mantida como referência de carousel_local_search.
+    
+    Args:
+        initial_solution_indices (list): A solução inicial a ser melhorada.
+        instance_data (dict): Dicionário contendo os dados do problema.
+        alpha (float): Parâmetro que define o número de iterações do carrossel.
+        beta (float): Parâmetro que define o tamanho do conjunto elite.
+        on_improvement (callable, opcional): Recebe cada melhoria da
+            incumbente (ver SearchBudget): o conjunto elite S' é viável a cada
+            giro (as avaliações) e é reportado quando supera o melhor valor
+            visto; a solução final, após o preenchimento guloso, também. A
+            solução devolvida continua sendo a final, que pode ficar abaixo
+            de um S' intermediário.
+
+    Returns:
+        dict: A solução final encontrada, no mesmo formato de dicionário.
+    """
+    # 1. Desempacotar dados da instância
+    num_items = instance_data['num_items']
+    profits = instance_data['profits']
+    weights = instance_data['weights']
+    capacity = instance_data['capacity']
+    forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
+    budget = SearchBudget(on_improvement=on_improvement)
 
     # Se a solução inicial for vazia, não há o que fazer.
     if not initial_solution_indices:
@@ -45,12 +253,15 @@ def carousel_local_search(initial_solution_indices, instance_data, alpha, beta):
     current_prime_weight = sum(weights[i] for i in S_prime_deque)
     
     items_available_for_carousel = set(range(num_items)) - set(S_prime_deque)
+    budget.report(calculate_solution_value(list(S_prime_deque), profits, forfeit_costs_matrix)[2],
+                  S_prime_deque, iteration=0)
 
     num_iterations = int(round(alpha * t)) 
 
-    for _ in range(num_iterations):
+    for iteration in range(1, num_iterations + 1):
         if not S_prime_deque:
             break
+        budget.count_evaluation()
         
         item_removed = S_prime_deque.popleft()
         current_prime_weight -= weights[item_removed]
@@ -66,29 +277,25 @@ def carousel_local_search(initial_solution_indices, instance_data, alpha, beta):
             S_prime_deque.append(item_to_add_to_prime)
             current_prime_weight += weights[item_to_add_to_prime]
             items_available_for_carousel.remove(item_to_add_to_prime)
+        budget.report(calculate_solution_value(list(S_prime_deque), profits, forfeit_costs_matrix)[2],
+                      S_prime_deque, iteration=iteration)
     
     final_solution_list = list(S_prime_deque)
-    final_weight = current_prime_weight
     available_for_fill_set = items_available_for_carousel.copy()
 
-    while True:
-        best_item_for_fill = select_best_penalized_item_to_add(
-            available_for_fill_set, final_solution_list,
-            final_weight, capacity,
-            profits, weights, forfeit_costs_matrix
-        )
-        if best_item_for_fill is not None:
-            final_solution_list.append(best_item_for_fill)
-            final_weight += weights[best_item_for_fill]
-            available_for_fill_set.remove(best_item_for_fill)
-        else:
-            break
+    final_weight = penalty_aware_greedy_fill(
+        final_solution_list, available_for_fill_set,
+        current_prime_weight, capacity,
+        profits, weights, forfeit_costs_matrix,
+        forfeit_neighbors=get_forfeit_neighbors(instance_data)
+    )
             
     final_solution_indices = sorted(final_solution_list)
 
     final_profit, final_forfeit_cost, objective_value = calculate_solution_value(
         final_solution_indices, profits, forfeit_costs_matrix
     )
+    budget.report(objective_value, final_solution_indices, iteration=num_iterations)
 
     return {
         'selected_items_indices': final_solution_indices,
@@ -4,7 +4,7 @@ import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utilities import read_kpf_instance, load_instances_from_directory
+from instance_catalog import InstanceCatalog
 from build_carrosel import penalty_aware_greedy_construction
 from local_carrossel import carousel_local_search
 from METAHEURISTICAS.ils import iterated_local_search_simple
@@ -14,7 +14,8 @@ from METAHEURISTICAS.ils_vnd import iterated_local_search_vnd
 
 # Mude aqui para testar outras instâncias
 target_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.New Instances', 'O', '500'))
-all_instances_in_O_500 = load_instances_from_directory(target_directory)
+# Catálogo preguiçoso: só a instância usada abaixo é lida por completo
+all_instances_in_O_500 = InstanceCatalog(target_directory)
 
 if all_instances_in_O_500:
 
@@ -22,8 +23,8 @@ if all_instances_in_O_500:
     instance_to_solve_carousel = all_instances_in_O_500[9]
 
     print(f"\n\n--- Preparando para resolver com Carrossel Guloso ---")
-    print(f"Re-lendo arquivo: {instance_to_solve_carousel['filepath']}")
-    fresh_instance_data_for_carousel = read_kpf_instance(instance_to_solve_carousel['filepath'])
+    print(f"Arquivo: {instance_to_solve_carousel['filepath']}")
+    fresh_instance_data_for_carousel = instance_to_solve_carousel
 
     start = time.time()
     print("\n" + "="*50)
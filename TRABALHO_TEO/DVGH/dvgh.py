@@ -1,13 +1,116 @@
+import heapq
 import sys
 # Dynamic Value Greedy Heuristic
 
-from utilities import calculate_solution_value
+from utilities import calculate_solution_value, _calculate_item_penalty_with_solution, get_forfeit_neighbors
+
+def _dvgh_metric(net_gain, item_weight_val):
+    """Métrica da DVGH: ganho líquido por unidade de peso (itens de peso zero nos extremos)."""
+    if item_weight_val > 0:
+        return net_gain / item_weight_val
+    if net_gain > 0:
+        return sys.float_info.max # Muito desejável
+    if net_gain == 0:
+        return 0.0 # Neutro
+    return -sys.float_info.max # Muito indesejável
 
 def dynamic_value_greedy_heuristic_kpf(instance_data):
     """
     Implementa a Heurística Gulosa com Avaliação Dinâmica de Penalidades (DVGH)
     para o Problema da Mochila com Penalidades (KPF).
 
+    Versão incremental: a penalidade adicional de cada candidato é mantida em
+    um acumulador, atualizado só para os vizinhos de penalidade do item
+    adicionado, e o melhor candidato sai de um max-heap com invalidação
+    preguiçosa (entradas cuja métrica mudou são descartadas ao sair do heap).
+    Itens que não cabem mais são descartados de vez, pois o peso só aumenta.
+    Complexidade: O((n + nP) log n). A solução é a mesma da versão original
+    (dynamic_value_greedy_heuristic_kpf_reference), inclusive nos empates,
+    que ficam com o item de menor índice. Com pesos negativos o peso da
+    solução pode diminuir e a versão original é usada diretamente.
+
+    Args:
+        instance_data (dict): Dicionário com os dados da instância.
+
+    Returns:
+        dict: Um dicionário contendo a solução encontrada:
+            'selected_items_indices' (list): Lista dos índices dos itens selecionados.
+            'total_weight' (int): Peso total dos itens selecionados.
+            'total_profit' (int): Lucro total dos itens selecionados.
+            'total_forfeit_cost' (int): Custo total das penalidades incorridas.
+            'objective_value' (int): Valor da função objetivo (lucro - penalidades).
+    """
+    num_items = instance_data['num_items']
+    profits = instance_data['profits']
+    weights = instance_data['weights']
+    capacity = instance_data['capacity']
+    forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
+    if any(weight < 0 for weight in weights):
+        # Com pesos negativos um item que não cabe pode voltar a caber: usa a busca completa
+        return dynamic_value_greedy_heuristic_kpf_reference(instance_data)
+    forfeit_neighbors = get_forfeit_neighbors(instance_data)
+
+    current_solution_indices = []
+    in_solution = bytearray(num_items)
+    current_weight = 0
+    # Penalidade adicional de cada item com a solução atual
+    additional_forfeit = [0] * num_items
+    metrics = [_dvgh_metric(profits[item_idx], weights[item_idx]) for item_idx in range(num_items)]
+
+    # Max-heap por (métrica, menor índice), como o laço da versão original
+    heap = [(-metrics[item_idx], item_idx) for item_idx in range(num_items)]
+    heapq.heapify(heap)
+
+    while heap:
+        negative_metric, item_idx = heap[0]
+        if in_solution[item_idx] or -negative_metric != metrics[item_idx]:
+            heapq.heappop(heap)  # Entrada desatualizada
+            continue
+        if current_weight + weights[item_idx] > capacity:
+            heapq.heappop(heap)  # Não cabe agora nem depois
+            continue
+        if metrics[item_idx] <= 0:
+            break
+        heapq.heappop(heap)
+
+        current_solution_indices.append(item_idx)
+        in_solution[item_idx] = 1
+        current_weight += weights[item_idx]
+        for neighbor_idx, cost in forfeit_neighbors[item_idx]:
+            additional_forfeit[neighbor_idx] += cost
+            if not in_solution[neighbor_idx]:
+                metric = _dvgh_metric(profits[neighbor_idx] - additional_forfeit[neighbor_idx], weights[neighbor_idx])
+                metrics[neighbor_idx] = metric
+                heapq.heappush(heap, (-metric, neighbor_idx))
+
+    # Calcula os valores finais da solução construída
+    if not current_solution_indices:
+        return {
+            'selected_items_indices': [], 'total_weight': 0,
+            'total_profit': 0, 'total_forfeit_cost': 0,
+            'objective_value': -float('inf')
+        }
+
+    total_profit, total_forfeit_cost, objective_value = calculate_solution_value(
+        current_solution_indices, profits, forfeit_costs_matrix
+    )
+
+    return {
+        'selected_items_indices': sorted(current_solution_indices), # Retorna ordenado para consistência
+        'total_weight': current_weight,
+        'total_profit': total_profit,
+        'total_forfeit_cost': total_forfeit_cost,
+        'objective_value': objective_value
+    }
+
+def dynamic_value_greedy_heuristic_kpf_reference(instance_data):
+    """
+    Implementa a Heurística Gulosa com Avaliação Dinâmica de Penalidades (DVGH)
+    para o Problema da Mochila com Penalidades (KPF).
+
+    Versão original, que reavalia todos os candidatos a cada rodada
+    (O(n^2 * s)); mantida como referência de dynamic_value_greedy_heuristic_kpf.
+
     Args:
         instance_data (dict): Dicionário com os dados da instância.
 
@@ -26,6 +129,7 @@ def dynamic_value_greedy_heuristic_kpf(instance_data):
     forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
 
     current_solution_indices = []
+    current_solution_set = set()
     current_weight = 0
     
     # Inicialmente, todos os itens são candidatos (usamos uma cópia para poder remover)
@@ -41,9 +145,10 @@ def dynamic_value_greedy_heuristic_kpf(instance_data):
 
             if current_weight + item_weight_val <= capacity:
                 # Calcula o custo adicional de penalidades se este item for adicionado
-                additional_forfeit_if_added = 0
-                for selected_idx_in_solution in current_solution_indices:
-                    additional_forfeit_if_added += forfeit_costs_matrix[item_idx][selected_idx_in_solution]
+                # (com a matriz esparsa, percorre apenas os vizinhos do item)
+                additional_forfeit_if_added = _calculate_item_penalty_with_solution(
+                    item_idx, current_solution_set, forfeit_costs_matrix
+                )
                 
                 net_gain = item_profit_val - additional_forfeit_if_added
                 
@@ -64,6 +169,7 @@ def dynamic_value_greedy_heuristic_kpf(instance_data):
         
         if best_item_to_add_idx != -1 and max_evaluation_metric > 0:
             current_solution_indices.append(best_item_to_add_idx)
+            current_solution_set.add(best_item_to_add_idx)
             current_weight += weights[best_item_to_add_idx]
             candidate_item_indices.remove(best_item_to_add_idx) # Remove para não considerar novamente
         else:
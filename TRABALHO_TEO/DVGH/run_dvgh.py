@@ -4,7 +4,7 @@ import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from utilities import load_instances_from_directory, read_kpf_instance
+from instance_catalog import InstanceCatalog
 from dvgh import dynamic_value_greedy_heuristic_kpf
 from METAHEURISTICAS.ils import iterated_local_search_simple
 from METAHEURISTICAS.vnd import vnd
@@ -13,7 +13,8 @@ from METAHEURISTICAS.ils_vnd import iterated_local_search_vnd
 # Mude aqui para testar outras instâncias
 target_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.New Instances', 'O', '1000'))
 
-all_instances_in_O_500 = load_instances_from_directory(target_directory)
+# Catálogo preguiçoso: só a instância usada abaixo é lida por completo
+all_instances_in_O_500 = InstanceCatalog(target_directory)
 
 if all_instances_in_O_500:
 
@@ -23,8 +24,7 @@ if all_instances_in_O_500:
     print(f"\n\n--- Preparando para resolver com DVGH ---")
     print(f"Instância original (referência): {instance_reference_for_dvgh['filepath']}")
 
-    print(f"Re-lendo arquivo para garantir dados frescos para DVGH: {instance_reference_for_dvgh['filepath']}")
-    fresh_instance_data_for_dvgh = read_kpf_instance(instance_reference_for_dvgh['filepath'])
+    fresh_instance_data_for_dvgh = instance_reference_for_dvgh
     
     print(f"\n--- Resolvendo instância com DVGH (dados frescos): {fresh_instance_data_for_dvgh['filepath']} ---")
     print(f"Número de itens: {fresh_instance_data_for_dvgh['num_items']}, Capacidade: {fresh_instance_data_for_dvgh['capacity']}, Número de pares com penalidade: {fresh_instance_data_for_dvgh['num_forfeits']}")
@@ -0,0 +1,211 @@
+import math
+import sys
+
+from build_carrosel import penalty_aware_greedy_construction
+from dvgh import dynamic_value_greedy_heuristic_kpf
+from search_budget import SearchBudget
+from solution_state import SolutionState
+from utilities import get_forfeit_neighbors
+
+# ----------------------------------------------------------------------------------
+# BRANCH-AND-BOUND EXATO PARA O KPF
+# Busca em profundidade fixando em 1 (primeiro) ou 0 o item livre de maior razão
+# entre ganho máximo e peso. O limitante de cada nó é a mochila fracionária dos itens livres,
+# com o lucro de cada um descontado da penalidade com os itens já fixados em 1
+# (as penalidades entre itens livres são ignoradas, o que só afrouxa o limitante).
+# ----------------------------------------------------------------------------------
+
+class _SearchLimitReached(Exception):
+    pass
+
+class _BranchAndBound:
+    """Estado da busca: itens fixados em 1, penalidades acumuladas e incumbente."""
+
+    def __init__(self, instance_data, budget, incumbent_items):
+        self.instance_data = instance_data
+        self.budget = budget
+        self.num_items = instance_data['num_items']
+        self.profits = instance_data['profits']
+        self.weights = instance_data['weights']
+        self.capacity = instance_data['capacity']
+        self.neighbors = get_forfeit_neighbors(instance_data)
+
+        # Custos negativos (bônus) entre itens ainda livres podem aumentar o
+        # objetivo: a soma deles entra no limitante de cada item
+        self.bonus = [sum(-cost for _, cost in self.neighbors[item_idx] if cost < 0)
+                      for item_idx in range(self.num_items)]
+        # Com dados inteiros o objetivo é inteiro e o limitante pode ser arredondado para baixo
+        self.integral = all(isinstance(profit, int) for profit in self.profits) and all(
+            isinstance(cost, int) for item_neighbors in self.neighbors for _, cost in item_neighbors)
+
+        # Penalidade de cada item com os itens fixados em 1
+        self.penalty = [0] * self.num_items
+        self.in_solution = bytearray(self.num_items)
+        self.excluded = bytearray(self.num_items)
+        self.selected = []
+        self.value = 0
+        self.weight = 0
+
+        incumbent = SolutionState(instance_data, incumbent_items)
+        self.best_items = list(incumbent.items)
+        self.best_value = incumbent.objective_value
+        # Limitantes dos nós abertos (o nó atual e os filhos 'exclui' ainda não
+        # visitados dos seus ancestrais): ao interromper a busca, todo nó não
+        # explorado descende de um deles. O último é sempre o do nó atual.
+        self.open_bounds = []
+        self.nodes = 0
+
+    def _max_gain(self, item_idx):
+        """Maior ganho possível ao fixar o item em 1, dados os itens já fixados."""
+        return self.profits[item_idx] - self.penalty[item_idx] + self.bonus[item_idx]
+
+    def upper_bound(self):
+        """
+        Mochila fracionária dos itens livres com lucro dado por _max_gain.
+        Retorna (limitante, item livre de maior razão), ou item None se nenhum
+        item livre pode melhorar a solução.
+        """
+        free_capacity = self.capacity - self.weight
+        bound = self.value
+        candidates = []
+        for item_idx in range(self.num_items):
+            weight = self.weights[item_idx]
+            if weight <= free_capacity and not self.excluded[item_idx] and not self.in_solution[item_idx]:
+                gain = self._max_gain(item_idx)
+                if gain > 0:
+                    candidates.append((gain / weight if weight > 0 else math.inf, gain, weight, item_idx))
+        if not candidates:
+            return bound, None
+        candidates.sort(reverse=True)
+        for ratio, gain, weight, _ in candidates:
+            if weight <= free_capacity:
+                bound += gain
+                free_capacity -= weight
+            else:
+                bound += ratio * free_capacity
+                break
+        return bound, candidates[0][3]
+
+    def _cannot_improve(self, bound):
+        if self.integral:
+            return math.floor(bound + 1e-6) <= self.best_value
+        return bound <= self.best_value + 1e-9
+
+    def _include(self, item_idx):
+        self.value += self.profits[item_idx] - self.penalty[item_idx]
+        self.weight += self.weights[item_idx]
+        self.selected.append(item_idx)
+        self.in_solution[item_idx] = 1
+        for neighbor_idx, cost in self.neighbors[item_idx]:
+            self.penalty[neighbor_idx] += cost
+
+    def _undo_include(self, item_idx):
+        for neighbor_idx, cost in self.neighbors[item_idx]:
+            self.penalty[neighbor_idx] -= cost
+        self.in_solution[item_idx] = 0
+        self.selected.pop()
+        self.weight -= self.weights[item_idx]
+        self.value -= self.profits[item_idx] - self.penalty[item_idx]
+
+    def search(self, node):
+        """
+        Explora a subárvore do nó atual (itens em 'selected' e 'excluded' já
+        fixados). 'node' é o resultado de upper_bound() no nó, calculado pelo
+        pai, e open_bounds[-1] é o limitante dele.
+        """
+        if self.budget.exhausted():
+            raise _SearchLimitReached
+        self.budget.count_evaluation()
+        self.nodes += 1
+
+        if self.value > self.best_value:
+            self.best_value = self.value
+            self.best_items = list(self.selected)
+            self.budget.report(self.value, self.selected)
+
+        # Itens que não cabem ou cujo ganho não pode ser positivo não entram
+        # no limitante nem são ramificados: fixá-los em 1 não melhora a solução
+        bound, item_idx = node
+        if item_idx is None or self._cannot_improve(bound):
+            return
+
+        # Ramifica no item livre de maior razão ganho/peso. Os limitantes dos
+        # dois filhos substituem o do nó entre os abertos: o do filho 'exclui'
+        # fica na posição do nó até ele ser visitado.
+        self.excluded[item_idx] = 1
+        exclude_node = self.upper_bound()
+        self.excluded[item_idx] = 0
+        self._include(item_idx)
+        include_node = self.upper_bound()
+        self.open_bounds[-1] = exclude_node[0]
+        self.open_bounds.append(include_node[0])
+        self.search(include_node)
+        self.open_bounds.pop()
+        self._undo_include(item_idx)
+        self.excluded[item_idx] = 1
+        self.search(exclude_node)
+        self.excluded[item_idx] = 0
+
+def branch_and_bound(instance_data, time_limit=None, node_limit=None, initial_solutions=None,
+                     on_improvement=None):
+    """
+    Resolve o KPF de forma exata por branch-and-bound, para instâncias
+    pequenas e médias.
+
+    A incumbente inicial é a melhor entre 'initial_solutions' (dicionários de
+    solução) e, se omitidas, as construções gulosas (carrossel e DVGH). A busca
+    pode ser limitada por 'time_limit' (segundos) e/ou 'node_limit' (nós
+    explorados); se algum limite for atingido, a solução devolvida é a melhor
+    encontrada e params['upper_bound'] é um limitante superior válido do ótimo.
+    'on_improvement' recebe cada nova incumbente (ver SearchBudget).
+
+    Returns:
+        dict: A solução, no formato das demais heurísticas. Em 'params':
+            'optimal' (bool): True se a otimalidade foi provada.
+            'upper_bound': Limitante superior do ótimo (igual ao objetivo se ótima).
+            'gap': (upper_bound - objetivo) / |upper_bound|.
+            'nodes', 'elapsed' e 'initial_objective_value'.
+    """
+    if initial_solutions is None:
+        initial_solutions = [penalty_aware_greedy_construction(instance_data),
+                             dynamic_value_greedy_heuristic_kpf(instance_data)]
+    incumbent_items = max(initial_solutions, key=lambda solution: solution['objective_value'],
+                          default={'selected_items_indices': []})['selected_items_indices']
+
+    budget = SearchBudget(time_limit=time_limit, max_evaluations=node_limit, on_improvement=on_improvement)
+    search = _BranchAndBound(instance_data, budget, incumbent_items)
+    initial_objective_value = search.best_value
+    budget.report(search.best_value, search.best_items)
+
+    # Limitante da raiz, calculado antes de qualquer verificação do orçamento:
+    # se o limite for atingido antes de a raiz ser ramificada, é ele que
+    # limita o ótimo
+    root = search.upper_bound()
+    search.open_bounds.append(root[0])
+
+    # A profundidade da recursão chega ao número de itens
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursion_limit, search.num_items + 1000))
+    try:
+        search.search(root)
+        upper_bound = search.best_value
+    except _SearchLimitReached:
+        upper_bound = max([search.best_value] + search.open_bounds)
+        if search.integral:
+            upper_bound = math.floor(upper_bound + 1e-6)
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    optimal = upper_bound <= search.best_value
+    params = {
+        'type': 'branch_and_bound',
+        'optimal': optimal,
+        'upper_bound': upper_bound,
+        'gap': 0.0 if optimal else (upper_bound - search.best_value) / max(abs(upper_bound), 1e-9),
+        'nodes': search.nodes,
+        'elapsed': budget.elapsed(),
+        'time_limit': time_limit,
+        'node_limit': node_limit,
+        'initial_objective_value': initial_objective_value,
+    }
+    return SolutionState(instance_data, search.best_items).to_solution_dict(params)
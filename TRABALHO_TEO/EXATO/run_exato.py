@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for subdir in ('', 'CARROSSEL', 'DVGH'):
+    sys.path.append(os.path.join(BASE_DIR, subdir))
+
+from branch_and_bound import branch_and_bound
+from instance_catalog import InstanceCatalog
+
+# --- Parâmetros do Branch-and-Bound ---
+TIME_LIMIT = 300        # Tempo máximo em segundos (None = sem limite)
+NODE_LIMIT = None       # Número máximo de nós explorados (None = sem limite)
+
+if __name__ == "__main__":
+    # Mude aqui para testar outras instâncias
+    target_directory = os.path.join(BASE_DIR, '.New Instances', 'O', '500')
+    # Catálogo preguiçoso: só a instância usada abaixo é lida por completo
+    all_instances_in_O_500 = InstanceCatalog(target_directory)
+
+    if all_instances_in_O_500:
+
+        #Troque o valor dentro dos colchetes para alterar o arquivo acessado
+        instance_to_solve_exact = all_instances_in_O_500[0]
+
+        print(f"\n\n--- Preparando para resolver com Branch-and-Bound ---")
+        print(f"Arquivo: {instance_to_solve_exact['filepath']}")
+
+        print("\n" + "="*50)
+        print(f"Executando o Branch-and-Bound")
+        print(f"Parâmetros: Tempo máximo={TIME_LIMIT}, Nós={NODE_LIMIT}")
+        print("="*50  + "\n")
+
+        start = time.time()
+        exact_solution = branch_and_bound(instance_to_solve_exact, time_limit=TIME_LIMIT, node_limit=NODE_LIMIT)
+        end = time.time()
+
+        # --- Impressão do Resultado Final ---
+        params = exact_solution['params']
+        print("\n--- Melhor Solução Encontrada pelo Branch-and-Bound ---")
+        if params['optimal']:
+            print("Solução ÓTIMA (otimalidade provada)")
+        else:
+            print(f"Limite atingido: limitante superior = {params['upper_bound']} (gap = {100 * params['gap']:.2f}%)")
+        print(f"Nós explorados: {params['nodes']}")
+        print(f"Objetivo da incumbente inicial (gulosos): {params['initial_objective_value']}")
+        print(f"Itens Selecionados (índices): {exact_solution['selected_items_indices']}")
+        print(f"Número de Itens Selecionados: {len(exact_solution['selected_items_indices'])}")
+        print(f"Peso Total: {exact_solution['total_weight']} (Capacidade: {instance_to_solve_exact['capacity']})")
+        print(f"Lucro Total dos Itens: {exact_solution['total_profit']}")
+        print(f"Custo Total de Penalidades: {exact_solution['total_forfeit_cost']}")
+        print(f"VALOR OBJETIVO (Lucro - Penalidades): {exact_solution['objective_value']:.2f}")
+        print(f"Tempo decorrido: {end - start} segundos")
+        print("="*50  + "\n")
+    else:
+        print(f"Nenhuma instância carregada do diretório '{target_directory}'. Verifique o caminho ou o conteúdo do diretório.")
@@ -1,28 +1,41 @@
 import random
 
-from utilities import _calculate_penalized_metric, calculate_solution_value, calculate_solution_weight
+from solution_bitset import SolutionBitset
+from utilities import _build_forfeit_neighbors, _penalized_ratio, calculate_solution_value, calculate_solution_weight
 
 def penalty_aware_greedy_constructor_grasp(num_items, capacity, profits, weights,
-                                           forfeit_costs_matrix, rcl_size=3):
+                                           forfeit_costs_matrix, rcl_size=3, rng=None,
+                                           forfeit_neighbors=None):
     """
     Construtor guloso com lista restrita de candidatos (RCL) para o GRASP.
     A cada passo, escolhe aleatoriamente um dos 'rcl_size' melhores candidatos.
+    'rng' é um random.Random próprio (para sementes reprodutíveis por iteração);
+    se omitido, usa o gerador global do módulo random.
+
+    A penalidade de cada item com a solução parcial é acumulada a cada
+    escolha (só os vizinhos do item escolhido mudam), então cada passo custa
+    O(n) em vez de O(n * s). 'forfeit_neighbors' são as listas de
+    get_forfeit_neighbors; se omitidas, são calculadas a partir da matriz.
     
     --- MUDANÇA AQUI: Agora retorna um dicionário completo da solução. ---
     """
+    if rng is None:
+        rng = random
+    if forfeit_neighbors is None:
+        forfeit_neighbors = _build_forfeit_neighbors(forfeit_costs_matrix)
     solution_indices = []
     current_weight = 0
-    available_items = set(range(num_items))
+    penalty_with_solution = [0] * num_items
+    # Os disponíveis ficam em um bitset, que itera em ordem crescente
+    available_items = SolutionBitset(num_items).complement()
 
     while True:
         candidates = []
-        current_solution_set = set(solution_indices)
 
         # Avalia todos os itens disponíveis
-        for item_idx in sorted(list(available_items)):
+        for item_idx in available_items:
             if current_weight + weights[item_idx] <= capacity:
-                metric = _calculate_penalized_metric(item_idx, current_solution_set,
-                                                     profits, weights, forfeit_costs_matrix)
+                metric = _penalized_ratio(profits[item_idx] - penalty_with_solution[item_idx], weights[item_idx])
                 if metric >= 0:
                     candidates.append((metric, item_idx))
 
@@ -36,11 +49,13 @@ def penalty_aware_greedy_constructor_grasp(num_items, capacity, profits, weights
         if not rcl:
             break
 
-        _, chosen_item = random.choice(rcl)
+        _, chosen_item = rng.choice(rcl)
         
         solution_indices.append(chosen_item)
         current_weight += weights[chosen_item]
         available_items.remove(chosen_item)
+        for neighbor_idx, cost in forfeit_neighbors[chosen_item]:
+            penalty_with_solution[neighbor_idx] += cost
 
     if not solution_indices:
          return {
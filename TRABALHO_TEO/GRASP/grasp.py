@@ -0,0 +1,118 @@
+import concurrent.futures
+import os
+import random
+
+from build_grasp import penalty_aware_greedy_constructor_grasp
+from local_grasp import grasp_local_search
+from search_budget import SearchBudget
+from utilities import get_forfeit_neighbors
+
+# Instância compartilhada por cada processo do pool: é enviada uma única vez,
+# no inicializador do worker, em vez de ser serializada a cada tarefa.
+_worker_instance_data = None
+
+def _init_grasp_worker(instance_data):
+    global _worker_instance_data
+    _worker_instance_data = instance_data
+
+def _iteration_seed(base_seed, iteration):
+    """Semente determinística de uma iteração (independe de qual worker a executa)."""
+    return f"{base_seed}:{iteration}"
+
+def _run_grasp_iteration(instance_data, iteration, base_seed, rcl_size, backend):
+    """Uma iteração do GRASP: construção aleatorizada + busca local."""
+    rng = random.Random(_iteration_seed(base_seed, iteration))
+    built_solution = penalty_aware_greedy_constructor_grasp(
+        num_items=instance_data['num_items'],
+        capacity=instance_data['capacity'],
+        profits=instance_data['profits'],
+        weights=instance_data['weights'],
+        forfeit_costs_matrix=instance_data['forfeit_costs_matrix'],
+        rcl_size=rcl_size,
+        rng=rng,
+        forfeit_neighbors=get_forfeit_neighbors(instance_data)
+    )
+    solution = grasp_local_search(built_solution['selected_items_indices'], instance_data, backend=backend)
+    return iteration, solution
+
+def _grasp_worker_task(iteration, base_seed, rcl_size, backend):
+    return _run_grasp_iteration(_worker_instance_data, iteration, base_seed, rcl_size, backend)
+
+def _reduce_best(results, budget=None):
+    """
+    Melhor (iteração, solução) por objetivo; empate fica com a menor iteração.
+    Com um SearchBudget, cada resultado conta como uma avaliação e as
+    melhorias são informadas a ele na ordem em que os resultados chegam.
+    """
+    best_iteration, best_solution = None, None
+    for iteration, solution in results:
+        if budget is not None:
+            budget.count_evaluation()
+            budget.report(solution['objective_value'], solution['selected_items_indices'], iteration)
+        if best_solution is None or solution['objective_value'] > best_solution['objective_value'] \
+                or (solution['objective_value'] == best_solution['objective_value'] and iteration < best_iteration):
+            best_iteration, best_solution = iteration, solution
+    return best_iteration, best_solution
+
+def grasp(instance_data, max_iterations=100, rcl_size=3, seed=None, num_workers=None, backend='python',
+          on_improvement=None):
+    """
+    GRASP multi-start: cada iteração constrói uma solução com a RCL e aplica a
+    busca local; as iterações são independentes e rodam em paralelo em um
+    ProcessPoolExecutor.
+
+    Args:
+        instance_data (dict): Dicionário com os dados da instância.
+        max_iterations (int): Número de iterações (construção + busca local).
+        rcl_size (int): Tamanho da lista restrita de candidatos.
+        seed (int, opcional): Semente base. A iteração i usa uma semente derivada
+                              de (seed, i), então o resultado é o mesmo para
+                              qualquer número de workers.
+        num_workers (int, opcional): Número de processos (padrão: os.cpu_count()).
+                                     Com 1, executa tudo no processo atual.
+        backend (str): Backend das vizinhanças da busca local.
+        on_improvement (callable, opcional): Recebe cada nova melhor solução
+                                             (ver SearchBudget), no momento em
+                                             que o resultado da iteração chega.
+
+    Returns:
+        dict: A melhor solução encontrada. Empates no objetivo ficam com a
+              iteração de menor índice.
+    """
+    if max_iterations < 1:
+        raise ValueError("O GRASP precisa de pelo menos uma iteração.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, max_iterations))
+    budget = SearchBudget(on_improvement=on_improvement) if on_improvement is not None else None
+
+    if num_workers == 1:
+        results = (_run_grasp_iteration(instance_data, i, seed, rcl_size, backend)
+                   for i in range(max_iterations))
+        best_iteration, best_solution = _reduce_best(results, budget)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_grasp_worker,
+            initargs=(instance_data,)
+        ) as executor:
+            iterations = range(max_iterations)
+            chunksize = max(1, max_iterations // (num_workers * 4))
+            results = executor.map(
+                _grasp_worker_task, iterations,
+                [seed] * max_iterations, [rcl_size] * max_iterations, [backend] * max_iterations,
+                chunksize=chunksize
+            )
+            best_iteration, best_solution = _reduce_best(results, budget)
+
+    best_solution['params'] = {
+        'type': 'GRASP_MultiStart',
+        'max_iterations': max_iterations,
+        'rcl_size': rcl_size,
+        'seed': seed,
+        'num_workers': num_workers,
+        'best_iteration': best_iteration,
+    }
+    return best_solution
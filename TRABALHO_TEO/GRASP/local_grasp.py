@@ -1,52 +1,55 @@
-from utilities import calculate_solution_value
-from busca_local import (
-    _local_search_swap_1_0_optimized,
-    _local_search_swap_0_1_optimized,
-    _local_search_swap_1_1_optimized,
-    _local_search_swap_2_1_optimized,
-    _local_search_swap_2_1_optimized_first_improvement,
-    calculate_solution_weight
-)
+from busca_local import get_state_neighborhoods
+from neighborhood_profiler import NeighborhoodProfiler
+from solution_state import SolutionState
 from build_grasp import penalty_aware_greedy_constructor_grasp
 
 
-def grasp_local_search(initial_solution_indices, instance_data):
+def grasp_local_search(initial_solution_indices, instance_data, backend='python', verify=False,
+                       profile=False, profiler=None):
     """
     Busca local padrão do GRASP usando VND otimizado.
+    Aceita uma lista de índices ou um SolutionState (que é modificado no lugar).
+    'backend' escolhe a implementação das vizinhanças (ver get_state_neighborhoods).
+    Os valores finais vêm do estado incremental; verify=True os confere com o
+    recálculo completo (modo de depuração).
+    profile=True devolve os contadores por vizinhança em params['profile'];
+    um NeighborhoodProfiler já criado ('profiler') acumula várias buscas.
     """
+    if profile and profiler is None:
+        profiler = NeighborhoodProfiler()
     # Usa o VND como estratégia de busca local padrão
-    neighborhoods = [
-        _local_search_swap_1_0_optimized,
-        _local_search_swap_0_1_optimized,
-        _local_search_swap_1_1_optimized,
-        #_local_search_swap_2_1_optimized,
-        #_local_search_swap_2_1_optimized_first_improvement, 
+    moves = get_state_neighborhoods(backend)
+    neighborhood_keys = [
+        '1-0',
+        '0-1',
+        '1-1',
+        '2-1-candidates',
+        #'2-1',
+        #'2-1-first', 
     ]
+    if profiler is not None:
+        neighborhoods = [profiler.wrap(key, moves[key]) for key in neighborhood_keys]
+    else:
+        neighborhoods = [moves[key] for key in neighborhood_keys]
+
+    if isinstance(initial_solution_indices, SolutionState):
+        state = initial_solution_indices
+    else:
+        state = SolutionState(instance_data, initial_solution_indices)
 
-    current_solution = initial_solution_indices
     k = 0
     while k < len(neighborhoods):
-        new_solution, improved = neighborhoods[k](current_solution, instance_data)
+        improved = neighborhoods[k](state)
         if improved:
-            current_solution = new_solution
             k = 0  # volta para a primeira vizinhança
         else:
             k += 1
             #print("To rodando com o K :", k)
 
-    # Calcula os valores finais da solução
-    final_weight = calculate_solution_weight(current_solution, instance_data['weights'])
-    final_profit, final_forfeit_cost, objective_value = calculate_solution_value(
-        current_solution,
-        instance_data['profits'],
-        instance_data['forfeit_costs_matrix']
-    )
+    if verify:
+        state.verify()
 
-    return {
-        'selected_items_indices': sorted(current_solution),
-        'total_weight': final_weight,
-        'total_profit': final_profit,
-        'total_forfeit_cost': final_forfeit_cost,
-        'objective_value': objective_value,
-        'params': {'type': 'GRASP_LocalSearch_Standard'}
-    }
\ No newline at end of file
+    params = {'type': 'GRASP_LocalSearch_Standard'}
+    if profiler is not None:
+        params['profile'] = profiler.summary()
+    return state.to_solution_dict(params)
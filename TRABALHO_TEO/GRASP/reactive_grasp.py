@@ -0,0 +1,233 @@
+import random
+
+from build_grasp import penalty_aware_greedy_constructor_grasp
+from local_grasp import grasp_local_search
+from search_budget import SearchBudget
+from solution_state import SolutionState
+from utilities import get_forfeit_neighbors
+
+# ----------------------------------------------------------------------------------
+# GRASP REATIVO COM POOL DE ELITE E PATH RELINKING
+# O tamanho da RCL de cada iteração é sorteado de uma distribuição que é
+# reajustada, a cada bloco de iterações, pela qualidade média das soluções
+# obtidas com cada tamanho. Os ótimos locais são ligados a soluções do pool de
+# elite por path relinking, e o melhor ponto do caminho passa pela busca local.
+# ----------------------------------------------------------------------------------
+
+class ElitePool:
+    """
+    Pool das melhores soluções distintas encontradas (conjuntos de itens).
+
+    Uma solução entra se o pool não está cheio ou se é melhor que a pior do
+    pool (que é substituída), desde que difira de todas as soluções do pool
+    em pelo menos 'min_distance' itens. Uma nova melhor solução entra sempre
+    que não for repetida.
+    """
+
+    def __init__(self, max_size=10, min_distance=4):
+        if max_size < 1:
+            raise ValueError("O pool de elite deve ter pelo menos uma solução.")
+        self.max_size = max_size
+        self.min_distance = min_distance
+        self.entries = []  # (objetivo, frozenset dos itens)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def try_add(self, items, objective_value):
+        """Tenta inserir a solução. Retorna True se ela entrou no pool."""
+        items = frozenset(items)
+        distances = [len(items ^ elite_items) for _, elite_items in self.entries]
+        if 0 in distances:
+            return False
+        is_best = not self.entries or objective_value > max(objective for objective, _ in self.entries)
+        if not is_best and min(distances, default=self.min_distance) < self.min_distance:
+            return False
+
+        if len(self.entries) < self.max_size:
+            self.entries.append((objective_value, items))
+            return True
+        worst = min(range(len(self.entries)), key=lambda position: self.entries[position][0])
+        if objective_value <= self.entries[worst][0]:
+            return False
+        self.entries[worst] = (objective_value, items)
+        return True
+
+    def choose_guide(self, items, rng):
+        """Sorteia uma solução do pool diferente de 'items' (ou None)."""
+        items = frozenset(items)
+        candidates = [elite_items for _, elite_items in self.entries if elite_items != items]
+        return rng.choice(candidates) if candidates else None
+
+def path_relinking(state, guide_items):
+    """
+    Caminha de 'state' até a solução guia, a cada passo incluindo um item da
+    guia (se couber) ou retirando um item ausente dela, escolhendo o passo de
+    maior ganho (deltas O(1) de SolutionState). 'state' é modificado no lugar.
+
+    Retorna (itens, objetivo) do melhor ponto intermediário do caminho (sem as
+    extremidades), ou (None, None) se as soluções diferem em menos de 2 itens.
+    """
+    to_add = sorted(set(guide_items) - set(state.items))
+    to_remove = sorted(set(state.items) - set(guide_items))
+    best_items, best_objective = None, None
+
+    while len(to_add) + len(to_remove) > 1:
+        free_capacity = state.capacity - state.total_weight
+        best_gain, best_move = None, None
+        for item_idx in to_add:
+            if state.weights[item_idx] <= free_capacity:
+                gain = state.add_gain(item_idx)
+                if best_gain is None or gain > best_gain:
+                    best_gain, best_move = gain, (True, item_idx)
+        for item_idx in to_remove:
+            gain = state.remove_gain(item_idx)
+            if best_gain is None or gain > best_gain:
+                best_gain, best_move = gain, (False, item_idx)
+        if best_move is None:
+            break
+
+        adding, item_idx = best_move
+        if adding:
+            state.add(item_idx)
+            to_add.remove(item_idx)
+        else:
+            state.remove(item_idx)
+            to_remove.remove(item_idx)
+        if best_objective is None or state.objective_value > best_objective:
+            best_items, best_objective = list(state.items), state.objective_value
+
+    return best_items, best_objective
+
+def _update_probabilities(rcl_sizes, quality_sums, quality_counts, best_objective, delta):
+    """
+    Probabilidades do GRASP reativo: q_k = (média_k / melhor)^delta, normalizado.
+    Tamanhos ainda não usados recebem a maior pontuação, para serem testados.
+    """
+    scores = []
+    for k in range(len(rcl_sizes)):
+        if quality_counts[k] == 0 or best_objective <= 0:
+            scores.append(None)
+        else:
+            average = quality_sums[k] / quality_counts[k]
+            scores.append((max(average, 0) / best_objective) ** delta)
+    known = [score for score in scores if score is not None]
+    default_score = max(known) if known and max(known) > 0 else 1.0
+    scores = [default_score if score is None else score for score in scores]
+    total = sum(scores)
+    if total <= 0:
+        return [1.0 / len(rcl_sizes)] * len(rcl_sizes)
+    return [score / total for score in scores]
+
+def reactive_grasp(instance_data, max_iterations=100, rcl_sizes=(1, 2, 3, 5, 8), seed=None,
+                   block_size=10, delta=10, elite_size=10, min_distance=4, relinking=True,
+                   backend='python', time_limit=None, target_value=None, on_improvement=None):
+    """
+    GRASP Reativo com pool de elite e path relinking.
+
+    A cada iteração o tamanho da RCL é sorteado de 'rcl_sizes' com as
+    probabilidades atuais; a cada 'block_size' iterações elas são recalculadas
+    pela qualidade média das soluções (após a busca local) de cada tamanho,
+    com expoente 'delta'. Com relinking=True, cada ótimo local é ligado a uma
+    solução sorteada do pool de elite e o melhor ponto do caminho passa pela
+    busca local. Como as iterações dependem das anteriores, o GRASP reativo
+    roda em um único processo.
+
+    Args:
+        instance_data (dict): Dicionário com os dados da instância.
+        max_iterations (int): Número máximo de iterações.
+        rcl_sizes (tuple): Tamanhos de RCL disponíveis.
+        seed (int, opcional): Semente do gerador da busca.
+        block_size (int): Iterações entre as atualizações das probabilidades.
+        delta (float): Expoente que amplia as diferenças entre os tamanhos.
+        elite_size (int): Tamanho do pool de elite.
+        min_distance (int): Diferença mínima (em itens) para entrar no pool.
+        relinking (bool): Se aplica o path relinking.
+        backend (str): Backend das vizinhanças da busca local.
+        time_limit (float, opcional): Tempo máximo, em segundos.
+        target_value (float, opcional): Para assim que o objetivo alcançar este valor.
+        on_improvement (callable, opcional): Recebe cada nova melhor solução (ver SearchBudget).
+
+    Returns:
+        dict: A melhor solução encontrada; 'params' traz as probabilidades
+              finais, a iteração da melhor solução e quantas melhorias vieram
+              do path relinking.
+    """
+    if max_iterations < 1:
+        raise ValueError("O GRASP precisa de pelo menos uma iteração.")
+    if not rcl_sizes or min(rcl_sizes) < 1:
+        raise ValueError("Os tamanhos de RCL devem ser inteiros positivos.")
+    if block_size < 1:
+        raise ValueError("O bloco de atualização das probabilidades deve ter pelo menos uma iteração.")
+    if delta < 0:
+        raise ValueError("O expoente 'delta' não pode ser negativo.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    budget = SearchBudget(time_limit=time_limit, on_improvement=on_improvement)
+    elite = ElitePool(elite_size, min_distance)
+
+    probabilities = [1.0 / len(rcl_sizes)] * len(rcl_sizes)
+    quality_sums = [0.0] * len(rcl_sizes)
+    quality_counts = [0] * len(rcl_sizes)
+    best_solution, best_iteration = None, None
+    relinking_improvements = 0
+
+    iteration = 0
+    while iteration < max_iterations:
+        # Os critérios de parada só valem a partir da primeira solução
+        if best_solution is not None and (budget.exhausted() or (
+                target_value is not None and best_solution['objective_value'] >= target_value)):
+            break
+
+        k = rng.choices(range(len(rcl_sizes)), weights=probabilities)[0]
+        built_solution = penalty_aware_greedy_constructor_grasp(
+            num_items=instance_data['num_items'],
+            capacity=instance_data['capacity'],
+            profits=instance_data['profits'],
+            weights=instance_data['weights'],
+            forfeit_costs_matrix=instance_data['forfeit_costs_matrix'],
+            rcl_size=rcl_sizes[k],
+            rng=rng,
+            forfeit_neighbors=get_forfeit_neighbors(instance_data)
+        )
+        solution = grasp_local_search(built_solution['selected_items_indices'], instance_data, backend=backend)
+        budget.count_evaluation()
+        quality_sums[k] += solution['objective_value']
+        quality_counts[k] += 1
+
+        candidates = [(solution, False)]
+        if relinking:
+            guide_items = elite.choose_guide(solution['selected_items_indices'], rng)
+            if guide_items is not None:
+                state = SolutionState(instance_data, solution['selected_items_indices'])
+                relinked_items, _ = path_relinking(state, guide_items)
+                if relinked_items is not None:
+                    candidates.append((grasp_local_search(relinked_items, instance_data, backend=backend), True))
+
+        for candidate, from_relinking in candidates:
+            elite.try_add(candidate['selected_items_indices'], candidate['objective_value'])
+            if best_solution is None or candidate['objective_value'] > best_solution['objective_value']:
+                best_solution, best_iteration = candidate, iteration
+                relinking_improvements += from_relinking
+                budget.report(candidate['objective_value'], candidate['selected_items_indices'], iteration)
+
+        iteration += 1
+        if iteration % block_size == 0:
+            probabilities = _update_probabilities(rcl_sizes, quality_sums, quality_counts,
+                                                  best_solution['objective_value'], delta)
+
+    best_solution['params'] = {
+        'type': 'GRASP_Reativo',
+        'max_iterations': max_iterations,
+        'iterations': iteration,
+        'rcl_sizes': list(rcl_sizes),
+        'rcl_probabilities': probabilities,
+        'seed': seed,
+        'elite_size': elite_size,
+        'relinking': relinking,
+        'relinking_improvements': relinking_improvements,
+        'best_iteration': best_iteration,
+        'elapsed': budget.elapsed(),
+    }
+    return best_solution
@@ -0,0 +1,338 @@
+import concurrent.futures
+import os
+import random
+
+from batch_evaluation import evaluate_batch
+from build_carrosel import penalty_aware_greedy_constructor
+from build_grasp import penalty_aware_greedy_constructor_grasp
+from dvgh import dynamic_value_greedy_heuristic_kpf
+from METAHEURISTICAS.vnd import vnd_on_state
+from search_budget import SearchBudget
+from solution_bitset import SolutionBitset
+from solution_state import SolutionState
+from utilities import _penalized_ratio, get_forfeit_neighbors, penalty_aware_greedy_fill_state
+
+# ----------------------------------------------------------------------------------
+# ALGORITMO MEMÉTICO
+# A população inicial vem dos construtores do projeto (guloso consciente de
+# penalidades, DVGH e construções aleatorizadas do GRASP), refinados pelo VND.
+# A cada geração, pares de pais escolhidos por torneio geram filhos por um
+# cruzamento consciente de penalidades com reparo da capacidade, e cada filho
+# passa pelo VND. Os filhos de uma geração são gerados em paralelo em um
+# ProcessPoolExecutor e voltam como bitsets empacotados, avaliados de uma vez
+# por evaluate_batch.
+# ----------------------------------------------------------------------------------
+
+# Instância compartilhada por cada processo do pool: é enviada uma única vez,
+# no inicializador do worker, em vez de ser serializada a cada tarefa.
+_worker_instance_data = None
+
+def _init_memetic_worker(instance_data):
+    global _worker_instance_data
+    _worker_instance_data = instance_data
+
+def _task_seed(base_seed, *position):
+    """Semente determinística de uma tarefa (independe de qual worker a executa)."""
+    return ':'.join(map(str, (base_seed,) + position))
+
+def _refine(state, backend):
+    """VND sobre o estado; devolve a solução empacotada (SolutionBitset.to_bytes)."""
+    vnd_on_state(state, backend=backend)
+    return state.to_bitset().to_bytes()
+
+def _build_individual(instance_data, index, base_seed, rcl_sizes, backend):
+    """
+    Indivíduo 'index' da população inicial: 0 é o guloso consciente de
+    penalidades, 1 é a DVGH e os demais são construções do GRASP (com o
+    tamanho de RCL alternando entre 'rcl_sizes'), todos refinados pelo VND.
+    """
+    if index == 0:
+        items = penalty_aware_greedy_constructor(
+            instance_data['num_items'], instance_data['capacity'], instance_data['profits'],
+            instance_data['weights'], instance_data['forfeit_costs_matrix'],
+            forfeit_neighbors=get_forfeit_neighbors(instance_data)
+        )
+    elif index == 1:
+        items = dynamic_value_greedy_heuristic_kpf(instance_data)['selected_items_indices']
+    else:
+        built_solution = penalty_aware_greedy_constructor_grasp(
+            num_items=instance_data['num_items'],
+            capacity=instance_data['capacity'],
+            profits=instance_data['profits'],
+            weights=instance_data['weights'],
+            forfeit_costs_matrix=instance_data['forfeit_costs_matrix'],
+            rcl_size=rcl_sizes[index % len(rcl_sizes)],
+            rng=random.Random(_task_seed(base_seed, 'init', index)),
+            forfeit_neighbors=get_forfeit_neighbors(instance_data)
+        )
+        items = built_solution['selected_items_indices']
+    return _refine(SolutionState(instance_data, items), backend)
+
+def _repair(state):
+    """
+    Reparo da capacidade: enquanto o peso passa da capacidade, retira o item
+    de menor razão lucro_penalizado / peso (lucro menos a penalidade com o
+    restante da solução).
+    """
+    profits = state.profits
+    weights = state.weights
+    penalty_with_solution = state.penalty_with_solution
+    while state.total_weight > state.capacity:
+        worst_item = min(state.items, key=lambda item_idx: (
+            _penalized_ratio(profits[item_idx] - penalty_with_solution[item_idx], weights[item_idx]), item_idx))
+        state.remove(worst_item)
+
+def crossover(instance_data, parent_a, parent_b, rng, mutation_rate=0.0, mutation_strength=0.1):
+    """
+    Cruzamento consciente de penalidades com reparo da capacidade.
+
+    O filho herda os itens comuns aos dois pais. Os itens de apenas um dos
+    pais são visitados em ordem aleatória e cada um entra com probabilidade
+    1/2, desde que não piore o objetivo do filho naquele momento (lucro maior
+    que a penalidade com os itens já herdados). Com probabilidade
+    'mutation_rate', uma fração 'mutation_strength' dos itens é retirada ao
+    acaso. Por fim, a capacidade é reparada (_repair) e o filho é completado
+    pelo preenchimento guloso consciente de penalidades.
+
+    Args:
+        parent_a, parent_b (list): Itens dos pais.
+        rng (random.Random): Gerador do cruzamento.
+
+    Returns:
+        SolutionState: O filho (viável).
+    """
+    items_b = SolutionBitset(instance_data['num_items'], parent_b)
+    child = SolutionState(instance_data, [item_idx for item_idx in parent_a if item_idx in items_b])
+
+    differing_items = [item_idx for item_idx in parent_a if item_idx not in items_b]
+    items_a = SolutionBitset(instance_data['num_items'], parent_a)
+    differing_items += [item_idx for item_idx in parent_b if item_idx not in items_a]
+    differing_items.sort()
+    rng.shuffle(differing_items)
+    for item_idx in differing_items:
+        if rng.random() < 0.5 and child.add_gain(item_idx) > 0:
+            child.add(item_idx)
+
+    if child.items and rng.random() < mutation_rate:
+        num_to_remove = max(1, int(len(child.items) * mutation_strength))
+        for item_idx in rng.sample(child.items, k=min(num_to_remove, len(child.items))):
+            child.remove(item_idx)
+
+    _repair(child)
+    penalty_aware_greedy_fill_state(child)
+    return child
+
+def _make_offspring(instance_data, parent_a, parent_b, seed_key, mutation_rate, mutation_strength, backend):
+    """Um filho: cruzamento dos pais (bitsets empacotados) + VND. Devolve o filho empacotado."""
+    num_items = instance_data['num_items']
+    child = crossover(instance_data,
+                      SolutionBitset.from_bytes(num_items, parent_a).to_list(),
+                      SolutionBitset.from_bytes(num_items, parent_b).to_list(),
+                      random.Random(seed_key), mutation_rate, mutation_strength)
+    return _refine(child, backend)
+
+def _build_worker_task(index, base_seed, rcl_sizes, backend):
+    return _build_individual(_worker_instance_data, index, base_seed, rcl_sizes, backend)
+
+def _offspring_worker_task(parent_a, parent_b, seed_key, mutation_rate, mutation_strength, backend):
+    return _make_offspring(_worker_instance_data, parent_a, parent_b, seed_key, mutation_rate,
+                           mutation_strength, backend)
+
+def _tournament(population, rng, size=2, exclude=None):
+    """
+    Seleção por torneio: o melhor de 'size' indivíduos sorteados (posição na
+    população). A posição 'exclude' (o primeiro pai) fica fora do sorteio.
+    """
+    positions = [position for position in range(len(population)) if position != exclude]
+    contestants = rng.sample(positions, k=min(size, len(positions)))
+    return max(contestants, key=lambda position: (population[position][0], -position))
+
+def _evaluate(instance_data, packed_solutions):
+    """Avaliação em lote dos indivíduos empacotados: lista de (objetivo, bytes) dos viáveis."""
+    if not packed_solutions:
+        return []
+    evaluation = evaluate_batch(instance_data, packed_solutions, packed=True)
+    return [(float(evaluation['objective_value'][position]), packed)
+            for position, packed in enumerate(packed_solutions) if evaluation['feasible'][position]]
+
+def memetic_algorithm(instance_data, population_size=10, max_generations=50, offspring_per_generation=None,
+                      tournament_size=2, mutation_rate=0.2, mutation_strength=0.1, restart_generations=10,
+                      rcl_sizes=(2, 3, 5, 8), seed=None, num_workers=None, backend='python',
+                      time_limit=None, target_value=None, on_improvement=None):
+    """
+    Algoritmo memético (algoritmo genético com busca local) para o KPF.
+
+    A população inicial tem o guloso consciente de penalidades, a DVGH e
+    construções do GRASP, todos refinados pelo VND (soluções repetidas são
+    descartadas). A cada geração, 'offspring_per_generation' filhos são
+    gerados por crossover() a partir de pais escolhidos por torneio e
+    refinados pelo VND; cada filho novo substitui o pior indivíduo da
+    população se for melhor que ele. Após 'restart_generations' gerações sem
+    melhorar a melhor solução, a população é reiniciada com novas construções
+    do GRASP, mantendo apenas a melhor.
+
+    As construções e os filhos de cada geração rodam em paralelo em um
+    ProcessPoolExecutor, criado uma única vez; os workers devolvem bitsets
+    empacotados, avaliados de uma vez por evaluate_batch. Cada tarefa usa uma
+    semente derivada de (seed, geração, filho), então o resultado é o mesmo
+    para qualquer número de workers.
+
+    Args:
+        instance_data (dict): Dicionário com os dados da instância.
+        population_size (int): Tamanho da população.
+        max_generations (int): Número máximo de gerações.
+        offspring_per_generation (int, opcional): Filhos por geração
+            (padrão: population_size // 2, independente do número de workers).
+        tournament_size (int): Indivíduos sorteados em cada torneio.
+        mutation_rate (float): Probabilidade de mutação de cada filho.
+        mutation_strength (float): Fração dos itens retirada pela mutação.
+        restart_generations (int, opcional): Gerações sem melhoria antes de
+            reiniciar a população (None desativa os reinícios).
+        rcl_sizes (tuple): Tamanhos de RCL das construções do GRASP.
+        seed (int, opcional): Semente base.
+        num_workers (int, opcional): Número de processos (padrão: os.cpu_count()).
+                                     Com 1, executa tudo no processo atual.
+        backend (str): Backend das vizinhanças do VND.
+        time_limit (float, opcional): Tempo máximo, em segundos (verificado
+            entre as gerações; a população inicial é sempre construída).
+        target_value (float, opcional): Para assim que o objetivo alcançar este valor.
+        on_improvement (callable, opcional): Recebe cada nova melhor solução (ver SearchBudget).
+
+    Returns:
+        dict: A melhor solução encontrada; 'params' traz as gerações
+              executadas, a geração da melhor solução e os reinícios.
+    """
+    if population_size < 2:
+        raise ValueError("A população precisa de pelo menos dois indivíduos.")
+    if tournament_size < 1:
+        raise ValueError("O torneio precisa de pelo menos um indivíduo.")
+    if max_generations < 0:
+        raise ValueError("O número de gerações não pode ser negativo.")
+    if not rcl_sizes or min(rcl_sizes) < 1:
+        raise ValueError("Os tamanhos de RCL devem ser inteiros positivos.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, num_workers)
+    if offspring_per_generation is None:
+        offspring_per_generation = max(1, population_size // 2)
+    rng = random.Random(seed)
+    budget = SearchBudget(time_limit=time_limit, on_improvement=on_improvement)
+    rcl_sizes = tuple(rcl_sizes)
+
+    executor = None
+    if num_workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_memetic_worker,
+            initargs=(instance_data,)
+        )
+
+    def build(indices):
+        if executor is None:
+            return [_build_individual(instance_data, index, seed, rcl_sizes, backend) for index in indices]
+        return list(executor.map(_build_worker_task, indices, [seed] * len(indices),
+                                 [rcl_sizes] * len(indices), [backend] * len(indices)))
+
+    def breed(parent_pairs, generation):
+        keys = [_task_seed(seed, generation, child) for child in range(len(parent_pairs))]
+        if executor is None:
+            return [_make_offspring(instance_data, parent_a, parent_b, key, mutation_rate, mutation_strength,
+                                    backend)
+                    for (parent_a, parent_b), key in zip(parent_pairs, keys)]
+        return list(executor.map(_offspring_worker_task,
+                                 [parent_a for parent_a, _ in parent_pairs], [parent_b for _, parent_b in parent_pairs],
+                                 keys, [mutation_rate] * len(keys), [mutation_strength] * len(keys),
+                                 [backend] * len(keys)))
+
+    num_items = instance_data['num_items']
+    best_objective, best_packed, best_generation = None, None, None
+
+    def consider(individuals, generation):
+        nonlocal best_objective, best_packed, best_generation
+        for objective, packed in individuals:
+            budget.count_evaluation()
+            if best_objective is None or objective > best_objective:
+                best_objective, best_packed, best_generation = objective, packed, generation
+                budget.report(objective, SolutionBitset.from_bytes(num_items, packed).to_list(), generation)
+
+    def populate(individuals, population):
+        """Insere os indivíduos novos (não repetidos) na população, de tamanho limitado."""
+        known = {packed for _, packed in population}
+        for objective, packed in individuals:
+            if packed in known:
+                continue
+            if len(population) < population_size:
+                population.append((objective, packed))
+            else:
+                worst = min(range(len(population)), key=lambda position: population[position][0])
+                if objective <= population[worst][0]:
+                    continue
+                known.discard(population[worst][1])
+                population[worst] = (objective, packed)
+            known.add(packed)
+
+    try:
+        next_index = population_size
+        initial = _evaluate(instance_data, build(list(range(population_size))))
+        consider(initial, 0)
+        population = []
+        populate(initial, population)
+
+        generation = 0
+        stagnation = 0
+        restarts = 0
+        while generation < max_generations:
+            if budget.exhausted() or (target_value is not None and best_objective >= target_value):
+                break
+            generation += 1
+
+            if len(population) < 2:
+                # Todos os indivíduos iguais: completa a população com novas construções
+                indices = list(range(next_index, next_index + population_size - len(population)))
+                next_index += len(indices)
+                populate(_evaluate(instance_data, build(indices)), population)
+                if len(population) < 2:
+                    break
+
+            parent_pairs = []
+            for _ in range(offspring_per_generation):
+                first = _tournament(population, rng, tournament_size)
+                second = _tournament(population, rng, tournament_size, exclude=first)
+                parent_pairs.append((population[first][1], population[second][1]))
+
+            previous_best = best_objective
+            offspring = _evaluate(instance_data, breed(parent_pairs, generation))
+            consider(offspring, generation)
+            populate(offspring, population)
+
+            stagnation = 0 if best_objective > previous_best else stagnation + 1
+            if restart_generations is not None and stagnation >= restart_generations:
+                # Reinício: mantém a melhor solução e reconstrói o restante
+                indices = list(range(next_index, next_index + population_size - 1))
+                next_index += len(indices)
+                population = [(best_objective, best_packed)]
+                fresh = _evaluate(instance_data, build(indices))
+                consider(fresh, generation)
+                populate(fresh, population)
+                stagnation = 0
+                restarts += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    best_state = SolutionState(instance_data, SolutionBitset.from_bytes(num_items, best_packed).to_list())
+    return best_state.to_solution_dict({
+        'type': 'Memetico',
+        'population_size': population_size,
+        'max_generations': max_generations,
+        'generations': generation,
+        'offspring_per_generation': offspring_per_generation,
+        'mutation_rate': mutation_rate,
+        'restarts': restarts,
+        'seed': seed,
+        'num_workers': num_workers,
+        'best_generation': best_generation,
+        'elapsed': budget.elapsed(),
+    })
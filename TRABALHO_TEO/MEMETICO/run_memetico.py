@@ -0,0 +1,64 @@
+import sys
+import os
+import time
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for subdir in ('', 'CARROSSEL', 'DVGH', 'GRASP'):
+    sys.path.append(os.path.join(BASE_DIR, subdir))
+
+from memetic import memetic_algorithm
+from instance_catalog import InstanceCatalog
+
+# --- Parâmetros do Algoritmo Memético ---
+POPULATION_SIZE = 10            # Indivíduos na população
+MAX_GENERATIONS = 50            # Número máximo de gerações
+TIME_LIMIT = None               # Tempo máximo em segundos (None = sem limite)
+SEED = 0                        # Semente base (cada construção/filho deriva a sua)
+NUM_WORKERS = os.cpu_count()    # Processos usados para construir e refinar os filhos
+
+if __name__ == "__main__":
+    # Mude aqui para testar outras instâncias
+    target_directory = os.path.join(BASE_DIR, '.New Instances', 'O', '1000')
+    # Catálogo preguiçoso: só a instância usada abaixo é lida por completo
+    all_instances_in_O_1000 = InstanceCatalog(target_directory)
+
+    if all_instances_in_O_1000:
+
+        #Troque o valor dentro dos colchetes para alterar o arquivo acessado
+        instance_to_solve_memetic = all_instances_in_O_1000[0]
+
+        print(f"\n\n--- Preparando para resolver com o Algoritmo Memético ---")
+        print(f"Arquivo: {instance_to_solve_memetic['filepath']}")
+
+        print("\n" + "="*50)
+        print(f"Executando o Algoritmo Memético")
+        print(f"Parâmetros: População={POPULATION_SIZE}, Gerações={MAX_GENERATIONS}, Tempo máximo={TIME_LIMIT}, "
+              f"Semente={SEED}, Workers={NUM_WORKERS}")
+        print("="*50  + "\n")
+
+        start = time.time()
+        memetic_solution = memetic_algorithm(
+            instance_to_solve_memetic,
+            population_size=POPULATION_SIZE,
+            max_generations=MAX_GENERATIONS,
+            time_limit=TIME_LIMIT,
+            seed=SEED,
+            num_workers=NUM_WORKERS
+        )
+        end = time.time()
+
+        # --- Impressão do Resultado Final ---
+        params = memetic_solution['params']
+        print("\n--- Melhor Solução Encontrada pelo Algoritmo Memético ---")
+        print(f"Gerações: {params['generations']} (melhor solução na geração {params['best_generation']}, "
+              f"{params['restarts']} reinícios)")
+        print(f"Itens Selecionados (índices): {memetic_solution['selected_items_indices']}")
+        print(f"Número de Itens Selecionados: {len(memetic_solution['selected_items_indices'])}")
+        print(f"Peso Total: {memetic_solution['total_weight']} (Capacidade: {instance_to_solve_memetic['capacity']})")
+        print(f"Lucro Total dos Itens: {memetic_solution['total_profit']}")
+        print(f"Custo Total de Penalidades: {memetic_solution['total_forfeit_cost']}")
+        print(f"VALOR OBJETIVO (Lucro - Penalidades): {memetic_solution['objective_value']:.2f}")
+        print(f"Tempo decorrido: {end - start} segundos")
+        print("="*50  + "\n")
+    else:
+        print(f"Nenhuma instância carregada do diretório '{target_directory}'. Verifique o caminho ou o conteúdo do diretório.")
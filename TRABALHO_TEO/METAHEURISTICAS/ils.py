@@ -1,41 +1,61 @@
-from busca_local import _local_search_swap_1_0_optimized
-from utilities import calculate_solution_value, calculate_solution_weight, _perturbation
+from busca_local import get_state_neighborhoods
+from search_budget import SearchBudget
+from solution_state import SolutionState
+from utilities import _perturbation_state
 
-def iterated_local_search_simple(initial_solution, instance_data, max_iter_ils=50, perturbation_strength=0.2):
+def iterated_local_search_simple(initial_solution, instance_data, max_iter_ils=50, perturbation_strength=0.2,
+                                 time_limit=None, max_evaluations=None, on_improvement=None, backend='python',
+                                 verify=False):
     """
     ILS Simples: Usa apenas a busca local de remoção (swap 1-0).
+
+    Além de 'max_iter_ils', a busca pode ser limitada por 'time_limit'
+    (segundos) e/ou 'max_evaluations' (chamadas da busca local); com algum
+    desses limites, max_iter_ils=None roda até o orçamento acabar.
+    'on_improvement' recebe cada nova melhor solução (ver SearchBudget).
+    'backend' escolhe a implementação das vizinhanças (ver get_state_neighborhoods).
+
+    O objetivo é mantido por deltas (SolutionState) na perturbação e na busca
+    local; com verify=True os totais são conferidos com o recálculo completo
+    a cada iteração (modo de depuração, O(s^2) por iteração).
     """
-    profits = instance_data['profits']
-    weights = instance_data['weights']
-    forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
+    local_search_swap_1_0 = get_state_neighborhoods(backend)['1-0']
+    budget = SearchBudget(time_limit, max_evaluations, on_improvement)
+    if max_iter_ils is None and not budget.is_limited:
+        raise ValueError("Informe max_iter_ils, time_limit ou max_evaluations.")
     
-    current_solution, _ = _local_search_swap_1_0_optimized(initial_solution['selected_items_indices'], instance_data)
+    current_state = SolutionState(instance_data, initial_solution['selected_items_indices'])
+    local_search_swap_1_0(current_state)
+    budget.count_evaluation()
+    if verify:
+        current_state.verify()
     
-    best_solution_so_far = current_solution
-    _, _, best_objective_so_far = calculate_solution_value(best_solution_so_far, profits, forfeit_costs_matrix)
+    best_state = current_state
+    best_objective_so_far = current_state.objective_value
+    budget.report(best_objective_so_far, best_state.items, iteration=0)
 
     print(f"ILS Simples - Obj. Inicial: {best_objective_so_far:.2f}")
 
-    for i in range(max_iter_ils):
-        perturbed_solution = _perturbation(best_solution_so_far, instance_data, strength=perturbation_strength)
-        
-        refined_solution, _ = _local_search_swap_1_0_optimized(perturbed_solution, instance_data)
+    total_iterations = max_iter_ils if max_iter_ils is not None else '-'
+    i = 0
+    while (max_iter_ils is None or i < max_iter_ils) and not budget.exhausted():
+        refined_state = _perturbation_state(best_state.copy(), strength=perturbation_strength)
+        local_search_swap_1_0(refined_state)
+        budget.count_evaluation()
+        if verify:
+            refined_state.verify()
         
-        _, _, refined_objective = calculate_solution_value(refined_solution, profits, forfeit_costs_matrix)
+        refined_objective = refined_state.objective_value
         
         if refined_objective > best_objective_so_far:
-            best_solution_so_far = refined_solution
+            best_state = refined_state
             best_objective_so_far = refined_objective
-            print(f"  Iter {i+1}/{max_iter_ils}: Melhoria encontrada! Novo Obj = {best_objective_so_far:.2f}")
+            budget.report(best_objective_so_far, best_state.items, iteration=i + 1)
+            print(f"  Iter {i+1}/{total_iterations}: Melhoria encontrada! Novo Obj = {best_objective_so_far:.2f}")
+        i += 1
 
-    final_weight = calculate_solution_weight(best_solution_so_far, weights)
-    final_profit, final_forfeit, final_objective = calculate_solution_value(best_solution_so_far, profits, forfeit_costs_matrix)
-    
-    return {
-        'selected_items_indices': sorted(best_solution_so_far),
-        'total_weight': final_weight,
-        'total_profit': final_profit,
-        'total_forfeit_cost': final_forfeit,
-        'objective_value': final_objective,
-        'params': {'type': 'ILS_Simple (Swap 1-0)'}
-    }
\ No newline at end of file
+    params = {'type': 'ILS_Simple (Swap 1-0)'}
+    if budget.is_limited or on_improvement is not None:
+        params['budget'] = dict(budget.summary(), iterations=i)
+
+    return best_state.to_solution_dict(params)
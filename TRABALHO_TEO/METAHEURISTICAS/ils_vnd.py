@@ -1,44 +1,113 @@
-from utilities import calculate_solution_value,_perturbation, calculate_solution_weight
-from METAHEURISTICAS.vnd import vnd
+from busca_local import resolve_backend
+from utilities import _perturbation_state
+from METAHEURISTICAS.vnd import vnd_on_state
+from neighborhood_profiler import NeighborhoodProfiler
+from parallel_neighborhoods import ParallelNeighborhoodEvaluator
+from search_budget import SearchBudget
+from solution_cache import SolutionCache
+from solution_state import SolutionState
 
-def iterated_local_search_vnd(initial_solution, instance_data, max_iter_ils=50, perturbation_strength=0.3):
+def _refine(state, backend, budget, verify, evaluator=None, profiler=None):
+    """
+    VND sobre o estado. Ao final os itens ficam em ordem crescente, como na
+    solução devolvida por vnd(), que é o ponto de partida da perturbação.
+    """
+    vnd_on_state(state, backend=backend, budget=budget, evaluator=evaluator, profiler=profiler)
+    state.items.sort()
+    if verify:
+        state.verify()
+
+def iterated_local_search_vnd(initial_solution, instance_data, max_iter_ils=50, perturbation_strength=0.3,
+                              time_limit=None, max_evaluations=None, on_improvement=None, backend='python',
+                              verify=False, num_workers=None, cache_size=None, profile=False):
     """
     ILS com VND que agora usa o VND otimizado.
+
+    Além de 'max_iter_ils', a busca pode ser limitada por 'time_limit'
+    (segundos) e/ou 'max_evaluations' (varreduras de vizinhança no VND); com
+    algum desses limites, max_iter_ils=None roda até o orçamento acabar. O
+    orçamento é compartilhado com o VND, que interrompe a descida em curso.
+    'on_improvement' recebe cada nova melhor solução (ver SearchBudget).
+    'backend' é repassado ao VND (ver get_state_neighborhoods).
+
+    O objetivo é mantido por deltas (SolutionState) na perturbação e no VND;
+    com verify=True os totais são conferidos com o recálculo completo a cada
+    iteração (modo de depuração, O(s^2) por iteração).
+    'num_workers' > 1 avalia a vizinhança 1-1 do VND em paralelo, com os
+    processos criados uma única vez para toda a busca; só vale para o
+    backend 'python' (ver vnd_on_state).
+
+    Com 'cache_size', as soluções perturbadas já refinadas ficam em um cache
+    LRU (SolutionCache) de até 'cache_size' entradas, indexado pelo hash de
+    Zobrist: quando a perturbação gera de novo um conjunto conhecido, o ótimo
+    local guardado é usado sem rodar o VND. O cache é opcional (padrão None,
+    desativado) porque muda a trajetória da busca em relação à versão sem
+    cache. Os contadores ficam em params['cache'].
+
+    profile=True acumula os contadores por vizinhança de todas as descidas
+    em params['profile'] (ver NeighborhoodProfiler).
     """
-    
-    profits = instance_data['profits']
-    weights = instance_data['weights']
-    forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
-    
+    budget = SearchBudget(time_limit, max_evaluations, on_improvement)
+    if max_iter_ils is None and not budget.is_limited:
+        raise ValueError("Informe max_iter_ils, time_limit ou max_evaluations.")
+    cache = SolutionCache(cache_size) if cache_size is not None else None
+    profiler = NeighborhoodProfiler() if profile else None
+    evaluator = None
+    if num_workers is not None and num_workers > 1 and resolve_backend(backend) == 'python':
+        evaluator = ParallelNeighborhoodEvaluator(instance_data, num_workers)
+    try:
+        best_state, i = _ils_vnd_loop(initial_solution, instance_data, max_iter_ils, perturbation_strength,
+                                      budget, backend, verify, evaluator, cache, profiler)
+    finally:
+        if evaluator is not None:
+            evaluator.close()
+
+    params = {'type': 'ILS_com_VND (Otimizado)'}
+    if budget.is_limited or on_improvement is not None:
+        params['budget'] = dict(budget.summary(), iterations=i)
+    if cache is not None:
+        params['cache'] = cache.stats()
+    if profiler is not None:
+        params['profile'] = profiler.summary()
+
+    return best_state.to_solution_dict(params)
+
+def _ils_vnd_loop(initial_solution, instance_data, max_iter_ils, perturbation_strength,
+                  budget, backend, verify, evaluator, cache, profiler=None):
+    """Laço principal do ILS-VND. Retorna (melhor estado, iterações executadas)."""
     #Busca local
-    current_solution = vnd(initial_solution['selected_items_indices'], instance_data)
+    current_state = SolutionState(instance_data, initial_solution['selected_items_indices'])
+    _refine(current_state, backend, budget, verify, evaluator, profiler)
     
-    best_solution_so_far = current_solution
-    _, _, best_objective_so_far = calculate_solution_value(best_solution_so_far['selected_items_indices'], profits, forfeit_costs_matrix)
+    best_state = current_state
+    best_objective_so_far = current_state.objective_value
     
     print(f"ILS com VND - Obj. Inicial: {best_objective_so_far:.2f}")
 
-    for i in range(max_iter_ils):
-        perturbed_solution = _perturbation(best_solution_so_far['selected_items_indices'], instance_data, strength=perturbation_strength)
-        
-        refined_solution = vnd(perturbed_solution, instance_data)
+    total_iterations = max_iter_ils if max_iter_ils is not None else '-'
+    i = 0
+    while (max_iter_ils is None or i < max_iter_ils) and not budget.exhausted():
+        refined_state = _perturbation_state(best_state.copy(), strength=perturbation_strength)
+        perturbed_hash = refined_state.zobrist_hash
+        cached = cache.get(perturbed_hash) if cache is not None else None
         
-        _, _, refined_objective = calculate_solution_value(refined_solution['selected_items_indices'], profits, forfeit_costs_matrix)
+        if cached is not None:
+            # Descida já feita a partir deste conjunto de itens
+            cached_items, refined_objective = cached
+        else:
+            _refine(refined_state, backend, budget, verify, evaluator, profiler)
+            refined_objective = refined_state.objective_value
+            # Descidas interrompidas pelo orçamento não são ótimos locais
+            if cache is not None and not budget.exhausted():
+                cache.put(perturbed_hash, refined_state.items, refined_objective)
+                cache.put(refined_state.zobrist_hash, refined_state.items, refined_objective)
         
         if refined_objective > best_objective_so_far:
-            best_solution_so_far = refined_solution
+            if cached is not None:
+                refined_state = SolutionState(instance_data, cached_items)
+            best_state = refined_state
             best_objective_so_far = refined_objective
-            print(f"   Iter {i+1}/{max_iter_ils}: Melhoria encontrada! Novo Obj = {best_objective_so_far:.2f}")
-
-    final_weight = calculate_solution_weight(best_solution_so_far['selected_items_indices'], weights)
-    final_profit, final_forfeit, final_objective = calculate_solution_value(best_solution_so_far['selected_items_indices'], profits, forfeit_costs_matrix)
-    items_indices = best_solution_so_far['selected_items_indices']
-
-    return {
-        'selected_items_indices': sorted(items_indices),
-        'total_weight': final_weight,
-        'total_profit': final_profit,
-        'total_forfeit_cost': final_forfeit,
-        'objective_value': final_objective,
-        'params': {'type': 'ILS_com_VND (Otimizado)'}
-    }
\ No newline at end of file
+            print(f"   Iter {i+1}/{total_iterations}: Melhoria encontrada! Novo Obj = {best_objective_so_far:.2f}")
+        i += 1
+
+    return best_state, i
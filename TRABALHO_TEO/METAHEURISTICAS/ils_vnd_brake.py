@@ -1,78 +1,85 @@
-from busca_local import (
-    _local_search_swap_0_1_optimized, 
-    _local_search_swap_1_0_optimized, 
-    _local_search_swap_1_1_optimized,
-    _local_search_swap_2_1_optimized_first_improvement,
-    
-)
-from utilities import calculate_solution_value,_perturbation, calculate_solution_weight
+from busca_local import get_state_neighborhoods
+from neighborhood_profiler import NeighborhoodProfiler
+from solution_state import SolutionState
+from utilities import _perturbation_state, get_forfeit_neighbors
 from CARROSSEL.build_carrosel import penalty_aware_greedy_constructor
 
-def local_search_vnd(solution_indices, instance_data):
+def local_search_vnd(solution_indices, instance_data, backend='python', profiler=None):
     """
     Variable Neighborhood Descent (VND) que agora usa as funções otimizadas.
+    Aceita uma lista de índices ou um SolutionState (que é modificado no lugar).
+    'backend' escolhe a implementação das vizinhanças (ver get_state_neighborhoods).
+    Com um NeighborhoodProfiler, cada varredura é contada e cronometrada.
     """
-    neighborhoods = [
-        _local_search_swap_1_0_optimized,
-        _local_search_swap_0_1_optimized,
-        _local_search_swap_1_1_optimized,
-        _local_search_swap_2_1_optimized_first_improvement,
-    ]
+    moves = get_state_neighborhoods(backend)
+    neighborhood_keys = ['1-0', '0-1', '1-1', '2-1-first']
+    if profiler is not None:
+        neighborhoods = [profiler.wrap(key, moves[key]) for key in neighborhood_keys]
+    else:
+        neighborhoods = [moves[key] for key in neighborhood_keys]
     
-    current_solution = solution_indices
+    if isinstance(solution_indices, SolutionState):
+        state = solution_indices
+    else:
+        state = SolutionState(instance_data, solution_indices)
+
     k = 0
     while k < len(neighborhoods):
-        new_solution, improved = neighborhoods[k](current_solution, instance_data)
+        improved = neighborhoods[k](state)
         
         if improved:
-            current_solution = new_solution
             k = 0
         else:
             k += 1
             #print("Vizinhança:", {k})
             
-    return current_solution
+    return list(state.items)
 
-def iterated_local_search_vnd(instance_data, max_iter_ils=50, perturbation_strength=0.3):
+def iterated_local_search_vnd(instance_data, max_iter_ils=50, perturbation_strength=0.3, backend='python',
+                              verify=False, profile=False):
     """
     ILS com VND que agora usa o VND otimizado.
+    'backend' é repassado ao local_search_vnd.
+    O objetivo é mantido por deltas (SolutionState); verify=True confere os
+    totais com o recálculo completo a cada iteração (modo de depuração).
+    profile=True acumula os contadores por vizinhança de todas as descidas
+    em params['profile'] (ver NeighborhoodProfiler).
     """
+    profiler = NeighborhoodProfiler() if profile else None
     
     profits = instance_data['profits']
     weights = instance_data['weights']
     forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
     
     current_solution = penalty_aware_greedy_constructor(
-        instance_data['num_items'], instance_data['capacity'], profits, weights, forfeit_costs_matrix
+        instance_data['num_items'], instance_data['capacity'], profits, weights, forfeit_costs_matrix,
+        forfeit_neighbors=get_forfeit_neighbors(instance_data)
     )
 
-    current_solution = local_search_vnd(current_solution, instance_data)
+    current_state = SolutionState(instance_data, current_solution)
+    local_search_vnd(current_state, instance_data, backend=backend, profiler=profiler)
+    if verify:
+        current_state.verify()
     
-    best_solution_so_far = current_solution
-    _, _, best_objective_so_far = calculate_solution_value(best_solution_so_far, profits, forfeit_costs_matrix)
+    best_state = current_state
+    best_objective_so_far = current_state.objective_value
     
     print(f"ILS com VND - Obj. Inicial: {best_objective_so_far:.2f}")
 
     for i in range(max_iter_ils):
-        perturbed_solution = _perturbation(best_solution_so_far, instance_data, strength=perturbation_strength)
+        refined_state = _perturbation_state(best_state.copy(), strength=perturbation_strength)
+        local_search_vnd(refined_state, instance_data, backend=backend, profiler=profiler)
+        if verify:
+            refined_state.verify()
         
-        refined_solution = local_search_vnd(perturbed_solution, instance_data)
-        
-        _, _, refined_objective = calculate_solution_value(refined_solution, profits, forfeit_costs_matrix)
+        refined_objective = refined_state.objective_value
         
         if refined_objective > best_objective_so_far:
-            best_solution_so_far = refined_solution
+            best_state = refined_state
             best_objective_so_far = refined_objective
             print(f"   Iter {i+1}/{max_iter_ils}: Melhoria encontrada! Novo Obj = {best_objective_so_far:.2f}")
 
-    final_weight = calculate_solution_weight(best_solution_so_far, weights)
-    final_profit, final_forfeit, final_objective = calculate_solution_value(best_solution_so_far, profits, forfeit_costs_matrix)
-
-    return {
-        'selected_items_indices': sorted(best_solution_so_far),
-        'total_weight': final_weight,
-        'total_profit': final_profit,
-        'total_forfeit_cost': final_forfeit,
-        'objective_value': final_objective,
-        'params': {'type': 'ILS_com_VND (Otimizado)'}
-    }
\ No newline at end of file
+    params = {'type': 'ILS_com_VND (Otimizado)'}
+    if profiler is not None:
+        params['profile'] = profiler.summary()
+    return best_state.to_solution_dict(params)
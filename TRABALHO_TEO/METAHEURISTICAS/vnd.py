@@ -1,49 +1,105 @@
-from busca_local import (
-    _local_search_swap_0_1_optimized,
-    _local_search_swap_1_0_optimized,
-    _local_search_swap_1_1_optimized,
-    _local_search_swap_2_1_optimized,
-    _local_search_swap_2_1_optimized_first_improvement,
-)
-from utilities import calculate_solution_value, calculate_solution_weight
-
-def vnd(solution_indices, instance_data):
+from busca_local import get_state_neighborhoods, resolve_backend
+from neighborhood_profiler import NeighborhoodProfiler
+from parallel_neighborhoods import ParallelNeighborhoodEvaluator
+from search_budget import SearchBudget
+from solution_state import SolutionState
+
+def vnd_on_state(state, backend='python', budget=None, evaluator=None, full_2_1=False, profiler=None):
     """
-    Variable Neighborhood Descent (VND) que agora usa as funções otimizadas.
+    Executa o VND diretamente sobre um SolutionState, modificando-o no lugar.
+    'backend' escolhe a implementação das vizinhanças (ver get_state_neighborhoods).
+    Com um SearchBudget, cada varredura conta como uma avaliação, a descida
+    para quando o orçamento acaba e cada melhoria é informada ao orçamento.
+    Com um ParallelNeighborhoodEvaluator ('evaluator') e o backend 'python',
+    as varreduras 1-1 e 2-1 completas usam vários processos (mesmos
+    movimentos); com 'numpy' e 'numba' o evaluator é ignorado e valem as
+    varreduras vetorizadas/compiladas do backend. full_2_1=True
+    usa o 2-1 completo no lugar do 2-1 com listas de candidatos.
+    Com um NeighborhoodProfiler, cada varredura é contada e cronometrada.
     """
-    neighborhoods = [
-        _local_search_swap_1_0_optimized,
-        _local_search_swap_0_1_optimized,
-        _local_search_swap_1_1_optimized,
-        #_local_search_swap_2_1_optimized,
-        # _local_search_swap_2_1_optimized_first_improvement,
+    moves = get_state_neighborhoods(backend)
+    if evaluator is not None and resolve_backend(backend) == 'python':
+        moves.update(evaluator.neighborhoods())
+    neighborhood_keys = [
+        '1-0',
+        '0-1',
+        '1-1',
+        '2-1' if full_2_1 else '2-1-candidates',
+        #'2-1',
+        # '2-1-first',
     ]
+    if profiler is not None:
+        neighborhoods = [profiler.wrap(key, moves[key]) for key in neighborhood_keys]
+    else:
+        neighborhoods = [moves[key] for key in neighborhood_keys]
     
-    current_solution = solution_indices
+    if budget is not None:
+        budget.report(state.objective_value, state.items)
+
     k = 0
     while k < len(neighborhoods):
-        new_solution, improved = neighborhoods[k](current_solution, instance_data)
+        if budget is not None and budget.exhausted():
+            break
+        improved = neighborhoods[k](state)
+        if budget is not None:
+            budget.count_evaluation()
+            if improved:
+                budget.report(state.objective_value, state.items)
         
         if improved:
-            current_solution = new_solution
             k = 0
         else:
             k += 1
             #print(f"Vizinhança: ", {k})
+    return state
+
+def vnd(solution_indices, instance_data, backend='python', time_limit=None, max_evaluations=None,
+        on_improvement=None, budget=None, verify=False, num_workers=None, full_2_1=False, profile=False):
+    """
+    Variable Neighborhood Descent (VND) que agora usa as funções otimizadas.
+    Aceita uma lista de índices ou um SolutionState (que é modificado no lugar).
+
+    'time_limit' (segundos) e 'max_evaluations' limitam a descida, que então
+    devolve a melhor solução alcançada até o fim do orçamento; 'on_improvement'
+    recebe cada nova melhor solução (ver SearchBudget). Um 'budget' já criado
+    pode ser passado no lugar desses três argumentos (usado pelo ILS-VND).
+
+    Os valores finais vêm do estado incremental; verify=True os confere com o
+    recálculo completo (modo de depuração).
+
+    'num_workers' > 1 avalia as vizinhanças 1-1 e 2-1 em paralelo (ver
+    ParallelNeighborhoodEvaluator), com o mesmo resultado da versão sequencial;
+    só vale para o backend 'python' (os demais ignoram 'num_workers').
+    full_2_1=True troca o 2-1 com listas de candidatos pelo 2-1 completo.
+
+    profile=True registra, por vizinhança, chamadas, melhorias, tamanho das
+    vizinhanças varridas e tempo acumulado em params['profile'] (ver
+    NeighborhoodProfiler).
+    """
+    if budget is None and (time_limit is not None or max_evaluations is not None
+                           or on_improvement is not None):
+        budget = SearchBudget(time_limit, max_evaluations, on_improvement)
+
+    if isinstance(solution_indices, SolutionState):
+        state = solution_indices
+    else:
+        state = SolutionState(instance_data, solution_indices)
+
+    profiler = NeighborhoodProfiler() if profile else None
+    if num_workers is not None and num_workers > 1 and resolve_backend(backend) == 'python':
+        with ParallelNeighborhoodEvaluator(instance_data, num_workers) as evaluator:
+            vnd_on_state(state, backend=backend, budget=budget, evaluator=evaluator, full_2_1=full_2_1,
+                         profiler=profiler)
+    else:
+        vnd_on_state(state, backend=backend, budget=budget, full_2_1=full_2_1, profiler=profiler)
+    if verify:
+        state.verify()
+
+    params = {'type': 'VND'}
+    if budget is not None:
+        params['budget'] = budget.summary()
+    if profiler is not None:
+        params['profile'] = profiler.summary()
+
+    return state.to_solution_dict(params)
 
-    # Calcula os valores finais da solução
-    final_weight = calculate_solution_weight(current_solution, instance_data['weights'])
-    final_profit, final_forfeit_cost, objective_value = calculate_solution_value(
-        current_solution,
-        instance_data['profits'],
-        instance_data['forfeit_costs_matrix']
-    )
-
-    return {
-        'selected_items_indices': sorted(current_solution),
-        'total_weight': final_weight,
-        'total_profit': final_profit,
-        'total_forfeit_cost': final_forfeit_cost,
-        'objective_value': objective_value,
-        'params': {'type': 'VND'}
-    }
\ No newline at end of file
@@ -0,0 +1,126 @@
+import random
+import sys
+
+from busca_local import (_local_search_swap_0_1_state, _local_search_swap_1_1_state, _local_search_swap_2_1_state,
+                         available_backends, get_state_neighborhoods)
+from solution_state import SolutionState
+from utilities import SparseForfeitMatrix, calculate_solution_value
+from METAHEURISTICAS.vnd import vnd
+
+# Conferência dos backends de vizinhanças: em instâncias geradas, todos os
+# backends disponíveis devem escolher os mesmos movimentos (mesma solução, na
+# mesma ordem) e chegar aos mesmos objetivos que o backend 'python', cujas
+# varreduras com poda também são comparadas às varreduras completas.
+# Uso: python backend_conformance.py [num_instancias]
+
+NEIGHBORHOOD_KEYS = ('1-0', '0-1', '1-1', '2-1', '2-1-first', '2-1-candidates')
+
+# Varreduras completas, sem poda: o backend 'python' (com poda) deve escolher
+# os mesmos movimentos
+UNPRUNED_NEIGHBORHOODS = {
+    '0-1': _local_search_swap_0_1_state,
+    '1-1': _local_search_swap_1_1_state,
+    '2-1': _local_search_swap_2_1_state,
+}
+
+def generate_instance(num_items, num_forfeits, seed, sparse=False):
+    """
+    Gera uma instância aleatória no formato de read_kpf_instance, com pares
+    repetidos (o último custo vale) como nas instâncias do diretório O.
+    """
+    rng = random.Random(seed)
+    profits = [rng.randint(1, 60) for _ in range(num_items)]
+    weights = [rng.randint(1, 40) for _ in range(num_items)]
+    capacity = sum(weights) // 3
+
+    if sparse:
+        forfeit_costs_matrix = SparseForfeitMatrix(num_items)
+    else:
+        forfeit_costs_matrix = [[0] * num_items for _ in range(num_items)]
+    for _ in range(num_forfeits):
+        id1, id2 = rng.sample(range(num_items), 2)
+        cost = rng.randint(2, 15)
+        forfeit_costs_matrix[id1][id2] = cost
+        forfeit_costs_matrix[id2][id1] = cost
+
+    return {
+        'num_items': num_items,
+        'num_forfeits': num_forfeits,
+        'capacity': capacity,
+        'profits': profits,
+        'weights': weights,
+        'forfeit_costs_matrix': forfeit_costs_matrix,
+        'filepath': f'<gerada seed={seed}>'
+    }
+
+def random_solution(instance_data, rng):
+    """Solução viável aleatória: itens em ordem aleatória enquanto couberem."""
+    order = list(range(instance_data['num_items']))
+    rng.shuffle(order)
+    solution = []
+    total_weight = 0
+    for item_idx in order:
+        if total_weight + instance_data['weights'][item_idx] <= instance_data['capacity']:
+            solution.append(item_idx)
+            total_weight += instance_data['weights'][item_idx]
+    return solution
+
+def _apply_move(instance_data, solution, backend, key):
+    state = SolutionState(instance_data, solution)
+    if backend == 'unpruned':
+        improved = UNPRUNED_NEIGHBORHOODS[key](state)
+    else:
+        improved = get_state_neighborhoods(backend)[key](state)
+    return improved, list(state.items), state.objective_value
+
+def check_backends(backends=None, num_instances=5, starts_per_instance=3, verbose=True):
+    """
+    Compara os backends com o de referência ('python'). Para cada instância
+    gerada (densa e esparsa) e solução inicial aleatória, aplica um movimento
+    de cada vizinhança e roda o VND completo.
+    Retorna a lista de divergências encontradas (vazia se todos conferem).
+    """
+    if backends is None:
+        backends = [backend for backend in available_backends() if backend != 'python']
+    mismatches = []
+
+    for seed in range(num_instances):
+        num_items = 40 + 15 * seed
+        for sparse in (False, True):
+            instance_data = generate_instance(num_items, 3 * num_items, seed, sparse=sparse)
+            rng = random.Random(seed)
+            for start in range(starts_per_instance):
+                solution = random_solution(instance_data, rng)
+                label = f"seed={seed} n={num_items} {'esparsa' if sparse else 'densa'} início={start}"
+
+                for key in NEIGHBORHOOD_KEYS:
+                    reference = _apply_move(instance_data, solution, 'python', key)
+                    _, items, objective = reference
+                    if objective != calculate_solution_value(items, instance_data['profits'],
+                                                             instance_data['forfeit_costs_matrix'])[2]:
+                        mismatches.append(f"{label}: objetivo incremental incorreto em {key}")
+                    for backend in backends:
+                        if _apply_move(instance_data, solution, backend, key) != reference:
+                            mismatches.append(f"{label}: {backend} diverge em {key}")
+                    if key in UNPRUNED_NEIGHBORHOODS:
+                        if _apply_move(instance_data, solution, 'unpruned', key) != reference:
+                            mismatches.append(f"{label}: a poda muda o movimento em {key}")
+
+                reference = vnd(solution, instance_data, backend='python')
+                for backend in backends:
+                    if vnd(solution, instance_data, backend=backend) != reference:
+                        mismatches.append(f"{label}: {backend} diverge no VND")
+
+        if verbose:
+            print(f"  seed {seed}: {len(mismatches)} divergências até aqui")
+    return mismatches
+
+if __name__ == "__main__":
+    num_instances = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    backends = [backend for backend in available_backends() if backend != 'python']
+    print(f"Backends comparados com 'python': {backends or 'nenhum (instale numpy/numba)'}")
+    mismatches = check_backends(backends, num_instances=num_instances)
+    for mismatch in mismatches:
+        print(f"  DIVERGÊNCIA: {mismatch}")
+    print("OK" if not mismatches else f"{len(mismatches)} divergências.")
+    sys.exit(1 if mismatches else 0)
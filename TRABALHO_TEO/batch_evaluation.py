@@ -0,0 +1,129 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele a avaliação em lote usa laços em Python
+    np = None
+
+from utilities import get_forfeit_neighbors, get_forfeit_pairs
+
+# ----------------------------------------------------------------------------------
+# AVALIAÇÃO EM LOTE DE SOLUÇÕES
+# Avalia muitas soluções de uma vez, representadas como uma matriz booleana
+# X (soluções x itens): lucro = X·p, peso = X·w e penalidade = x^T F x / 2,
+# calculada sobre os pares canônicos (i < j) de get_forfeit_pairs como
+# (X[:, i] & X[:, j]) · custos. Sem NumPy, cada solução é avaliada pelos
+# vizinhos de penalidade, em O(soma dos graus).
+# ----------------------------------------------------------------------------------
+
+# Elementos da matriz (soluções x pares) avaliados de uma só vez
+_MAX_PAIR_MATRIX_ENTRIES = 1 << 24
+
+BATCH_FIELDS = ('total_profit', 'total_weight', 'total_forfeit_cost', 'objective_value', 'feasible')
+
+def unpack_bitsets(packed_rows, num_items):
+    """
+    Converte bitsets empacotados (bytes por solução; o item i é o bit i % 8 do
+    byte i // 8) em listas de índices.
+    """
+    solutions = []
+    for row in packed_rows:
+        row = bytes(row)
+        solutions.append([byte_idx * 8 + bit
+                          for byte_idx, byte in enumerate(row) if byte
+                          for bit in range(8) if byte >> bit & 1 and byte_idx * 8 + bit < num_items])
+    return solutions
+
+def solutions_to_matrix(solutions, num_items):
+    """Matriz booleana (soluções x itens) a partir de listas de índices."""
+    if np is None:
+        raise ImportError("A matriz de soluções requer o pacote numpy instalado.")
+    matrix = np.zeros((len(solutions), num_items), dtype=bool)
+    for row, solution_indices in enumerate(solutions):
+        matrix[row, list(solution_indices)] = True
+    return matrix
+
+def _as_matrix(instance_data, solutions, packed):
+    num_items = instance_data['num_items']
+    if len(solutions) == 0:
+        return np.zeros((0, num_items), dtype=bool)
+    if packed:
+        if isinstance(solutions, np.ndarray):
+            packed_rows = solutions.astype(np.uint8, copy=False)
+        else:
+            packed_rows = np.array([np.frombuffer(bytes(row), dtype=np.uint8) for row in solutions])
+        if packed_rows.ndim != 2 or packed_rows.shape[1] * 8 < num_items:
+            raise ValueError(f"Bitsets empacotados devem ter forma (soluções, {(num_items + 7) // 8}).")
+        return np.unpackbits(packed_rows, axis=1, count=num_items, bitorder='little').astype(bool)
+    if isinstance(solutions, np.ndarray) and solutions.ndim == 2:
+        if solutions.shape[1] != num_items:
+            raise ValueError(f"A matriz de soluções deve ter {num_items} colunas (uma por item), "
+                             f"recebidas {solutions.shape[1]}.")
+        return solutions.astype(bool, copy=False)
+    return solutions_to_matrix(solutions, num_items)
+
+def _evaluate_batch_numpy(instance_data, solutions, packed):
+    matrix = _as_matrix(instance_data, solutions, packed)
+    profits = np.asarray(instance_data['profits'])
+    weights = np.asarray(instance_data['weights'])
+    first, second, costs = (np.frombuffer(values, dtype=np.int64) for values in get_forfeit_pairs(instance_data))
+
+    total_profit = matrix @ profits
+    total_weight = matrix @ weights
+    total_forfeit_cost = np.zeros(len(matrix), dtype=np.int64)
+    if len(costs):
+        rows_per_chunk = max(1, _MAX_PAIR_MATRIX_ENTRIES // len(costs))
+        for begin in range(0, len(matrix), rows_per_chunk):
+            chunk = matrix[begin:begin + rows_per_chunk]
+            total_forfeit_cost[begin:begin + rows_per_chunk] = (chunk[:, first] & chunk[:, second]) @ costs
+    return {
+        'total_profit': total_profit,
+        'total_weight': total_weight,
+        'total_forfeit_cost': total_forfeit_cost,
+        'objective_value': total_profit - total_forfeit_cost,
+        'feasible': total_weight <= instance_data['capacity'],
+    }
+
+def _evaluate_batch_python(instance_data, solutions, packed):
+    num_items = instance_data['num_items']
+    if packed:
+        solutions = unpack_bitsets(solutions, num_items)
+    profits = instance_data['profits']
+    weights = instance_data['weights']
+    neighbors = get_forfeit_neighbors(instance_data)
+    results = {field: [] for field in BATCH_FIELDS}
+
+    for solution_indices in solutions:
+        solution_set = set(solution_indices)
+        profit = sum(profits[item_idx] for item_idx in solution_set)
+        weight = sum(weights[item_idx] for item_idx in solution_set)
+        forfeit_cost = sum(cost for item_idx in solution_set for neighbor_idx, cost in neighbors[item_idx]
+                           if item_idx < neighbor_idx and neighbor_idx in solution_set)
+        results['total_profit'].append(profit)
+        results['total_weight'].append(weight)
+        results['total_forfeit_cost'].append(forfeit_cost)
+        results['objective_value'].append(profit - forfeit_cost)
+        results['feasible'].append(weight <= instance_data['capacity'])
+    return results
+
+def evaluate_batch(instance_data, solutions, packed=False):
+    """
+    Avalia várias soluções de uma vez.
+
+    Args:
+        instance_data (dict): Instância lida por read_kpf_instance.
+        solutions: As soluções, em um destes formatos:
+            - lista de listas de índices (como 'selected_items_indices');
+            - matriz booleana NumPy (soluções x itens);
+            - com packed=True, bitsets empacotados: um bytes/bytearray (ou
+              linha de uma matriz uint8) por solução, com o item i no bit
+              i % 8 do byte i // 8 (numpy.packbits com bitorder='little').
+        packed (bool): Se as soluções vêm como bitsets empacotados.
+
+    Returns:
+        dict: 'total_profit', 'total_weight', 'total_forfeit_cost',
+              'objective_value' e 'feasible' (peso <= capacidade), com um
+              valor por solução: arrays NumPy se o NumPy estiver instalado,
+              listas caso contrário.
+    """
+    if np is not None:
+        return _evaluate_batch_numpy(instance_data, solutions, packed)
+    return _evaluate_batch_python(instance_data, solutions, packed)
@@ -0,0 +1,276 @@
+import argparse
+import contextlib
+import csv
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+for subdir in ('', 'CARROSSEL', 'DVGH', 'EXATO', 'GRASP', 'MEMETICO'):
+    sys.path.append(os.path.join(BASE_DIR, subdir))
+
+from branch_and_bound import branch_and_bound
+from batch_evaluation import evaluate_batch
+from busca_local import BACKENDS
+from instance_catalog import load_instance_cached
+from build_carrosel import penalty_aware_greedy_construction
+from local_carrossel import carousel_local_search
+from dvgh import dynamic_value_greedy_heuristic_kpf
+from grasp import grasp
+from memetic import memetic_algorithm
+from reactive_grasp import reactive_grasp
+from trace_recorder import TraceRecorder
+from METAHEURISTICAS.ils import iterated_local_search_simple
+from METAHEURISTICAS.vnd import vnd
+from METAHEURISTICAS.ils_vnd import iterated_local_search_vnd
+
+ALGORITHMS = ('dvgh', 'greedy', 'carousel', 'ils', 'vnd', 'ils_vnd', 'grasp', 'reactive_grasp', 'memetic', 'exact')
+# O branch-and-bound ('exact') só roda se pedido: é exponencial no pior caso
+DEFAULT_ALGORITHMS = ALGORITHMS[:-1]
+
+# 'cpu_time' mede apenas o processo principal (não inclui os workers do GRASP).
+# 'upper_bound' só é preenchido pelo branch-and-bound ('exact'): é igual ao
+# objetivo quando a otimalidade foi provada. 'verified' só é preenchido com
+# --verify (totais conferidos por avaliação em lote).
+RESULT_FIELDS = [
+    'instance', 'num_items', 'capacity', 'algorithm', 'repetition', 'seed',
+    'objective_value', 'total_profit', 'total_forfeit_cost', 'total_weight',
+    'num_selected', 'wall_time', 'cpu_time', 'iterations', 'upper_bound', 'verified',
+]
+
+def _ils_iterations(solution, args):
+    """Iterações executadas pelo ILS (menos que max_iter_ils se o orçamento acabou)."""
+    budget = solution['params'].get('budget')
+    return budget['iterations'] if budget is not None else args.max_iter_ils
+
+def _run_algorithm(name, instance_data, seed, args, initial_solution, on_improvement=None):
+    """
+    Executa um algoritmo e retorna (solução, iterações). Os algoritmos que partem
+    de uma solução inicial usam a construção gulosa consciente de penalidades.
+    'on_improvement' é repassado aos algoritmos que informam suas melhorias.
+    """
+    random.seed(seed)
+    if name == 'dvgh':
+        return dynamic_value_greedy_heuristic_kpf(instance_data), None
+    if name == 'greedy':
+        return penalty_aware_greedy_construction(instance_data), None
+    if name == 'carousel':
+        iterations = int(round(args.alpha * len(initial_solution['selected_items_indices'])))
+        solution = carousel_local_search(initial_solution['selected_items_indices'], instance_data,
+                                         args.alpha, args.beta, on_improvement=on_improvement)
+        return solution, iterations
+    if name == 'ils':
+        solution = iterated_local_search_simple(initial_solution, instance_data,
+                                                max_iter_ils=args.max_iter_ils,
+                                                perturbation_strength=args.perturbation_strength,
+                                                time_limit=args.time_limit,
+                                                max_evaluations=args.max_evaluations,
+                                                on_improvement=on_improvement, backend=args.backend)
+        return solution, _ils_iterations(solution, args)
+    if name == 'vnd':
+        return vnd(initial_solution['selected_items_indices'], instance_data,
+                   time_limit=args.time_limit, max_evaluations=args.max_evaluations,
+                   on_improvement=on_improvement, backend=args.backend, num_workers=args.workers), None
+    if name == 'ils_vnd':
+        solution = iterated_local_search_vnd(initial_solution, instance_data,
+                                             max_iter_ils=args.max_iter_ils,
+                                             perturbation_strength=args.perturbation_strength,
+                                             time_limit=args.time_limit,
+                                             max_evaluations=args.max_evaluations,
+                                             on_improvement=on_improvement,
+                                             backend=args.backend, num_workers=args.workers,
+                                             cache_size=args.ils_cache_size or None)
+        return solution, _ils_iterations(solution, args)
+    if name == 'grasp':
+        solution = grasp(instance_data, max_iterations=args.grasp_iterations, rcl_size=args.rcl_size,
+                         seed=seed, num_workers=args.workers, backend=args.backend,
+                         on_improvement=on_improvement)
+        return solution, args.grasp_iterations
+    if name == 'reactive_grasp':
+        solution = reactive_grasp(instance_data, max_iterations=args.grasp_iterations, seed=seed,
+                                  rcl_sizes=args.rcl_sizes, backend=args.backend, time_limit=args.time_limit,
+                                  on_improvement=on_improvement)
+        return solution, solution['params']['iterations']
+    if name == 'memetic':
+        solution = memetic_algorithm(instance_data, population_size=args.population_size,
+                                     max_generations=args.generations, seed=seed, num_workers=args.workers,
+                                     backend=args.backend, time_limit=args.time_limit,
+                                     on_improvement=on_improvement)
+        return solution, solution['params']['generations']
+    if name == 'exact':
+        solution = branch_and_bound(instance_data, time_limit=args.exact_time_limit,
+                                    node_limit=args.exact_node_limit, on_improvement=on_improvement)
+        return solution, solution['params']['nodes']
+    raise ValueError(f"Algoritmo desconhecido: '{name}'")
+
+def _save_trace(recorder, solution, wall_time, trace_dir):
+    """
+    Grava o traço da execução em 'trace_dir'. Algoritmos construtivos (sem
+    melhorias informadas) ficam com um único evento: a solução final.
+    """
+    if not recorder.events:
+        recorder.record(wall_time, float(solution['objective_value']))
+    os.makedirs(trace_dir, exist_ok=True)
+    instance_name = os.path.splitext(recorder.instance)[0]
+    recorder.save(os.path.join(trace_dir, f"{instance_name}__{recorder.algorithm}__{recorder.seed}.json"))
+
+def _verify_results(instance_data, rows, solutions):
+    """
+    Recalcula, em uma única avaliação em lote, os totais de todas as soluções
+    de uma instância e preenche 'verified' em cada linha (viável e com os
+    mesmos totais informados pelo algoritmo).
+    """
+    evaluation = evaluate_batch(instance_data, solutions)
+    for position, row in enumerate(rows):
+        expected = (int(evaluation['total_profit'][position]), int(evaluation['total_forfeit_cost'][position]),
+                    int(evaluation['total_weight'][position]))
+        reported = (row['total_profit'], row['total_forfeit_cost'], row['total_weight'])
+        # Soluções vazias da DVGH informam objetivo -inf: só os totais são conferidos
+        objective_ok = (row['objective_value'] == float('-inf')
+                        or row['objective_value'] == float(evaluation['objective_value'][position]))
+        row['verified'] = bool(evaluation['feasible'][position]) and expected == reported and objective_ok
+        if not row['verified']:
+            print(f"  DIVERGÊNCIA: {row['instance']} | {row['algorithm']} | seed {row['seed']}: "
+                  f"(lucro, penalidade, peso) informados {reported}, recalculados {expected}")
+
+def run_benchmark(instance_paths, algorithms, seeds, args):
+    """
+    Roda todas as combinações (instância, algoritmo, semente) e retorna uma
+    lista de dicionários com os campos de RESULT_FIELDS.
+    """
+    results = []
+    for filepath in instance_paths:
+        instance_data = load_instance_cached(filepath, sparse=args.sparse, cache_dir=args.cache_dir)
+        initial_solution = None
+        if any(name in ('carousel', 'ils', 'vnd', 'ils_vnd') for name in algorithms):
+            initial_solution = penalty_aware_greedy_construction(instance_data)
+        instance_rows, instance_solutions = [], []
+
+        for name in algorithms:
+            for repetition, seed in enumerate(seeds):
+                recorder = None
+                if args.trace_dir is not None:
+                    recorder = TraceRecorder(name, instance=os.path.basename(filepath), seed=seed)
+                output = io.StringIO()
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+                with contextlib.redirect_stdout(sys.stdout if args.verbose else output):
+                    solution, iterations = _run_algorithm(name, instance_data, seed, args, initial_solution,
+                                                          on_improvement=recorder)
+                cpu_time = time.process_time() - cpu_start
+                wall_time = time.perf_counter() - wall_start
+                if recorder is not None:
+                    _save_trace(recorder, solution, wall_time, args.trace_dir)
+
+                row = {
+                    'instance': os.path.basename(filepath),
+                    'num_items': instance_data['num_items'],
+                    'capacity': int(instance_data['capacity']),
+                    'algorithm': name,
+                    'repetition': repetition,
+                    'seed': seed,
+                    'objective_value': float(solution['objective_value']),
+                    'total_profit': int(solution['total_profit']),
+                    'total_forfeit_cost': int(solution['total_forfeit_cost']),
+                    'total_weight': int(solution['total_weight']),
+                    'num_selected': len(solution['selected_items_indices']),
+                    'wall_time': wall_time,
+                    'cpu_time': cpu_time,
+                    'iterations': iterations,
+                    'upper_bound': solution.get('params', {}).get('upper_bound'),
+                    'verified': None,
+                }
+                results.append(row)
+                instance_rows.append(row)
+                instance_solutions.append(solution['selected_items_indices'])
+                print(f"{row['instance']} | {name:<8} | seed {seed:<5} | "
+                      f"obj {row['objective_value']:>10.2f} | {wall_time:8.3f} s")
+        if args.verify:
+            _verify_results(instance_data, instance_rows, instance_solutions)
+    return results
+
+def write_results(results, output_path):
+    """Grava os resultados em CSV ou JSON, conforme a extensão do arquivo."""
+    if output_path.endswith('.json'):
+        with open(output_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Roda heurísticas do KPF em lote e grava os resultados (qualidade e tempo)."
+    )
+    parser.add_argument('instances', nargs='+',
+                        help="Arquivos ou padrões glob de instâncias (ex.: '.New Instances/O/500/*.txt').")
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=ALGORITHMS, default=list(DEFAULT_ALGORITHMS),
+                        help="Algoritmos a executar (padrão: todos, exceto 'exact').")
+    parser.add_argument('-r', '--repetitions', type=int, default=1,
+                        help="Repetições por combinação, com sementes 0..r-1 (ignorado se --seeds for usado).")
+    parser.add_argument('-s', '--seeds', nargs='+', type=int, help="Sementes explícitas.")
+    parser.add_argument('-o', '--output', default='benchmark_results.csv',
+                        help="Arquivo de saída (.csv ou .json).")
+    parser.add_argument('--sparse', action='store_true', default=None,
+                        help="Lê as instâncias na representação esparsa (padrão para instâncias binárias).")
+    parser.add_argument('--verify', action='store_true',
+                        help="Confere os totais de todas as soluções de cada instância (avaliação em lote).")
+    parser.add_argument('--trace-dir', default=None,
+                        help="Grava em cada execução o traço das melhorias (para time_to_target.py).")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Diretório de cache das instâncias lidas (evita reler arquivos não modificados).")
+    parser.add_argument('--max-iter-ils', type=int, default=100)
+    parser.add_argument('--perturbation-strength', type=float, default=0.3)
+    parser.add_argument('--ils-cache-size', type=int, default=0,
+                        help="Entradas do cache de soluções do ILS-VND (padrão: 0, sem cache).")
+    parser.add_argument('--backend', choices=BACKENDS + ('auto',), default='python',
+                        help="Backend das vizinhanças (ILS, ILS-VND, VND e GRASP).")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="Tempo máximo (s) de cada execução do ILS, ILS-VND, VND, GRASP Reativo e memético.")
+    parser.add_argument('--max-evaluations', type=int, default=None,
+                        help="Máximo de varreduras de vizinhança do ILS, ILS-VND e VND.")
+    parser.add_argument('--alpha', type=float, default=2.0, help="Alpha do carrossel.")
+    parser.add_argument('--beta', type=float, default=0.8, help="Beta do carrossel.")
+    parser.add_argument('--grasp-iterations', type=int, default=100)
+    parser.add_argument('--rcl-size', type=int, default=5)
+    parser.add_argument('--rcl-sizes', nargs='+', type=int, default=[1, 2, 3, 5, 8],
+                        help="Tamanhos de RCL sorteados pelo GRASP Reativo.")
+    parser.add_argument('--population-size', type=int, default=10, help="População do algoritmo memético.")
+    parser.add_argument('--generations', type=int, default=50, help="Máximo de gerações do algoritmo memético.")
+    parser.add_argument('--exact-time-limit', type=float, default=600,
+                        help="Tempo máximo (s) do branch-and-bound ('exact').")
+    parser.add_argument('--exact-node-limit', type=int, default=None,
+                        help="Máximo de nós explorados pelo branch-and-bound ('exact').")
+    parser.add_argument('--workers', type=int, default=None, help="Processos do GRASP e do memético (padrão: todos os núcleos) e da avaliação paralela do VND/ILS-VND (só com --backend python).")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Mostra a saída dos algoritmos.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    instance_paths = []
+    for pattern in args.instances:
+        matches = sorted(glob.glob(pattern)) or ([pattern] if os.path.isfile(pattern) else [])
+        instance_paths.extend(path for path in matches if os.path.isfile(path))
+    if not instance_paths:
+        print("Erro: nenhuma instância encontrada.")
+        return 1
+
+    seeds = args.seeds if args.seeds else list(range(args.repetitions))
+    results = run_benchmark(instance_paths, args.algorithms, seeds, args)
+    write_results(results, args.output)
+    print(f"\n{len(results)} execuções gravadas em '{args.output}'.")
+    if args.verify:
+        failures = sum(1 for row in results if not row['verified'])
+        print(f"Verificação: {len(results) - failures} de {len(results)} soluções conferem.")
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
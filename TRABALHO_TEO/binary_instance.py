@@ -0,0 +1,118 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy só é necessário para carregar; a conversão usa apenas a biblioteca padrão
+    np = None
+
+from utilities import KPF_BINARY_MAGIC, SparseForfeitMatrix, get_forfeit_csr, read_kpf_instance
+
+# Formato binário de instâncias do KPF (little-endian, todos os inteiros com 64 bits):
+#
+#   cabeçalho: magic (4 bytes) | versão (uint32) | nI | nP | kS | nnz
+#   profits[nI] | weights[nI] | indptr[nI + 1] | indices[nnz] | costs[nnz]
+#
+# As penalidades são gravadas já no formato CSR simétrico (get_forfeit_csr), ou
+# seja, cada par aparece nas linhas dos dois itens e pares repetidos no arquivo
+# texto ficam com o último custo, como na leitura do formato texto.
+# Como os blocos são contíguos e alinhados em 8 bytes, o carregamento cria
+# apenas visões NumPy sobre o mmap, sem cópia, e processos diferentes que
+# abrem o mesmo arquivo compartilham as mesmas páginas de memória.
+BINARY_FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sIqqqq')
+
+def write_kpf_binary_instance(instance_data, output_path):
+    """Grava uma instância (já lida) no formato binário."""
+    indptr, indices, costs = get_forfeit_csr(instance_data)
+    num_items = instance_data['num_items']
+
+    with open(output_path, 'wb') as f:
+        f.write(_HEADER.pack(KPF_BINARY_MAGIC, BINARY_FORMAT_VERSION, num_items,
+                             instance_data['num_forfeits'], instance_data['capacity'], len(indices)))
+        for values in (instance_data['profits'], instance_data['weights'], indptr, indices, costs):
+            block = array('q', (int(v) for v in values))
+            if sys.byteorder == 'big':
+                block.byteswap()
+            block.tofile(f)
+
+def convert_txt_to_binary(txt_path, output_path=None):
+    """
+    Converte um arquivo de instância no formato texto para o formato binário.
+    Se 'output_path' for omitido, usa o mesmo nome com a extensão '.kpfb'.
+    Retorna o caminho gravado.
+    """
+    if output_path is None:
+        output_path = os.path.splitext(txt_path)[0] + '.kpfb'
+    instance_data = read_kpf_instance(txt_path, sparse=True)
+    write_kpf_binary_instance(instance_data, output_path)
+    return output_path
+
+def read_kpf_binary_instance(filepath, sparse=True):
+    """
+    Carrega uma instância no formato binário via mmap.
+
+    O CSR das penalidades ('forfeit_csr') é formado por visões NumPy somente
+    leitura sobre o arquivo mapeado (sem cópia). Lucros e pesos são convertidos
+    para listas de int, como na leitura do texto, para que os valores das
+    soluções continuem sendo inteiros Python (serializáveis em JSON). A matriz
+    de penalidades é montada a partir do CSR: esparsa por padrão (com linhas
+    criadas sob demanda), ou densa com sparse=False.
+
+    Returns:
+        dict: O mesmo dicionário de read_kpf_instance, com 'forfeit_csr'.
+    """
+    if np is None:
+        raise ImportError("A leitura de instâncias binárias requer o pacote numpy instalado.")
+
+    with open(filepath, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, num_items, num_forfeits, capacity, nnz = _HEADER.unpack_from(mapped, 0)
+    if magic != KPF_BINARY_MAGIC:
+        raise ValueError(f"'{filepath}' não é uma instância KPF binária.")
+    if version != BINARY_FORMAT_VERSION:
+        raise ValueError(f"Versão {version} do formato binário não suportada em '{filepath}'.")
+
+    offset = _HEADER.size
+    views = []
+    for count in (num_items, num_items, num_items + 1, nnz, nnz):
+        views.append(np.frombuffer(mapped, dtype='<i8', count=count, offset=offset))
+        offset += 8 * count
+    profits, weights, indptr, indices, costs = views
+
+    # Monta a matriz a partir do CSR: a esparsa cria as linhas sob demanda
+    if sparse:
+        forfeit_costs_matrix = SparseForfeitMatrix.from_csr(indptr, indices, costs)
+    else:
+        forfeit_costs_matrix = [[0] * num_items for _ in range(num_items)]
+        indptr_list = indptr.tolist()
+        indices_list = indices.tolist()
+        costs_list = costs.tolist()
+        for item_idx in range(num_items):
+            row = forfeit_costs_matrix[item_idx]
+            for k in range(indptr_list[item_idx], indptr_list[item_idx + 1]):
+                row[indices_list[k]] = costs_list[k]
+
+    return {
+        'num_items': num_items,
+        'num_forfeits': num_forfeits,
+        'capacity': capacity,
+        'profits': profits.tolist(),
+        'weights': weights.tolist(),
+        'forfeit_costs_matrix': forfeit_costs_matrix,
+        'forfeit_csr': (indptr, indices, costs),
+        'filepath': filepath
+    }
+
+if __name__ == "__main__":
+    # Uso: python binary_instance.py arquivo.txt [arquivo2.txt ...]
+    if len(sys.argv) < 2:
+        print("Uso: python binary_instance.py <instancia.txt> [<instancia.txt> ...]")
+        sys.exit(1)
+    for txt_path in sys.argv[1:]:
+        binary_path = convert_txt_to_binary(txt_path)
+        print(f"  Convertida: {txt_path} -> {binary_path}")
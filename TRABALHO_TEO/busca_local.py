@@ -1,8 +1,24 @@
+import heapq
 import itertools
 
-from utilities import _calculate_item_penalty_with_solution, calculate_solution_weight
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele apenas o backend 'python' está disponível
+    np = None
+
+try:
+    from numba import njit
+except ImportError:  # Numba é opcional: sem ele o backend 'numba' fica indisponível
+    njit = None
+
+from solution_bitset import SolutionBitset
+from utilities import (_calculate_item_penalty_with_solution, _penalized_ratio, calculate_solution_weight,
+                       get_forfeit_csr, get_forfeit_neighbors)
 # ----------------------------------------------------------------------------------
 # FUNÇÕES DE BUSCA LOCAL OTIMIZADAS COM CÁLCULO DELTA
+# A solução fica em um SolutionBitset: os itens que saem no movimento são
+# retirados dele temporariamente (e devolvidos em seguida), em vez de criar
+# um novo conjunto 'solution_set - {item}' a cada candidato.
 # ----------------------------------------------------------------------------------
 
 def _local_search_swap_1_0_optimized(current_solution_indices, instance_data):
@@ -16,7 +32,7 @@ def _local_search_swap_1_0_optimized(current_solution_indices, instance_data):
     best_improvement = 1e-9  # Usar um pequeno epsilon para evitar trocas de valor zero
     best_item_to_remove = None
     
-    solution_set = set(current_solution_indices)
+    solution = SolutionBitset(instance_data['num_items'], current_solution_indices)
 
     for item_to_remove in current_solution_indices:
         # Delta de lucro: negativo, pois estamos perdendo o item
@@ -24,8 +40,9 @@ def _local_search_swap_1_0_optimized(current_solution_indices, instance_data):
         
         # Delta de penalidade: positivo, pois estamos removendo as penalidades
         # que 'item_to_remove' causava com o resto da solução.
-        temp_solution_set = solution_set - {item_to_remove}
-        penalty_gain = _calculate_item_penalty_with_solution(item_to_remove, temp_solution_set, forfeit_costs_matrix)
+        solution.discard(item_to_remove)
+        penalty_gain = _calculate_item_penalty_with_solution(item_to_remove, solution, forfeit_costs_matrix)
+        solution.add(item_to_remove)
         
         improvement = penalty_gain - profit_loss
         
@@ -54,16 +71,17 @@ def _local_search_swap_0_1_optimized(current_solution_indices, instance_data):
     best_item_to_add = None
     
     current_weight = calculate_solution_weight(current_solution_indices, weights)
-    solution_set = set(current_solution_indices)
+    solution = SolutionBitset(num_items, current_solution_indices)
+    in_solution = solution.flags
     
     for item_to_add in range(num_items):
-        if item_to_add not in solution_set:
+        if not in_solution[item_to_add]:
             if current_weight + weights[item_to_add] <= capacity:
                 # Delta de lucro: positivo
                 profit_gain = profits[item_to_add]
                 
                 # Delta de penalidade: negativo, pois estamos adicionando novas penalidades
-                penalty_loss = _calculate_item_penalty_with_solution(item_to_add, solution_set, forfeit_costs_matrix)
+                penalty_loss = _calculate_item_penalty_with_solution(item_to_add, solution, forfeit_costs_matrix)
                 
                 improvement = profit_gain - penalty_loss
                 
@@ -92,22 +110,23 @@ def _local_search_swap_1_1_optimized(current_solution_indices, instance_data):
     best_move = (None, None)  # (item_out, item_in)
     
     current_weight = calculate_solution_weight(current_solution_indices, weights)
-    solution_set = set(current_solution_indices)
+    solution = SolutionBitset(num_items, current_solution_indices)
+    in_solution = solution.flags
 
     for item_out in current_solution_indices:
         temp_weight = current_weight - weights[item_out]
         
-        # Efeito da remoção de 'item_out'
+        # Efeito da remoção de 'item_out' (retirado da solução até o fim do laço interno)
         profit_loss_out = profits[item_out]
-        temp_solution_set = solution_set - {item_out}
-        penalty_gain_out = _calculate_item_penalty_with_solution(item_out, temp_solution_set, forfeit_costs_matrix)
+        solution.discard(item_out)
+        penalty_gain_out = _calculate_item_penalty_with_solution(item_out, solution, forfeit_costs_matrix)
         
         for item_in in range(num_items):
-            if item_in not in solution_set:
+            if not in_solution[item_in] and item_in != item_out:
                 if temp_weight + weights[item_in] <= capacity:
                     # Efeito da adição de 'item_in' na solução temporária
                     profit_gain_in = profits[item_in]
-                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, temp_solution_set, forfeit_costs_matrix)
+                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, solution, forfeit_costs_matrix)
                     
                     # Melhoria total = (Ganhos - Perdas) da adição + (Ganhos - Perdas) da remoção
                     improvement = (profit_gain_in - penalty_loss_in) + (penalty_gain_out - profit_loss_out)
@@ -115,6 +134,7 @@ def _local_search_swap_1_1_optimized(current_solution_indices, instance_data):
                     if improvement > best_improvement:
                         best_improvement = improvement
                         best_move = (item_out, item_in)
+        solution.add(item_out)
 
     if best_move[0] is not None:
         item_out, item_in = best_move
@@ -141,7 +161,8 @@ def _local_search_swap_2_1_optimized(current_solution_indices, instance_data):
     best_move = (None, None, None) # (item_removido_1, item_removido_2, item_adicionado)
 
     current_weight = calculate_solution_weight(current_solution_indices, weights)
-    solution_set = set(current_solution_indices)
+    solution = SolutionBitset(num_items, current_solution_indices)
+    in_solution = solution.flags
     
     for r1, r2 in itertools.combinations(current_solution_indices, 2):
         temp_weight = current_weight - weights[r1] - weights[r2]
@@ -149,24 +170,28 @@ def _local_search_swap_2_1_optimized(current_solution_indices, instance_data):
         # Efeito da remoção de r1 e r2
         profit_loss_out = profits[r1] + profits[r2]
         
-        temp_solution_set = solution_set - {r1, r2}
-        penalty_gain_out_r1 = _calculate_item_penalty_with_solution(r1, temp_solution_set, forfeit_costs_matrix)
-        penalty_gain_out_r2 = _calculate_item_penalty_with_solution(r2, temp_solution_set, forfeit_costs_matrix)
+        # r1 e r2 saem da solução até o fim do laço interno
+        solution.discard(r1)
+        solution.discard(r2)
+        penalty_gain_out_r1 = _calculate_item_penalty_with_solution(r1, solution, forfeit_costs_matrix)
+        penalty_gain_out_r2 = _calculate_item_penalty_with_solution(r2, solution, forfeit_costs_matrix)
         penalty_between_r1_r2 = forfeit_costs_matrix[min(r1, r2)][max(r1, r2)]
         
         total_penalty_gain = penalty_gain_out_r1 + penalty_gain_out_r2 + penalty_between_r1_r2
         
         for item_in in range(num_items):
-            if item_in not in solution_set:
+            if not in_solution[item_in] and item_in != r1 and item_in != r2:
                 if temp_weight + weights[item_in] <= capacity:
                     profit_gain_in = profits[item_in]
-                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, temp_solution_set, forfeit_costs_matrix)
+                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, solution, forfeit_costs_matrix)
                     
                     improvement = (profit_gain_in - penalty_loss_in) + (total_penalty_gain - profit_loss_out)
 
                     if improvement > best_improvement:
                         best_improvement = improvement
                         best_move = (r1, r2, item_in)
+        solution.add(r1)
+        solution.add(r2)
 
     if best_move[2] is not None:
         r1, r2, a1 = best_move
@@ -190,7 +215,8 @@ def _local_search_swap_2_1_optimized_first_improvement(current_solution_indices,
     best_move = (None, None, None)
 
     current_weight = calculate_solution_weight(current_solution_indices, weights)
-    solution_set = set(current_solution_indices)
+    solution = SolutionBitset(num_items, current_solution_indices)
+    in_solution = solution.flags
     
     # Flag para quebrar os laços externos
     found_improvement = False 
@@ -201,23 +227,715 @@ def _local_search_swap_2_1_optimized_first_improvement(current_solution_indices,
         # Efeito da remoção de r1 e r2
         profit_loss_out = profits[r1] + profits[r2]
         
-        temp_solution_set = solution_set - {r1, r2}
-        penalty_gain_out_r1 = _calculate_item_penalty_with_solution(r1, temp_solution_set, forfeit_costs_matrix)
-        penalty_gain_out_r2 = _calculate_item_penalty_with_solution(r2, temp_solution_set, forfeit_costs_matrix)
+        # r1 e r2 saem da solução até o fim do laço interno
+        solution.discard(r1)
+        solution.discard(r2)
+        penalty_gain_out_r1 = _calculate_item_penalty_with_solution(r1, solution, forfeit_costs_matrix)
+        penalty_gain_out_r2 = _calculate_item_penalty_with_solution(r2, solution, forfeit_costs_matrix)
         penalty_between_r1_r2 = forfeit_costs_matrix[min(r1, r2)][max(r1, r2)]
         
         total_penalty_gain = penalty_gain_out_r1 + penalty_gain_out_r2 + penalty_between_r1_r2
         
         for item_in in range(num_items):
-            if item_in not in solution_set:
+            if not in_solution[item_in] and item_in != r1 and item_in != r2:
                 if temp_weight + weights[item_in] <= capacity:
                     profit_gain_in = profits[item_in]
-                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, temp_solution_set, forfeit_costs_matrix)
+                    penalty_loss_in = _calculate_item_penalty_with_solution(item_in, solution, forfeit_costs_matrix)
                     
                     improvement = (profit_gain_in - penalty_loss_in) + (total_penalty_gain - profit_loss_out)
 
                     if improvement > best_improvement:
                         final_solution = [item for item in current_solution_indices if item != r1 and item != r2] + [item_in]
                         return final_solution, True
+        solution.add(r1)
+        solution.add(r2)
+
+    return current_solution_indices, False
+
+# ----------------------------------------------------------------------------------
+# VIZINHANÇAS SOBRE O ESTADO INCREMENTAL (SolutionState)
+# Mesmos movimentos e critérios de desempate das funções acima, mas os deltas vêm
+# do vetor 'penalty_with_solution' mantido pelo estado. Cada função aplica o
+# melhor movimento diretamente no estado e retorna True se houve melhoria.
+# ----------------------------------------------------------------------------------
+
+def _outside_candidates(state):
+    """Lista (item, ganho_de_adição, peso) dos itens fora da solução, em ordem crescente."""
+    profits = state.profits
+    weights = state.weights
+    penalty_with_solution = state.penalty_with_solution
+    in_solution = state.in_solution
+    return [(item_idx, profits[item_idx] - penalty_with_solution[item_idx], weights[item_idx])
+            for item_idx in range(len(in_solution)) if not in_solution[item_idx]]
+
+def _local_search_swap_1_0_state(state):
+    """
+    Busca Local (Remoção 1-0) sobre o estado incremental.
+    Complexidade: O(s).
+    """
+    best_improvement = 1e-9
+    best_item_to_remove = None
+
+    for item_to_remove in state.items:
+        improvement = state.remove_gain(item_to_remove)
+        if improvement > best_improvement:
+            best_improvement = improvement
+            best_item_to_remove = item_to_remove
+
+    if best_item_to_remove is not None:
+        state.remove(best_item_to_remove)
+        return True
+    return False
+
+def _local_search_swap_0_1_state(state):
+    """
+    Busca Local (Adição 0-1) sobre o estado incremental.
+    Complexidade: O(n).
+    """
+    best_improvement = 1e-9
+    best_item_to_add = None
+    free_capacity = state.capacity - state.total_weight
+
+    for item_to_add, gain_in, weight_in in _outside_candidates(state):
+        if weight_in <= free_capacity and gain_in > best_improvement:
+            best_improvement = gain_in
+            best_item_to_add = item_to_add
+
+    if best_item_to_add is not None:
+        state.add(best_item_to_add)
+        return True
+    return False
+
+def _local_search_swap_1_1_state(state):
+    """
+    Busca Local (Troca 1-1) sobre o estado incremental.
+    Complexidade: O(s*(n-s)).
+    """
+    weights = state.weights
+    best_improvement = 1e-9
+    best_move = (None, None)  # (item_out, item_in)
+    candidates_in = _outside_candidates(state)
+
+    for item_out in state.items:
+        free_capacity = state.capacity - state.total_weight + weights[item_out]
+        gain_out = state.remove_gain(item_out)
+        # Penalidades do item removido: o item que entra deixa de pagá-las
+        costs_with_out = dict(state.neighbors[item_out])
+
+        for item_in, gain_in, weight_in in candidates_in:
+            if weight_in <= free_capacity:
+                improvement = gain_in + costs_with_out.get(item_in, 0) + gain_out
+                if improvement > best_improvement:
+                    best_improvement = improvement
+                    best_move = (item_out, item_in)
+
+    if best_move[0] is not None:
+        item_out, item_in = best_move
+        state.remove(item_out)
+        state.add(item_in)
+        return True
+    return False
+
+def _local_search_swap_2_1_state(state, first_improvement=False):
+    """
+    Busca Local (Troca 2-1) sobre o estado incremental.
+    Complexidade: O(s^2*(n-s)).
+    """
+    weights = state.weights
+    if len(state.items) < 2:
+        return False
+
+    best_improvement = 1e-9
+    best_move = (None, None, None)  # (item_removido_1, item_removido_2, item_adicionado)
+    candidates_in = _outside_candidates(state)
+
+    for r1, r2 in itertools.combinations(state.items, 2):
+        free_capacity = state.capacity - state.total_weight + weights[r1] + weights[r2]
+        penalty_between_r1_r2 = state.pair_cost(r1, r2)
+        # Ganho da remoção conjunta: o par {r1, r2} só é descontado uma vez
+        gain_out = state.remove_gain(r1) + state.remove_gain(r2) - penalty_between_r1_r2
+        costs_with_r1 = dict(state.neighbors[r1])
+        costs_with_r2 = dict(state.neighbors[r2])
+
+        for item_in, gain_in, weight_in in candidates_in:
+            if weight_in <= free_capacity:
+                improvement = (gain_in + costs_with_r1.get(item_in, 0)
+                               + costs_with_r2.get(item_in, 0) + gain_out)
+                if improvement > best_improvement:
+                    best_improvement = improvement
+                    best_move = (r1, r2, item_in)
+                    if first_improvement:
+                        break
+        if first_improvement and best_move[2] is not None:
+            break
+
+    if best_move[2] is not None:
+        r1, r2, a1 = best_move
+        state.remove(r1)
+        state.remove(r2)
+        state.add(a1)
+        return True
+    return False
+
+def _local_search_swap_2_1_state_first_improvement(state):
+    return _local_search_swap_2_1_state(state, first_improvement=True)
+
+# Tamanho padrão das listas de candidatos do 2-1 (itens que saem / itens que entram)
+_2_1_CANDIDATES_OUT = 20
+_2_1_CANDIDATES_IN = 20
+
+def _local_search_swap_2_1_candidates(state, candidates_out=_2_1_CANDIDATES_OUT,
+                                      candidates_in=_2_1_CANDIDATES_IN):
+    """
+    Busca Local (Troca 2-1) restrita a listas de candidatos, com bits "don't look".
+
+    Os pares removidos saem dos 'candidates_out' itens da solução com maior
+    contribuição de penalidade (maior remove_gain) e o item inserido sai dos
+    'candidates_in' itens de fora com maior razão lucro_penalizado / peso.
+    Um item cuja varredura como primeiro removido falha tem o bit
+    state.dont_look ligado e é pulado até que ele ou um vizinho de penalidade
+    mude (ver SolutionState). Entre os candidatos, escolhe o melhor movimento.
+    Complexidade: O(n + m^2*k), com m = candidates_out e k = candidates_in.
+    """
+    if len(state.items) < 2:
+        return False
+
+    weights = state.weights
+    dont_look = state.dont_look
+    forfeit_costs_matrix = state.forfeit_costs_matrix
+
+    # Itens que saem: maior penalidade com a solução em relação ao lucro
+    # (sorted é estável: empates ficam na ordem da solução)
+    removable = sorted(state.items, key=state.remove_gain, reverse=True)[:candidates_out]
+    if all(dont_look[item_idx] for item_idx in removable[:-1]):
+        return False
+
+    # Itens que entram: melhor razão lucro_penalizado / peso entre os que
+    # cabem liberando os dois itens mais pesados da lista de saída
+    max_free_capacity = (state.capacity - state.total_weight
+                         + sum(heapq.nlargest(2, (weights[item_idx] for item_idx in removable))))
+    insertable = [(item_in, gain_in, weight_in)
+                  for item_in, gain_in, weight_in in _outside_candidates(state)
+                  if weight_in <= max_free_capacity]
+    insertable = heapq.nlargest(candidates_in, insertable,
+                                key=lambda candidate: _penalized_ratio(candidate[1], candidate[2]))
+
+    best_improvement = 1e-9
+    best_move = (None, None, None)  # (item_removido_1, item_removido_2, item_adicionado)
+
+    for position, r1 in enumerate(removable):
+        if dont_look[r1]:
+            continue
+        row_r1 = forfeit_costs_matrix[r1]
+        improving_from_r1 = False
+
+        for r2 in removable[position + 1:]:
+            free_capacity = state.capacity - state.total_weight + weights[r1] + weights[r2]
+            gain_out = state.remove_gain(r1) + state.remove_gain(r2) - row_r1[r2]
+            row_r2 = forfeit_costs_matrix[r2]
+
+            for item_in, gain_in, weight_in in insertable:
+                if weight_in <= free_capacity:
+                    improvement = gain_in + row_r1[item_in] + row_r2[item_in] + gain_out
+                    if improvement > 1e-9:
+                        improving_from_r1 = True
+                        if improvement > best_improvement:
+                            best_improvement = improvement
+                            best_move = (r1, r2, item_in)
+
+        if not improving_from_r1:
+            dont_look[r1] = 1
+
+    if best_move[2] is not None:
+        r1, r2, a1 = best_move
+        state.remove(r1)
+        state.remove(r2)
+        state.add(a1)
+        return True
+    return False
+
+
+# ----------------------------------------------------------------------------------
+# VIZINHANÇAS COM PODA POR LIMITANTE SUPERIOR
+# Mesmos movimentos das versões acima (melhor melhoria, mesmo desempate), mas os
+# candidatos são percorridos em ordem decrescente de ganho e a varredura para
+# assim que nenhum candidato restante pode superar o melhor movimento atual.
+# Na troca, um item que entra e não tem penalidade com os que saem tem ganho
+# exato 'ganho_de_adição + ganho_de_remoção', então basta o primeiro viável na
+# ordem; os vizinhos de penalidade dos itens que saem são avaliados à parte.
+# ----------------------------------------------------------------------------------
+
+def _pruning_bounds(instance_data):
+    """
+    Limitantes por item, calculados uma vez e guardados em
+    instance_data['pruning_bounds']:
+        'max_cost': maior custo positivo de penalidade do item (0 se não houver),
+                    limite do quanto a saída do item alivia um candidato;
+        'add_upper_bound': lucro - menor penalidade possível (soma dos custos
+                    negativos), limite do ganho de adição do item;
+        'add_order': itens em ordem decrescente de 'add_upper_bound'
+                    (empates por menor índice).
+    """
+    bounds = instance_data.get('pruning_bounds')
+    if bounds is None:
+        neighbors = get_forfeit_neighbors(instance_data)
+        profits = instance_data['profits']
+        max_cost = [max([cost for _, cost in item_neighbors if cost > 0], default=0)
+                    for item_neighbors in neighbors]
+        add_upper_bound = [profits[item_idx] - sum(cost for _, cost in neighbors[item_idx] if cost < 0)
+                           for item_idx in range(len(neighbors))]
+        add_order = sorted(range(len(neighbors)), key=lambda item_idx: -add_upper_bound[item_idx])
+        bounds = {'max_cost': max_cost, 'add_upper_bound': add_upper_bound, 'add_order': add_order}
+        instance_data['pruning_bounds'] = bounds
+    return bounds
+
+def _is_better(improvement, item_idx, best_improvement, best_item):
+    """Critério das varreduras ordenadas: maior melhoria, empate pelo menor índice."""
+    return improvement > best_improvement or (improvement == best_improvement and item_idx < best_item)
+
+def _local_search_swap_0_1_pruned(state):
+    """
+    Busca Local (Adição 0-1) com poda: percorre os itens em ordem decrescente de
+    limitante (lucro - menor penalidade possível) e para quando o limitante fica
+    abaixo do melhor ganho encontrado.
+    """
+    bounds = _pruning_bounds(state.instance_data)
+    add_upper_bound = bounds['add_upper_bound']
+    in_solution = state.in_solution
+    weights = state.weights
+    free_capacity = state.capacity - state.total_weight
+
+    best_improvement = 1e-9
+    best_item_to_add = None
+    for item_to_add in bounds['add_order']:
+        if add_upper_bound[item_to_add] < best_improvement:
+            break
+        if in_solution[item_to_add] or weights[item_to_add] > free_capacity:
+            continue
+        gain_in = state.add_gain(item_to_add)
+        if gain_in > 1e-9 and (best_item_to_add is None
+                               or _is_better(gain_in, item_to_add, best_improvement, best_item_to_add)):
+            best_improvement = gain_in
+            best_item_to_add = item_to_add
+
+    if best_item_to_add is not None:
+        state.add(best_item_to_add)
+        return True
+    return False
+
+def _sorted_outside_candidates(state):
+    """Candidatos de _outside_candidates em ordem decrescente de ganho (empate: menor índice)."""
+    candidates = _outside_candidates(state)
+    candidates.sort(key=lambda candidate: -candidate[1])
+    return candidates
+
+def _best_swap_in(state, sorted_candidates, costs_with_out, gain_out, free_capacity, best_improvement):
+    """
+    Melhor item para entrar quando saem os itens cujas penalidades estão em
+    'costs_with_out' ({item: custo somado com os que saem}). Retorna
+    (melhoria, item) do melhor candidato, ou None se nenhum supera
+    'best_improvement'.
+    """
+    profits = state.profits
+    weights = state.weights
+    penalty_with_solution = state.penalty_with_solution
+    in_solution = state.in_solution
+    best = None
+
+    # Vizinhos de penalidade dos itens que saem: ganho exato
+    for item_in, cost in costs_with_out.items():
+        if not in_solution[item_in] and weights[item_in] <= free_capacity:
+            improvement = profits[item_in] - penalty_with_solution[item_in] + cost + gain_out
+            if improvement > best_improvement and (best is None or _is_better(improvement, item_in, *best)):
+                best = (improvement, item_in)
+
+    # Demais itens: o primeiro viável na ordem decrescente de ganho é o melhor
+    for item_in, gain_in, weight_in in sorted_candidates:
+        improvement = gain_in + gain_out
+        if improvement <= best_improvement or (best is not None and improvement < best[0]):
+            break
+        if weight_in <= free_capacity and item_in not in costs_with_out:
+            if best is None or _is_better(improvement, item_in, *best):
+                best = (improvement, item_in)
+            break
+    return best
+
+def _local_search_swap_1_1_pruned(state):
+    """
+    Busca Local (Troca 1-1) com poda. Um item que sai é descartado sem varredura
+    se 'maior ganho de adição + maior custo que ele alivia + ganho de remoção'
+    não supera a melhor troca atual.
+    """
+    if not state.items:
+        return False
+    max_cost = _pruning_bounds(state.instance_data)['max_cost']
+    weights = state.weights
+    sorted_candidates = _sorted_outside_candidates(state)
+    if not sorted_candidates:
+        return False
+    top_gain_in = sorted_candidates[0][1]
+
+    best_improvement = 1e-9
+    best_move = (None, None)  # (item_out, item_in)
+
+    for item_out in state.items:
+        gain_out = state.remove_gain(item_out)
+        if top_gain_in + max_cost[item_out] + gain_out <= best_improvement:
+            continue
+        free_capacity = state.capacity - state.total_weight + weights[item_out]
+        best = _best_swap_in(state, sorted_candidates, dict(state.neighbors[item_out]),
+                             gain_out, free_capacity, best_improvement)
+        if best is not None:
+            best_improvement, item_in = best
+            best_move = (item_out, item_in)
+
+    if best_move[0] is not None:
+        item_out, item_in = best_move
+        state.remove(item_out)
+        state.add(item_in)
+        return True
+    return False
+
+def _local_search_swap_2_1_pruned(state):
+    """
+    Busca Local (Troca 2-1, melhor melhoria) com poda. Um par que sai é
+    descartado sem varredura se o limitante 'maior ganho de adição + maiores
+    custos aliviados + ganho da remoção conjunta' não supera a melhor troca.
+    """
+    if len(state.items) < 2:
+        return False
+    max_cost = _pruning_bounds(state.instance_data)['max_cost']
+    weights = state.weights
+    sorted_candidates = _sorted_outside_candidates(state)
+    if not sorted_candidates:
+        return False
+    top_gain_in = sorted_candidates[0][1]
+    neighbor_costs = {}
+
+    best_improvement = 1e-9
+    best_move = (None, None, None)  # (item_removido_1, item_removido_2, item_adicionado)
+
+    for r1, r2 in itertools.combinations(state.items, 2):
+        costs_with_r1 = neighbor_costs.get(r1)
+        if costs_with_r1 is None:
+            costs_with_r1 = neighbor_costs[r1] = dict(state.neighbors[r1])
+        # Ganho da remoção conjunta: o par {r1, r2} só é descontado uma vez
+        gain_out = state.remove_gain(r1) + state.remove_gain(r2) - costs_with_r1.get(r2, 0)
+        if top_gain_in + max_cost[r1] + max_cost[r2] + gain_out <= best_improvement:
+            continue
+
+        costs_with_r2 = neighbor_costs.get(r2)
+        if costs_with_r2 is None:
+            costs_with_r2 = neighbor_costs[r2] = dict(state.neighbors[r2])
+        costs_with_out = dict(costs_with_r1)
+        for item_idx, cost in costs_with_r2.items():
+            costs_with_out[item_idx] = costs_with_out.get(item_idx, 0) + cost
+
+        free_capacity = state.capacity - state.total_weight + weights[r1] + weights[r2]
+        best = _best_swap_in(state, sorted_candidates, costs_with_out, gain_out, free_capacity, best_improvement)
+        if best is not None:
+            best_improvement, item_in = best
+            best_move = (r1, r2, item_in)
+
+    if best_move[2] is not None:
+        r1, r2, a1 = best_move
+        state.remove(r1)
+        state.remove(r2)
+        state.add(a1)
+        return True
+    return False
+
+# ----------------------------------------------------------------------------------
+# VIZINHANÇAS VETORIZADAS (NumPy) SOBRE O ESTADO INCREMENTAL
+# Avaliam todos os candidatos de uma vez e escolhem o movimento com argmax, que
+# devolve a primeira ocorrência do máximo: o desempate é o mesmo das versões em
+# Python puro (primeiro item removido na ordem da solução, menor índice inserido).
+# ----------------------------------------------------------------------------------
+
+# Limite de elementos da matriz de deltas (s x n) avaliada de uma só vez no 1-1
+_MAX_DELTA_MATRIX_ENTRIES = 1 << 22
+
+def _numpy_instance_arrays(instance_data):
+    """Lucros, pesos e CSR das penalidades como arrays NumPy (guardados na instância)."""
+    arrays = instance_data.get('numpy_arrays')
+    if arrays is None:
+        if np is None:
+            raise ImportError("O backend 'numpy' requer o pacote numpy instalado.")
+        indptr, indices, costs = get_forfeit_csr(instance_data)
+        arrays = {
+            'profits': np.asarray(instance_data['profits'], dtype=np.int64),
+            'weights': np.asarray(instance_data['weights'], dtype=np.int64),
+            'indptr': np.frombuffer(indptr, dtype=np.int64),
+            'indices': np.frombuffer(indices, dtype=np.int64),
+            'costs': np.frombuffer(costs, dtype=np.int64),
+        }
+        instance_data['numpy_arrays'] = arrays
+    return arrays
+
+def _local_search_swap_0_1_vectorized(state):
+    """
+    Busca Local (Adição 0-1) vetorizada: ganho = lucro - penalidade_com_solução
+    para todos os itens, filtrado pela máscara de viabilidade de peso.
+    """
+    arrays = _numpy_instance_arrays(state.instance_data)
+    penalty = np.array(state.penalty_with_solution, dtype=np.int64)
+    outside = np.frombuffer(state.in_solution, dtype=np.uint8) == 0
+
+    gains = arrays['profits'] - penalty
+    feasible = outside & (arrays['weights'] <= state.capacity - state.total_weight)
+    masked_gains = np.where(feasible, gains, np.iinfo(np.int64).min)
+
+    best_item_to_add = int(np.argmax(masked_gains))
+    if feasible[best_item_to_add] and gains[best_item_to_add] > 1e-9:
+        state.add(best_item_to_add)
+        return True
+    return False
+
+def _local_search_swap_1_1_vectorized(state):
+    """
+    Busca Local (Troca 1-1) vetorizada: monta a matriz de deltas (s x n), onde a
+    linha k corresponde ao k-ésimo item da solução saindo e a coluna j ao item j
+    entrando, e escolhe a melhor troca viável com argmax.
+    """
+    if not state.items:
+        return False
+
+    arrays = _numpy_instance_arrays(state.instance_data)
+    weights = arrays['weights']
+    indptr, indices, costs = arrays['indptr'], arrays['indices'], arrays['costs']
+    num_items = len(weights)
+
+    penalty = np.array(state.penalty_with_solution, dtype=np.int64)
+    outside = np.frombuffer(state.in_solution, dtype=np.uint8) == 0
+    gains_in = arrays['profits'] - penalty
+
+    items_out = np.array(state.items, dtype=np.int64)
+    gains_out = penalty[items_out] - arrays['profits'][items_out]
+    free_capacity_out = state.capacity - state.total_weight + weights[items_out]
+
+    best_improvement = 1e-9
+    best_move = (None, None)
+    block_size = max(1, _MAX_DELTA_MATRIX_ENTRIES // max(num_items, 1))
+
+    for start in range(0, len(items_out), block_size):
+        block = items_out[start:start + block_size]
+        # Penalidades entre cada item que sai e os candidatos: o item que entra
+        # deixa de pagá-las
+        costs_with_out = np.zeros((len(block), num_items), dtype=np.int64)
+        for row, item_out in enumerate(block):
+            begin, end = indptr[item_out], indptr[item_out + 1]
+            costs_with_out[row, indices[begin:end]] = costs[begin:end]
+
+        deltas = gains_in[np.newaxis, :] + costs_with_out + gains_out[start:start + len(block), np.newaxis]
+        feasible = outside[np.newaxis, :] & (weights[np.newaxis, :] <= free_capacity_out[start:start + len(block), np.newaxis])
+        deltas = np.where(feasible, deltas, np.iinfo(np.int64).min)
+
+        row, item_in = np.unravel_index(int(np.argmax(deltas)), deltas.shape)
+        if feasible[row, item_in] and deltas[row, item_in] > best_improvement:
+            best_improvement = deltas[row, item_in]
+            best_move = (int(block[row]), int(item_in))
+
+    if best_move[0] is not None:
+        item_out, item_in = best_move
+        state.remove(item_out)
+        state.add(item_in)
+        return True
+    return False
+
+
+# ----------------------------------------------------------------------------------
+# KERNELS COMPILADOS (Numba) SOBRE O ESTADO INCREMENTAL
+# Os kernels percorrem os candidatos na mesma ordem das versões em Python puro
+# (itens que saem na ordem da solução, itens que entram em ordem crescente) e só
+# trocam o melhor movimento com '>' estrito, então escolhem o mesmo movimento.
+# Eles recebem apenas arrays NumPy e devolvem índices (-1 = nenhum movimento).
+# ----------------------------------------------------------------------------------
+
+def _kernel_swap_0_1(profits, weights, penalty, in_solution, free_capacity):
+    best_improvement = 1e-9
+    best_item_to_add = -1
+    for item_in in range(len(profits)):
+        if in_solution[item_in] == 0 and weights[item_in] <= free_capacity:
+            gain_in = profits[item_in] - penalty[item_in]
+            if gain_in > best_improvement:
+                best_improvement = gain_in
+                best_item_to_add = item_in
+    return best_item_to_add
+
+def _kernel_swap_1_1(profits, weights, indptr, indices, costs, penalty, in_solution,
+                     items_out, free_capacity):
+    num_items = len(profits)
+    costs_with_out = np.zeros(num_items, dtype=np.int64)
+    best_improvement = 1e-9
+    best_out = -1
+    best_in = -1
+    for item_out in items_out:
+        # Penalidades do item removido: o item que entra deixa de pagá-las
+        for k in range(indptr[item_out], indptr[item_out + 1]):
+            costs_with_out[indices[k]] = costs[k]
+        free_capacity_out = free_capacity + weights[item_out]
+        gain_out = penalty[item_out] - profits[item_out]
+        for item_in in range(num_items):
+            if in_solution[item_in] == 0 and weights[item_in] <= free_capacity_out:
+                improvement = profits[item_in] - penalty[item_in] + costs_with_out[item_in] + gain_out
+                if improvement > best_improvement:
+                    best_improvement = improvement
+                    best_out = item_out
+                    best_in = item_in
+        for k in range(indptr[item_out], indptr[item_out + 1]):
+            costs_with_out[indices[k]] = 0
+    return best_out, best_in
+
+def _kernel_swap_2_1(profits, weights, indptr, indices, costs, penalty, in_solution,
+                     items_out, free_capacity, first_improvement):
+    num_items = len(profits)
+    costs_with_r1 = np.zeros(num_items, dtype=np.int64)
+    costs_with_r2 = np.zeros(num_items, dtype=np.int64)
+    best_improvement = 1e-9
+    best_r1 = -1
+    best_r2 = -1
+    best_in = -1
+    for p1 in range(len(items_out)):
+        r1 = items_out[p1]
+        for k in range(indptr[r1], indptr[r1 + 1]):
+            costs_with_r1[indices[k]] = costs[k]
+        for p2 in range(p1 + 1, len(items_out)):
+            r2 = items_out[p2]
+            for k in range(indptr[r2], indptr[r2 + 1]):
+                costs_with_r2[indices[k]] = costs[k]
+            free_capacity_out = free_capacity + weights[r1] + weights[r2]
+            # Ganho da remoção conjunta: o par {r1, r2} só é descontado uma vez
+            gain_out = (penalty[r1] - profits[r1]) + (penalty[r2] - profits[r2]) - costs_with_r1[r2]
+            for item_in in range(num_items):
+                if in_solution[item_in] == 0 and weights[item_in] <= free_capacity_out:
+                    improvement = (profits[item_in] - penalty[item_in] + costs_with_r1[item_in]
+                                   + costs_with_r2[item_in] + gain_out)
+                    if improvement > best_improvement:
+                        best_improvement = improvement
+                        best_r1 = r1
+                        best_r2 = r2
+                        best_in = item_in
+                        if first_improvement:
+                            break
+            for k in range(indptr[r2], indptr[r2 + 1]):
+                costs_with_r2[indices[k]] = 0
+            if first_improvement and best_in >= 0:
+                return best_r1, best_r2, best_in
+        for k in range(indptr[r1], indptr[r1 + 1]):
+            costs_with_r1[indices[k]] = 0
+    return best_r1, best_r2, best_in
+
+if njit is not None:
+    _kernel_swap_0_1 = njit(cache=True)(_kernel_swap_0_1)
+    _kernel_swap_1_1 = njit(cache=True)(_kernel_swap_1_1)
+    _kernel_swap_2_1 = njit(cache=True)(_kernel_swap_2_1)
+
+def _kernel_inputs(state):
+    """Arrays da instância e do estado no formato esperado pelos kernels."""
+    arrays = _numpy_instance_arrays(state.instance_data)
+    penalty = np.array(state.penalty_with_solution, dtype=np.int64)
+    in_solution = np.frombuffer(state.in_solution, dtype=np.uint8)
+    items_out = np.array(state.items, dtype=np.int64)
+    return arrays, penalty, in_solution, items_out
+
+def _local_search_swap_0_1_compiled(state):
+    """Busca Local (Adição 0-1) com o kernel compilado."""
+    arrays, penalty, in_solution, _ = _kernel_inputs(state)
+    best_item_to_add = _kernel_swap_0_1(arrays['profits'], arrays['weights'], penalty, in_solution,
+                                        state.capacity - state.total_weight)
+    if best_item_to_add >= 0:
+        state.add(int(best_item_to_add))
+        return True
+    return False
+
+def _local_search_swap_1_1_compiled(state):
+    """Busca Local (Troca 1-1) com o kernel compilado. Complexidade: O(s*n)."""
+    if not state.items:
+        return False
+    arrays, penalty, in_solution, items_out = _kernel_inputs(state)
+    item_out, item_in = _kernel_swap_1_1(arrays['profits'], arrays['weights'], arrays['indptr'],
+                                         arrays['indices'], arrays['costs'], penalty, in_solution,
+                                         items_out, state.capacity - state.total_weight)
+    if item_out >= 0:
+        state.remove(int(item_out))
+        state.add(int(item_in))
+        return True
+    return False
+
+def _local_search_swap_2_1_compiled(state, first_improvement=False):
+    """Busca Local (Troca 2-1) com o kernel compilado. Complexidade: O(s^2*n)."""
+    if len(state.items) < 2:
+        return False
+    arrays, penalty, in_solution, items_out = _kernel_inputs(state)
+    r1, r2, item_in = _kernel_swap_2_1(arrays['profits'], arrays['weights'], arrays['indptr'],
+                                       arrays['indices'], arrays['costs'], penalty, in_solution,
+                                       items_out, state.capacity - state.total_weight, first_improvement)
+    if item_in >= 0:
+        state.remove(int(r1))
+        state.remove(int(r2))
+        state.add(int(item_in))
+        return True
+    return False
+
+def _local_search_swap_2_1_compiled_first_improvement(state):
+    return _local_search_swap_2_1_compiled(state, first_improvement=True)
+
+# Backends de vizinhanças disponíveis, do mais rápido para o de referência
+BACKENDS = ('numba', 'numpy', 'python')
+
+def available_backends():
+    """Backends utilizáveis neste ambiente (dependem de numpy / numba instalados)."""
+    available = []
+    if np is not None and njit is not None:
+        available.append('numba')
+    if np is not None:
+        available.append('numpy')
+    available.append('python')
+    return available
+
+def resolve_backend(backend):
+    """Nome do backend efetivo: 'auto' vira o mais rápido entre os disponíveis."""
+    if backend == 'auto':
+        return available_backends()[0]
+    return backend
+
+def get_state_neighborhoods(backend='python'):
+    """
+    Retorna as vizinhanças sobre o estado incremental do backend escolhido, como
+    um dicionário {'1-0', '0-1', '1-1', '2-1', '2-1-first', '2-1-candidates'}
+    -> função(state).
+
+    Todos os backends escolhem exatamente os mesmos movimentos (ver
+    backend_conformance.py); muda apenas o tempo de execução.
+
+    Args:
+        backend (str): 'python' (0-1, 1-1 e 2-1 com poda por limitante),
+                       'numpy' (0-1 e 1-1 vetorizados),
+                       'numba' (0-1, 1-1 e 2-1 compilados) ou 'auto' (o mais
+                       rápido entre os disponíveis).
+    """
+    backend = resolve_backend(backend)
 
-    return current_solution_indices, False
\ No newline at end of file
+    neighborhoods = {
+        '1-0': _local_search_swap_1_0_state,
+        '0-1': _local_search_swap_0_1_pruned,
+        '1-1': _local_search_swap_1_1_pruned,
+        '2-1': _local_search_swap_2_1_pruned,
+        '2-1-first': _local_search_swap_2_1_state_first_improvement,
+        '2-1-candidates': _local_search_swap_2_1_candidates,
+    }
+    if backend == 'numpy':
+        if np is None:
+            raise ImportError("O backend 'numpy' requer o pacote numpy instalado.")
+        neighborhoods['0-1'] = _local_search_swap_0_1_vectorized
+        neighborhoods['1-1'] = _local_search_swap_1_1_vectorized
+    elif backend == 'numba':
+        if np is None or njit is None:
+            raise ImportError("O backend 'numba' requer os pacotes numpy e numba instalados.")
+        neighborhoods['0-1'] = _local_search_swap_0_1_compiled
+        neighborhoods['1-1'] = _local_search_swap_1_1_compiled
+        neighborhoods['2-1'] = _local_search_swap_2_1_compiled
+        neighborhoods['2-1-first'] = _local_search_swap_2_1_compiled_first_improvement
+    elif backend != 'python':
+        raise ValueError(f"Backend de vizinhanças desconhecido: '{backend}'")
+    return neighborhoods
@@ -0,0 +1,153 @@
+import concurrent.futures
+import hashlib
+import os
+import pickle
+import struct
+
+from utilities import KPF_BINARY_MAGIC, read_kpf_instance
+
+def read_instance_header(filepath):
+    """
+    Lê apenas o cabeçalho de um arquivo de instância (texto ou binário).
+    Retorna (num_items, num_forfeits, capacity).
+    """
+    with open(filepath, 'rb') as f:
+        start = f.read(40)
+        if start[:len(KPF_BINARY_MAGIC)] == KPF_BINARY_MAGIC:
+            # magic | versão | nI | nP | kS (ver binary_instance.py)
+            return struct.unpack_from('<qqq', start, 8)
+        f.seek(0)
+        num_items, num_forfeits, capacity = map(int, f.readline().split())
+    return num_items, num_forfeits, capacity
+
+def _cache_path(cache_dir, filepath, sparse):
+    """Arquivo de cache de uma instância, identificado pelo caminho e pelo mtime."""
+    path_key = hashlib.sha1(os.path.abspath(filepath).encode()).hexdigest()[:16]
+    mtime_ns = os.stat(filepath).st_mtime_ns
+    kind = 'sparse' if sparse else 'dense'
+    return os.path.join(cache_dir, f"{path_key}_{mtime_ns}_{kind}.pkl")
+
+def load_instance_cached(filepath, sparse=None, cache_dir=None):
+    """
+    Lê uma instância usando o cache em disco, se 'cache_dir' for informado.
+    Na primeira leitura o dicionário é gravado com pickle; nas seguintes é
+    carregado direto do cache, enquanto o arquivo não for modificado.
+    Instâncias binárias não passam pelo cache (já são carregadas via mmap).
+    """
+    if cache_dir is None:
+        return read_kpf_instance(filepath, sparse=sparse)
+
+    with open(filepath, 'rb') as f:
+        if f.read(len(KPF_BINARY_MAGIC)) == KPF_BINARY_MAGIC:
+            return read_kpf_instance(filepath, sparse=sparse)
+
+    cache_path = _cache_path(cache_dir, filepath, sparse)
+    if os.path.isfile(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"  Cache inválido para {filepath}, relendo: {e}")
+
+    instance_data = read_kpf_instance(filepath, sparse=sparse)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Grava em arquivo temporário e renomeia, para não deixar cache parcial
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(instance_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return instance_data
+
+class InstanceCatalog:
+    """
+    Catálogo preguiçoso das instâncias de um diretório.
+
+    Na criação, lê apenas a primeira linha (ou o cabeçalho binário) de cada
+    arquivo, expondo nI, nP e a capacidade em 'entries'. A instância completa
+    só é lida no primeiro acesso (catalog[i]) e fica guardada em memória.
+    Pode ser usada no lugar da lista de load_instances_from_directory (mesma
+    ordem de arquivos, indexação, len e iteração).
+
+    Args:
+        directory_path (str): Diretório com os arquivos de instância.
+        sparse (bool | None): Repassado para read_kpf_instance.
+        cache_dir (str, opcional): Diretório do cache em disco das instâncias já
+                                   lidas (chave: caminho + mtime do arquivo).
+    """
+
+    def __init__(self, directory_path, sparse=None, cache_dir=None):
+        self.directory_path = directory_path
+        self.sparse = sparse
+        self.cache_dir = cache_dir
+        self.entries = []
+        self._instances = {}
+
+        if not os.path.isdir(directory_path):
+            print(f"Erro: Diretório não encontrado em '{directory_path}'")
+            return
+
+        for filename in os.listdir(directory_path):
+            filepath = os.path.join(directory_path, filename)
+            if not os.path.isfile(filepath):
+                continue
+            try:
+                num_items, num_forfeits, capacity = read_instance_header(filepath)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"  Erro ao ler o cabeçalho de {filename}: {e}")
+                continue
+            self.entries.append({
+                'filename': filename,
+                'filepath': filepath,
+                'num_items': num_items,
+                'num_forfeits': num_forfeits,
+                'capacity': capacity,
+            })
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self.entries)
+        instance_data = self._instances.get(index)
+        if instance_data is None:
+            entry = self.entries[index]
+            instance_data = load_instance_cached(entry['filepath'], self.sparse, self.cache_dir)
+            self._instances[index] = instance_data
+        return instance_data
+
+    def __iter__(self):
+        for index in range(len(self.entries)):
+            yield self[index]
+
+    def find(self, filename):
+        """Retorna a instância cujo nome de arquivo é 'filename'."""
+        for index, entry in enumerate(self.entries):
+            if entry['filename'] == filename:
+                return self[index]
+        raise KeyError(filename)
+
+    def load_all(self, max_workers=None):
+        """
+        Lê todas as instâncias ainda não carregadas, em paralelo em um
+        ProcessPoolExecutor (max_workers=1 lê sequencialmente no processo atual).
+        """
+        pending = [index for index in range(len(self.entries)) if index not in self._instances]
+        if not pending:
+            return
+        filepaths = [self.entries[index]['filepath'] for index in pending]
+
+        if max_workers == 1 or len(pending) == 1:
+            loaded = [load_instance_cached(path, self.sparse, self.cache_dir) for path in filepaths]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+                loaded = list(executor.map(load_instance_cached, filepaths,
+                                           [self.sparse] * len(filepaths),
+                                           [self.cache_dir] * len(filepaths)))
+        for index, instance_data in zip(pending, loaded):
+            self._instances[index] = instance_data
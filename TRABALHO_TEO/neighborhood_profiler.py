@@ -0,0 +1,69 @@
+import time
+
+from busca_local import _2_1_CANDIDATES_IN, _2_1_CANDIDATES_OUT
+
+def _num_pairs(count):
+    return count * (count - 1) // 2
+
+# Tamanho da vizinhança coberta por uma varredura, em função do número de itens
+# na solução (s) e na instância (n). Não é o número de movimentos efetivamente
+# avaliados: as varreduras com poda descartam parte deles pelo limitante e a
+# 2-1 de primeira melhoria pode parar antes.
+NEIGHBORHOOD_SIZES = {
+    '1-0': lambda s, n: s,
+    '0-1': lambda s, n: n - s,
+    '1-1': lambda s, n: s * (n - s),
+    '2-1': lambda s, n: _num_pairs(s) * (n - s),
+    '2-1-first': lambda s, n: _num_pairs(s) * (n - s),
+    '2-1-candidates': lambda s, n: _num_pairs(min(s, _2_1_CANDIDATES_OUT)) * min(n - s, _2_1_CANDIDATES_IN),
+}
+
+class NeighborhoodProfiler:
+    """
+    Contadores por vizinhança para os VNDs: chamadas, chamadas com melhoria,
+    soma dos tamanhos das vizinhanças varridas (ver NEIGHBORHOOD_SIZES) e
+    tempo acumulado.
+
+    Só é usado quando o perfilamento é pedido (profile=True ou um profiler
+    passado à busca): sem ele as vizinhanças são chamadas diretamente, sem
+    nenhum custo extra. Um mesmo profiler pode acumular várias descidas
+    (por exemplo, todas as iterações de um ILS).
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def wrap(self, name, move):
+        """Devolve 'move' (função de vizinhança sobre SolutionState) instrumentada com os contadores de 'name'."""
+        stats = self.stats.setdefault(name, {'calls': 0, 'improvements': 0, 'neighborhood_size': 0, 'time': 0.0})
+        neighborhood_size = NEIGHBORHOOD_SIZES.get(name)
+
+        def profiled_move(state):
+            if neighborhood_size is not None:
+                stats['neighborhood_size'] += neighborhood_size(len(state.items), len(state.in_solution))
+            start = time.perf_counter()
+            improved = move(state)
+            stats['time'] += time.perf_counter() - start
+            stats['calls'] += 1
+            if improved:
+                stats['improvements'] += 1
+            return improved
+
+        return profiled_move
+
+    def summary(self):
+        """Contadores por vizinhança, para o campo 'params' das soluções."""
+        return {
+            name: dict(stats,
+                       improvement_rate=stats['improvements'] / stats['calls'] if stats['calls'] else 0.0,
+                       time_per_call=stats['time'] / stats['calls'] if stats['calls'] else 0.0)
+            for name, stats in self.stats.items()
+        }
+
+    def report(self):
+        """Tabela legível dos contadores (uma linha por vizinhança)."""
+        lines = [f"{'vizinhança':<16} {'chamadas':>9} {'melhorias':>10} {'tamanho':>14} {'tempo (s)':>10}"]
+        for name, stats in self.stats.items():
+            lines.append(f"{name:<16} {stats['calls']:>9} {stats['improvements']:>10} "
+                         f"{stats['neighborhood_size']:>14} {stats['time']:>10.4f}")
+        return '\n'.join(lines)
@@ -0,0 +1,249 @@
+import concurrent.futures
+import os
+from array import array
+from multiprocessing import shared_memory
+
+from busca_local import _local_search_swap_1_1_pruned, _local_search_swap_2_1_pruned
+from utilities import get_forfeit_csr
+
+# ----------------------------------------------------------------------------------
+# AVALIAÇÃO PARALELA DAS VIZINHANÇAS 1-1 E 2-1
+# O laço externo (item que sai, ou primeiro item do par que sai no 2-1) é
+# dividido em blocos contíguos, avaliados em processos que leem a instância e o
+# estado da solução de blocos de memória compartilhada. Cada bloco devolve o seu
+# primeiro melhor movimento e a redução percorre os blocos em ordem, com '>'
+# estrito: o movimento escolhido é o mesmo das versões sequenciais.
+# ----------------------------------------------------------------------------------
+
+# Abaixo deste volume de trabalho (pares avaliados) a varredura é sequencial
+_MIN_PARALLEL_WORK = 200_000
+# Blocos por processo (blocos menores equilibram melhor a carga)
+_CHUNKS_PER_WORKER = 4
+
+_worker_views = None
+
+def _make_views(blocks, num_items, nnz):
+    """Visões (memoryview 'q' / 'B') sobre os blocos compartilhados."""
+    instance = blocks['instance'].buf.cast('q')
+    state = blocks['state'].buf.cast('q')
+    views = {
+        'profits': instance[:num_items],
+        'weights': instance[num_items:2 * num_items],
+        'indptr': instance[2 * num_items:3 * num_items + 1],
+        'indices': instance[3 * num_items + 1:3 * num_items + 1 + nnz],
+        'costs': instance[3 * num_items + 1 + nnz:3 * num_items + 1 + 2 * nnz],
+        'penalty': state[:num_items],
+        'items': state[num_items:2 * num_items],
+        'in_solution': blocks['in_solution'].buf[:num_items],
+    }
+    # As visões base também precisam ser liberadas antes de fechar os blocos
+    views['_bases'] = (instance, state)
+    return views
+
+def _init_worker(names, num_items, nnz):
+    global _worker_views
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    _worker_views = (blocks, _make_views(blocks, num_items, nnz))
+
+def _neighbor_costs(views, item_idx):
+    indptr, indices, costs = views['indptr'], views['indices'], views['costs']
+    begin, end = indptr[item_idx], indptr[item_idx + 1]
+    return dict(zip(indices[begin:end], costs[begin:end]))
+
+def _outside_candidates(views):
+    profits, weights, penalty = views['profits'], views['weights'], views['penalty']
+    in_solution = views['in_solution']
+    return [(item_idx, profits[item_idx] - penalty[item_idx], weights[item_idx])
+            for item_idx in range(len(in_solution)) if not in_solution[item_idx]]
+
+def _scan_swap_1_1(begin, end, num_solution_items, free_capacity):
+    """Melhor troca 1-1 com o item que sai nas posições [begin, end) da solução."""
+    views = _worker_views[1]
+    profits, weights, penalty = views['profits'], views['weights'], views['penalty']
+    items = views['items'][:num_solution_items]
+    candidates_in = _outside_candidates(views)
+
+    best_improvement = 1e-9
+    best_move = None
+    for item_out in items[begin:end]:
+        free_capacity_out = free_capacity + weights[item_out]
+        gain_out = penalty[item_out] - profits[item_out]
+        costs_with_out = _neighbor_costs(views, item_out)
+
+        for item_in, gain_in, weight_in in candidates_in:
+            if weight_in <= free_capacity_out:
+                improvement = gain_in + costs_with_out.get(item_in, 0) + gain_out
+                if improvement > best_improvement:
+                    best_improvement = improvement
+                    best_move = (item_out, item_in)
+    return best_improvement, best_move
+
+def _scan_swap_2_1(begin, end, num_solution_items, free_capacity):
+    """Melhor troca 2-1 com o primeiro item do par nas posições [begin, end) da solução."""
+    views = _worker_views[1]
+    profits, weights, penalty = views['profits'], views['weights'], views['penalty']
+    items = views['items'][:num_solution_items]
+    candidates_in = _outside_candidates(views)
+
+    best_improvement = 1e-9
+    best_move = None
+    for position in range(begin, end):
+        r1 = items[position]
+        costs_with_r1 = _neighbor_costs(views, r1)
+        for r2 in items[position + 1:]:
+            free_capacity_out = free_capacity + weights[r1] + weights[r2]
+            # Ganho da remoção conjunta: o par {r1, r2} só é descontado uma vez
+            gain_out = (penalty[r1] - profits[r1]) + (penalty[r2] - profits[r2]) - costs_with_r1.get(r2, 0)
+            costs_with_r2 = _neighbor_costs(views, r2)
+
+            for item_in, gain_in, weight_in in candidates_in:
+                if weight_in <= free_capacity_out:
+                    improvement = (gain_in + costs_with_r1.get(item_in, 0)
+                                   + costs_with_r2.get(item_in, 0) + gain_out)
+                    if improvement > best_improvement:
+                        best_improvement = improvement
+                        best_move = (r1, r2, item_in)
+    return best_improvement, best_move
+
+def _split_positions(work_per_position, num_chunks):
+    """Divide as posições em até 'num_chunks' intervalos contíguos de trabalho parecido."""
+    total_work = sum(work_per_position)
+    target = max(1, -(-total_work // num_chunks))
+    ranges = []
+    begin = 0
+    accumulated = 0
+    for position, work in enumerate(work_per_position):
+        accumulated += work
+        if accumulated >= target:
+            ranges.append((begin, position + 1))
+            begin = position + 1
+            accumulated = 0
+    if begin < len(work_per_position):
+        ranges.append((begin, len(work_per_position)))
+    return ranges
+
+class ParallelNeighborhoodEvaluator:
+    """
+    Avalia as vizinhanças 1-1 e 2-1 (melhor melhoria) em vários processos.
+
+    A instância (lucros, pesos e CSR das penalidades) é copiada uma única vez
+    para memória compartilhada; a cada varredura o processo principal grava ali
+    o estado da solução (penalidade com a solução, pertinência e ordem dos
+    itens) e os processos avaliam blocos do laço externo. Varreduras pequenas
+    (menos de _MIN_PARALLEL_WORK pares) rodam sequencialmente.
+
+    Substitui as varreduras do backend 'python' (as pequenas usam as mesmas
+    versões com poda): os VNDs só o usam com esse backend, pois os backends
+    'numpy' e 'numba' já têm suas próprias varreduras rápidas.
+
+    Deve ser fechado com close() (ou usado com 'with') para liberar os
+    processos e a memória compartilhada.
+
+    Args:
+        instance_data (dict): Instância lida por read_kpf_instance.
+        num_workers (int, opcional): Processos usados (padrão: os.cpu_count()).
+    """
+
+    def __init__(self, instance_data, num_workers=None):
+        self.instance_data = instance_data
+        self.num_workers = num_workers or os.cpu_count() or 1
+        num_items = instance_data['num_items']
+        indptr, indices, costs = get_forfeit_csr(instance_data)
+        nnz = len(indices)
+
+        self._blocks = {
+            'instance': shared_memory.SharedMemory(create=True, size=8 * max(1, 3 * num_items + 1 + 2 * nnz)),
+            'state': shared_memory.SharedMemory(create=True, size=8 * max(1, 2 * num_items)),
+            'in_solution': shared_memory.SharedMemory(create=True, size=max(1, num_items)),
+        }
+        names = {key: block.name for key, block in self._blocks.items()}
+        instance = self._blocks['instance'].buf.cast('q')
+        offset = 0
+        for values in (instance_data['profits'], instance_data['weights'], indptr, indices, costs):
+            block = array('q', (int(v) for v in values))
+            instance[offset:offset + len(block)] = block
+            offset += len(block)
+        instance.release()
+
+        self._views = _make_views(self._blocks, num_items, nnz)
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.num_workers, initializer=_init_worker, initargs=(names, num_items, nnz)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Encerra os processos e libera a memória compartilhada."""
+        if self._executor is None:
+            return
+        self._executor.shutdown()
+        self._executor = None
+        bases = self._views.pop('_bases')
+        for view in list(self._views.values()) + list(bases):
+            view.release()
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+
+    def _publish_state(self, state):
+        """Grava o estado da solução nos blocos compartilhados."""
+        views = self._views
+        views['penalty'][:] = array('q', state.penalty_with_solution)
+        views['in_solution'][:] = state.in_solution
+        views['items'][:len(state.items)] = array('q', state.items)
+
+    def _best_move(self, scan, state, work_per_position):
+        self._publish_state(state)
+        free_capacity = state.capacity - state.total_weight
+        ranges = _split_positions(work_per_position, self.num_workers * _CHUNKS_PER_WORKER)
+        futures = [self._executor.submit(scan, begin, end, len(state.items), free_capacity)
+                   for begin, end in ranges]
+
+        # Redução na ordem dos blocos: em caso de empate vale o bloco anterior
+        best_improvement = 1e-9
+        best_move = None
+        for future in futures:
+            improvement, move = future.result()
+            if move is not None and improvement > best_improvement:
+                best_improvement = improvement
+                best_move = move
+        return best_move
+
+    def swap_1_1(self, state):
+        """Busca Local (Troca 1-1) paralela sobre o estado. Mesmo movimento de _local_search_swap_1_1_state."""
+        num_solution_items = len(state.items)
+        if num_solution_items * (len(state.in_solution) - num_solution_items) < _MIN_PARALLEL_WORK:
+            return _local_search_swap_1_1_pruned(state)
+
+        best_move = self._best_move(_scan_swap_1_1, state, [1] * num_solution_items)
+        if best_move is None:
+            return False
+        item_out, item_in = best_move
+        state.remove(item_out)
+        state.add(item_in)
+        return True
+
+    def swap_2_1(self, state):
+        """Busca Local (Troca 2-1) paralela sobre o estado. Mesmo movimento de _local_search_swap_2_1_state."""
+        num_solution_items = len(state.items)
+        num_pairs = num_solution_items * (num_solution_items - 1) // 2
+        if num_pairs * (len(state.in_solution) - num_solution_items) < _MIN_PARALLEL_WORK:
+            return _local_search_swap_2_1_pruned(state)
+
+        work_per_position = [num_solution_items - 1 - position for position in range(num_solution_items)]
+        best_move = self._best_move(_scan_swap_2_1, state, work_per_position)
+        if best_move is None:
+            return False
+        r1, r2, item_in = best_move
+        state.remove(r1)
+        state.remove(r2)
+        state.add(item_in)
+        return True
+
+    def neighborhoods(self):
+        """Vizinhanças paralelas, no formato de get_state_neighborhoods."""
+        return {'1-1': self.swap_1_1, '2-1': self.swap_2_1}
@@ -0,0 +1,78 @@
+import time
+
+class SearchBudget:
+    """
+    Orçamento de uma busca (tempo de relógio e/ou número de avaliações) e
+    registro "anytime" da melhor solução encontrada até o momento.
+
+    Uma avaliação corresponde a uma varredura completa de uma vizinhança
+    (uma chamada de busca local 1-0, 0-1, 1-1, ...). As buscas consultam
+    'exhausted()' entre uma varredura e outra, então o tempo pode passar do
+    limite em no máximo uma varredura.
+
+    Cada nova melhor solução informada em 'report()' é registrada em 'history'
+    e, se 'on_improvement' for fornecido, repassada a ele como um dicionário:
+        'timestamp' (time.time()), 'elapsed' (segundos desde o início),
+        'evaluations', 'iteration', 'objective_value' e
+        'selected_items_indices' (ordenados).
+
+    Args:
+        time_limit (float, opcional): Tempo máximo, em segundos.
+        max_evaluations (int, opcional): Número máximo de avaliações.
+        on_improvement (callable, opcional): Chamado a cada nova melhor solução.
+    """
+
+    def __init__(self, time_limit=None, max_evaluations=None, on_improvement=None):
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.on_improvement = on_improvement
+        self.start_time = time.perf_counter()
+        self.evaluations = 0
+        self.best_objective = None
+        self.history = []
+
+    @property
+    def is_limited(self):
+        return self.time_limit is not None or self.max_evaluations is not None
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def count_evaluation(self):
+        self.evaluations += 1
+
+    def exhausted(self):
+        """True se o tempo ou as avaliações disponíveis acabaram."""
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        return self.time_limit is not None and self.elapsed() >= self.time_limit
+
+    def report(self, objective_value, solution_indices, iteration=None):
+        """
+        Informa uma solução encontrada pela busca. Só é registrada (e repassada
+        ao callback) se for melhor que a melhor já informada.
+        Retorna True nesse caso.
+        """
+        if self.best_objective is not None and objective_value <= self.best_objective:
+            return False
+        self.best_objective = objective_value
+        event = {
+            'timestamp': time.time(),
+            'elapsed': self.elapsed(),
+            'evaluations': self.evaluations,
+            'iteration': iteration,
+            'objective_value': objective_value,
+        }
+        self.history.append(event)
+        if self.on_improvement is not None:
+            self.on_improvement(dict(event, selected_items_indices=sorted(solution_indices)))
+        return True
+
+    def summary(self):
+        """Parâmetros e consumo do orçamento, para o campo 'params' das soluções."""
+        return {
+            'time_limit': self.time_limit,
+            'max_evaluations': self.max_evaluations,
+            'elapsed': self.elapsed(),
+            'evaluations': self.evaluations,
+        }
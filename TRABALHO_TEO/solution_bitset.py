@@ -0,0 +1,152 @@
+from itertools import compress
+
+# Posições dos bits ligados de cada valor de byte (leitura do formato empacotado)
+_BYTE_OFFSETS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+# Flags 0/1 -> dígitos ASCII, para empacotar com int(..., 2)
+_FLAGS_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_INVERT_FLAGS = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+class SolutionBitset:
+    """
+    Conjunto de itens de uma solução sobre um bytearray de n posições
+    ('flags', 1 para os itens na solução), como o 'in_solution' de
+    SolutionState.
+
+    Substitui os set(...) e as diferenças de conjuntos que as buscas por
+    listas criavam a cada passo: pertinência, adição e remoção custam O(1)
+    sem alocar nada, a cópia é um memcpy de n bytes e o tamanho é mantido a
+    cada adição/remoção (nas construções e nas operações de conjuntos ele vem
+    da contagem de flags, em C). Os laços mais internos podem ler 'flags'
+    diretamente, e as somas de penalidade usam itertools.compress sobre a
+    linha da matriz densa (ver _calculate_item_penalty_with_solution). A
+    iteração e to_list() devolvem os itens em ordem crescente.
+
+    to_bytes() empacota o conjunto em n/8 bytes (o item i é o bit i % 8 do
+    byte i // 8, o formato de evaluate_batch com packed=True). Como set, o
+    objeto é mutável e não é hashable: to_bytes() é a chave imutável para
+    dicionários e conjuntos de soluções.
+    """
+
+    __slots__ = ('flags', 'size')
+
+    def __init__(self, num_items, items=()):
+        flags = self.flags = bytearray(num_items)
+        for item_idx in items:
+            flags[item_idx] = 1
+        self.size = flags.count(1)
+
+    @classmethod
+    def from_flags(cls, flags):
+        """Bitset a partir de flags 0/1 por item (ex.: SolutionState.in_solution), copiadas."""
+        bitset = cls.__new__(cls)
+        bitset.flags = bytearray(flags)
+        bitset.size = bitset.flags.count(1)
+        return bitset
+
+    @classmethod
+    def from_bytes(cls, num_items, data):
+        """Bitset a partir do formato empacotado de to_bytes."""
+        if len(data) != (num_items + 7) >> 3:
+            raise ValueError(f"Bitset de {len(data)} bytes incompatível com {num_items} itens.")
+        bitset = cls(num_items)
+        for byte_idx, byte in enumerate(data):
+            if byte:
+                for offset in _BYTE_OFFSETS[byte]:
+                    item_idx = (byte_idx << 3) + offset
+                    if item_idx < num_items:
+                        bitset.flags[item_idx] = 1
+                        bitset.size += 1
+        return bitset
+
+    @property
+    def num_items(self):
+        return len(self.flags)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, item_idx):
+        return self.flags[item_idx] == 1
+
+    def __iter__(self):
+        return compress(range(len(self.flags)), self.flags)
+
+    def __eq__(self, other):
+        if not isinstance(other, SolutionBitset):
+            return NotImplemented
+        return self.flags == other.flags
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"SolutionBitset({self.num_items}, {self.to_list()})"
+
+    def add(self, item_idx):
+        """Adiciona 'item_idx' (sem efeito se já estiver no conjunto)."""
+        if not self.flags[item_idx]:
+            self.flags[item_idx] = 1
+            self.size += 1
+
+    def remove(self, item_idx):
+        """Remove 'item_idx'; lança KeyError se ele não estiver no conjunto."""
+        if not self.flags[item_idx]:
+            raise KeyError(item_idx)
+        self.flags[item_idx] = 0
+        self.size -= 1
+
+    def discard(self, item_idx):
+        """Remove 'item_idx' (sem efeito se não estiver no conjunto)."""
+        if self.flags[item_idx]:
+            self.flags[item_idx] = 0
+            self.size -= 1
+
+    def copy(self):
+        """Cópia independente. Complexidade: O(n), em C."""
+        clone = SolutionBitset.__new__(SolutionBitset)
+        clone.flags = bytearray(self.flags)
+        clone.size = self.size
+        return clone
+
+    def complement(self):
+        """Novo bitset com os itens fora do conjunto (ex.: os itens disponíveis para adição)."""
+        clone = SolutionBitset.__new__(SolutionBitset)
+        clone.flags = self.flags.translate(_INVERT_FLAGS)
+        clone.size = len(self.flags) - self.size
+        return clone
+
+    def to_list(self):
+        """Índices dos itens, em ordem crescente."""
+        return list(self)
+
+    def to_bytes(self):
+        """Conjunto empacotado em n/8 bytes (imutável e hashable), aceito por evaluate_batch(packed=True)."""
+        if not self.flags:
+            return b''
+        value = int(self.flags[::-1].translate(_FLAGS_TO_DIGITS), 2)
+        return value.to_bytes((len(self.flags) + 7) >> 3, 'little')
+
+    # Com uma flag 0/1 por byte, as operações bit a bit sobre os inteiros
+    # formados pelos bytearrays atuam byte a byte, sem carregar entre bytes.
+    def _combine(self, other, operation):
+        if len(self.flags) != len(other.flags):
+            raise ValueError("Os bitsets devem ter o mesmo número de itens.")
+        value = operation(int.from_bytes(self.flags, 'little'), int.from_bytes(other.flags, 'little'))
+        return SolutionBitset.from_flags(value.to_bytes(len(self.flags), 'little'))
+
+    def __and__(self, other):
+        return self._combine(other, int.__and__)
+
+    def __or__(self, other):
+        return self._combine(other, int.__or__)
+
+    def __xor__(self, other):
+        return self._combine(other, int.__xor__)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda value, other_value: value & ~other_value)
+
+    def distance(self, other):
+        """Número de itens em que as soluções diferem (tamanho da diferença simétrica)."""
+        if len(self.flags) != len(other.flags):
+            raise ValueError("Os bitsets devem ter o mesmo número de itens.")
+        return bin(int.from_bytes(self.flags, 'little') ^ int.from_bytes(other.flags, 'little')).count('1')
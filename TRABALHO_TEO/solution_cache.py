@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+class SolutionCache:
+    """
+    Cache LRU limitado de soluções já refinadas, indexado pelo hash de Zobrist
+    do conjunto de itens (SolutionState.zobrist_hash).
+
+    Cada entrada guarda o ótimo local alcançado a partir daquela solução, como
+    (itens, valor objetivo). Ao passar de 'max_size' entradas, a usada há mais
+    tempo é descartada. 'hits' e 'misses' contam as consultas, para ajustar o
+    tamanho do cache.
+
+    Colisões de hash (duas soluções diferentes com o mesmo hash de 64 bits) não
+    são verificadas: a probabilidade é desprezível para os tamanhos usados.
+    """
+
+    def __init__(self, max_size=1024):
+        if max_size < 1:
+            raise ValueError("O tamanho do cache deve ser pelo menos 1.")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, solution_hash):
+        """Retorna (itens, objetivo) do ótimo local guardado, ou None."""
+        entry = self._entries.get(solution_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(solution_hash)
+        self.hits += 1
+        return entry
+
+    def put(self, solution_hash, items, objective_value):
+        """Guarda o ótimo local (itens, objetivo) alcançado a partir de 'solution_hash'."""
+        self._entries[solution_hash] = (tuple(items), objective_value)
+        self._entries.move_to_end(solution_hash)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """Contadores do cache, para o campo 'params' das soluções."""
+        lookups = self.hits + self.misses
+        return {
+            'max_size': self.max_size,
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
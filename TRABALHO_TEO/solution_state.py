@@ -0,0 +1,145 @@
+from solution_bitset import SolutionBitset
+from utilities import calculate_solution_value, calculate_solution_weight, get_forfeit_neighbors, get_zobrist_keys
+
+class SolutionState:
+    """
+    Estado incremental de uma solução do KPF.
+
+    Mantém, para cada item da instância, a penalidade total que ele tem com os
+    itens atualmente na solução ('penalty_with_solution'), além do peso, lucro,
+    custo de penalidade e valor objetivo da solução. Adicionar ou remover um
+    item custa O(grau do item), e os deltas de qualquer movimento 1-0, 0-1,
+    1-1 ou 2-1 passam a ser calculados em O(1) (mais a consulta de um par).
+
+    'dont_look' guarda os bits "don't look" da vizinhança 2-1 com listas de
+    candidatos: o bit de um item é ligado quando uma varredura a partir dele
+    falha e desligado sempre que ele ou um de seus vizinhos de penalidade
+    entra ou sai da solução.
+
+    'zobrist_hash' é o hash de Zobrist do conjunto de itens (XOR das chaves de
+    get_zobrist_keys), mantido em O(1) por adição/remoção e independente da
+    ordem dos itens.
+
+    A ordem de 'items' reproduz a das listas usadas pelas buscas locais
+    (remoções preservam a ordem, adições vão para o final), para que os
+    critérios de desempate continuem os mesmos.
+    """
+
+    def __init__(self, instance_data, solution_indices=()):
+        self.instance_data = instance_data
+        self.profits = instance_data['profits']
+        self.weights = instance_data['weights']
+        self.capacity = instance_data['capacity']
+        self.forfeit_costs_matrix = instance_data['forfeit_costs_matrix']
+        self.neighbors = get_forfeit_neighbors(instance_data)
+        self.zobrist_keys = get_zobrist_keys(instance_data)
+
+        num_items = instance_data['num_items']
+        self.items = []
+        self.in_solution = bytearray(num_items)
+        self.penalty_with_solution = [0] * num_items
+        self.dont_look = bytearray(num_items)
+        self.total_weight = 0
+        self.total_profit = 0
+        self.total_forfeit_cost = 0
+        self.zobrist_hash = 0
+
+        for item_idx in solution_indices:
+            self.add(item_idx)
+
+    @property
+    def objective_value(self):
+        return self.total_profit - self.total_forfeit_cost
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item_idx):
+        return self.in_solution[item_idx] == 1
+
+    def add(self, item_idx):
+        """Adiciona 'item_idx' à solução. Complexidade: O(grau do item)."""
+        self.items.append(item_idx)
+        self.in_solution[item_idx] = 1
+        self.total_weight += self.weights[item_idx]
+        self.total_profit += self.profits[item_idx]
+        self.total_forfeit_cost += self.penalty_with_solution[item_idx]
+        self.zobrist_hash ^= self.zobrist_keys[item_idx]
+        penalty_with_solution = self.penalty_with_solution
+        dont_look = self.dont_look
+        dont_look[item_idx] = 0
+        for neighbor_idx, cost in self.neighbors[item_idx]:
+            penalty_with_solution[neighbor_idx] += cost
+            dont_look[neighbor_idx] = 0
+
+    def remove(self, item_idx):
+        """Remove 'item_idx' da solução. Complexidade: O(s + grau do item)."""
+        self.items.remove(item_idx)
+        self.in_solution[item_idx] = 0
+        self.total_weight -= self.weights[item_idx]
+        self.total_profit -= self.profits[item_idx]
+        self.total_forfeit_cost -= self.penalty_with_solution[item_idx]
+        self.zobrist_hash ^= self.zobrist_keys[item_idx]
+        penalty_with_solution = self.penalty_with_solution
+        dont_look = self.dont_look
+        dont_look[item_idx] = 0
+        for neighbor_idx, cost in self.neighbors[item_idx]:
+            penalty_with_solution[neighbor_idx] -= cost
+            dont_look[neighbor_idx] = 0
+
+    def pair_cost(self, item_a, item_b):
+        """Custo de penalidade do par {item_a, item_b}."""
+        return self.forfeit_costs_matrix[item_a][item_b]
+
+    def add_gain(self, item_idx):
+        """Variação do objetivo ao adicionar 'item_idx' (lucro - penalidade nova)."""
+        return self.profits[item_idx] - self.penalty_with_solution[item_idx]
+
+    def remove_gain(self, item_idx):
+        """Variação do objetivo ao remover 'item_idx' (penalidade liberada - lucro)."""
+        return self.penalty_with_solution[item_idx] - self.profits[item_idx]
+
+    def clear_dont_look(self):
+        """Desliga todos os bits "don't look"."""
+        self.dont_look = bytearray(len(self.dont_look))
+
+    def verify(self):
+        """
+        Confere os totais mantidos por deltas com o recálculo completo
+        (calculate_solution_value, O(s^2)). Usado no modo de verificação das
+        buscas; lança RuntimeError se houver divergência.
+        """
+        profit, forfeit_cost, _ = calculate_solution_value(self.items, self.profits, self.forfeit_costs_matrix)
+        weight = calculate_solution_weight(self.items, self.weights)
+        expected = (weight, profit, forfeit_cost)
+        tracked = (self.total_weight, self.total_profit, self.total_forfeit_cost)
+        if expected != tracked:
+            raise RuntimeError(f"Estado incremental divergente: (peso, lucro, penalidade) = {tracked}, "
+                               f"recalculado = {expected}.")
+
+    def copy(self):
+        """Cópia independente do estado. Complexidade: O(n)."""
+        clone = SolutionState.__new__(SolutionState)
+        clone.__dict__.update(self.__dict__)
+        clone.items = list(self.items)
+        clone.in_solution = bytearray(self.in_solution)
+        clone.penalty_with_solution = list(self.penalty_with_solution)
+        clone.dont_look = bytearray(self.dont_look)
+        return clone
+
+    def to_bitset(self):
+        """Conjunto de itens como SolutionBitset (cópia de 'in_solution'). Complexidade: O(n)."""
+        return SolutionBitset.from_flags(self.in_solution)
+
+    def to_solution_dict(self, params=None):
+        """Converte o estado no dicionário de solução usado pelas heurísticas."""
+        solution = {
+            'selected_items_indices': sorted(self.items),
+            'total_weight': self.total_weight,
+            'total_profit': self.total_profit,
+            'total_forfeit_cost': self.total_forfeit_cost,
+            'objective_value': self.objective_value,
+        }
+        if params is not None:
+            solution['params'] = params
+        return solution
@@ -0,0 +1,192 @@
+import argparse
+import csv
+import glob
+import os
+import statistics
+import sys
+
+from trace_recorder import load_trace
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+except ImportError:  # matplotlib é opcional: sem ele só a tabela e o CSV são gerados
+    plt = None
+
+# ----------------------------------------------------------------------------------
+# CURVAS TIME-TO-TARGET (TTT) E PERFIS DE CONVERGÊNCIA
+# A partir dos traços gravados por TraceRecorder (um por execução/semente),
+# calcula para cada algoritmo o tempo (ou número de avaliações) até a
+# incumbente alcançar um valor alvo e a distribuição empírica (ECDF) desses
+# tempos entre as sementes, no estilo dos gráficos TTT de Aiex, Resende e
+# Ribeiro: o i-ésimo menor tempo de n execuções recebe probabilidade (i - 0.5) / n.
+# ----------------------------------------------------------------------------------
+
+MEASURES = ('elapsed', 'evaluations')
+
+def time_to_target(trace, target, measure='elapsed'):
+    """
+    Tempo ('elapsed') ou avaliações ('evaluations') até a incumbente do traço
+    alcançar 'target'. Retorna None se a execução não alcançou o alvo.
+    """
+    if measure not in MEASURES:
+        raise ValueError(f"Medida desconhecida: '{measure}' (use uma de {MEASURES}).")
+    for event in trace['events']:
+        if event['objective_value'] >= target:
+            return event[measure]
+    return None
+
+def ttt_ecdf(traces, target, measure='elapsed'):
+    """
+    ECDF dos tempos até o alvo. Retorna a lista ordenada de (tempo,
+    probabilidade) das execuções que alcançaram o alvo; as que não
+    alcançaram contam no total n, e a curva termina abaixo de 1.
+    """
+    times = sorted(value for value in (time_to_target(trace, target, measure) for trace in traces)
+                   if value is not None)
+    num_runs = len(traces)
+    return [(value, (position + 0.5) / num_runs) for position, value in enumerate(times)]
+
+def convergence_profile(trace, points, measure='elapsed'):
+    """Melhor objetivo do traço em cada ponto de 'points' (None antes do primeiro evento)."""
+    profile = []
+    position = 0
+    best = None
+    events = trace['events']
+    for point in points:
+        while position < len(events) and events[position][measure] <= point:
+            best = events[position]['objective_value']
+            position += 1
+        profile.append(best)
+    return profile
+
+def group_traces(traces):
+    """Agrupa os traços por instância e algoritmo: {instância: {algoritmo: [traços]}}."""
+    groups = {}
+    for trace in traces:
+        groups.setdefault(trace.get('instance'), {}).setdefault(trace['algorithm'], []).append(trace)
+    return groups
+
+def best_known_value(traces):
+    """Melhor objetivo alcançado por qualquer um dos traços."""
+    return max(event['objective_value'] for trace in traces for event in trace['events'])
+
+def summarize(traces, target, measure='elapsed'):
+    """Resumo das execuções de um algoritmo: quantas alcançaram o alvo e os tempos até ele."""
+    times = [value for value in (time_to_target(trace, target, measure) for trace in traces) if value is not None]
+    return {
+        'runs': len(traces),
+        'reached': len(times),
+        'mean': statistics.mean(times) if times else None,
+        'median': statistics.median(times) if times else None,
+        'max': max(times) if times else None,
+    }
+
+def plot_ttt(traces_by_algorithm, target, output_path, measure='elapsed', title=None):
+    """Grava o gráfico das ECDFs de tempo até o alvo (uma curva por algoritmo)."""
+    if plt is None:
+        raise ImportError("Os gráficos requerem o pacote matplotlib instalado.")
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    for algorithm, traces in sorted(traces_by_algorithm.items()):
+        points = ttt_ecdf(traces, target, measure)
+        if points:
+            ax.step([value for value, _ in points], [probability for _, probability in points],
+                    where='post', marker='o', markersize=3, label=f"{algorithm} ({len(points)}/{len(traces)})")
+    ax.set_xlabel('tempo até o alvo (s)' if measure == 'elapsed' else 'avaliações até o alvo')
+    ax.set_ylabel('probabilidade acumulada')
+    ax.set_ylim(0, 1.02)
+    ax.set_title(title or f"Time-to-target (alvo = {target:g})", fontsize=9)
+    ax.grid(alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+
+def plot_convergence(traces_by_algorithm, output_path, measure='elapsed', num_points=200, title=None):
+    """Grava o perfil de convergência mediano (entre as sementes) de cada algoritmo."""
+    if plt is None:
+        raise ImportError("Os gráficos requerem o pacote matplotlib instalado.")
+    horizon = max(event[measure] or 0 for traces in traces_by_algorithm.values()
+                  for trace in traces for event in trace['events'])
+    points = [horizon * step / (num_points - 1) for step in range(num_points)]
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    for algorithm, traces in sorted(traces_by_algorithm.items()):
+        profiles = [convergence_profile(trace, points, measure) for trace in traces]
+        medians = []
+        for values in zip(*profiles):
+            known = [value for value in values if value is not None]
+            medians.append(statistics.median(known) if known else None)
+        ax.step(points, medians, where='post', label=algorithm)
+    ax.set_xlabel('tempo (s)' if measure == 'elapsed' else 'avaliações')
+    ax.set_ylabel('objetivo da incumbente (mediana)')
+    ax.set_title(title or 'Perfil de convergência', fontsize=9)
+    ax.grid(alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path)
+    plt.close(fig)
+
+def _format(value):
+    return '-' if value is None else f"{value:.4g}"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Curvas time-to-target e perfis de convergência a partir de traços de execução."
+    )
+    parser.add_argument('traces', nargs='+', help="Arquivos ou padrões glob de traços (.json de TraceRecorder).")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('-t', '--target', type=float, help="Valor alvo do objetivo.")
+    target.add_argument('-f', '--target-fraction', type=float, default=1.0,
+                        help="Alvo como fração do melhor valor encontrado na instância (padrão: 1.0).")
+    parser.add_argument('-m', '--measure', choices=MEASURES, default='elapsed',
+                        help="Eixo das curvas: tempo ou número de avaliações.")
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help="Diretório dos gráficos (ttt_<instância>.png e convergence_<instância>.png).")
+    parser.add_argument('--csv', default=None, help="Grava os pontos das ECDFs em CSV.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.output_dir is not None and plt is None:
+        print("Erro: os gráficos (--output-dir) requerem o pacote matplotlib instalado.")
+        return 1
+    paths = []
+    for pattern in args.traces:
+        paths.extend(sorted(glob.glob(pattern)) or ([pattern] if os.path.isfile(pattern) else []))
+    if not paths:
+        print("Erro: nenhum traço encontrado.")
+        return 1
+    traces = [trace for trace in map(load_trace, paths) if trace['events']]
+
+    ecdf_rows = []
+    for instance, traces_by_algorithm in sorted(group_traces(traces).items(), key=lambda item: str(item[0])):
+        instance_traces = [trace for group in traces_by_algorithm.values() for trace in group]
+        target = args.target if args.target is not None else args.target_fraction * best_known_value(instance_traces)
+        print(f"\n{instance} | alvo = {target:g} ({args.measure})")
+        print(f"  {'algoritmo':<16} {'alcançou':>9} {'média':>10} {'mediana':>10} {'máximo':>10}")
+        for algorithm, algorithm_traces in sorted(traces_by_algorithm.items()):
+            summary = summarize(algorithm_traces, target, args.measure)
+            print(f"  {algorithm:<16} {summary['reached']:>4}/{summary['runs']:<4} {_format(summary['mean']):>10} "
+                  f"{_format(summary['median']):>10} {_format(summary['max']):>10}")
+            for value, probability in ttt_ecdf(algorithm_traces, target, args.measure):
+                ecdf_rows.append({'instance': instance, 'algorithm': algorithm, 'target': target,
+                                  args.measure: value, 'probability': probability})
+
+        if args.output_dir is not None:
+            os.makedirs(args.output_dir, exist_ok=True)
+            name = os.path.splitext(os.path.basename(str(instance)))[0]
+            plot_ttt(traces_by_algorithm, target, os.path.join(args.output_dir, f"ttt_{name}.png"),
+                     args.measure, title=f"{name} (alvo = {target:g})")
+            plot_convergence(traces_by_algorithm, os.path.join(args.output_dir, f"convergence_{name}.png"),
+                             args.measure, title=name)
+
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['instance', 'algorithm', 'target', args.measure, 'probability'])
+            writer.writeheader()
+            writer.writerows(ecdf_rows)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import json
+
+# Campos guardados de cada evento de melhoria (os itens da solução ficam de fora)
+TRACE_FIELDS = ('elapsed', 'evaluations', 'iteration', 'objective_value')
+
+class TraceRecorder:
+    """
+    Registra a trajetória da incumbente de uma execução: um evento
+    (tempo decorrido, avaliações, iteração, objetivo) por melhoria.
+
+    É passado às metaheurísticas como 'on_improvement' (ver SearchBudget):
+        recorder = TraceRecorder('ils_vnd', instance='inst.txt', seed=0)
+        iterated_local_search_vnd(..., on_improvement=recorder)
+        recorder.save('traces/inst__ils_vnd__0.json')
+
+    Os traços gravados são lidos por time_to_target.py para gerar as curvas
+    time-to-target e os perfis de convergência.
+    """
+
+    def __init__(self, algorithm, instance=None, seed=None):
+        self.algorithm = algorithm
+        self.instance = instance
+        self.seed = seed
+        self.events = []
+
+    def __call__(self, event):
+        # Converte para float/int do Python: os valores podem vir como escalares NumPy
+        elapsed, evaluations, iteration, objective_value = (event.get(field) for field in TRACE_FIELDS)
+        self.events.append({
+            'elapsed': None if elapsed is None else float(elapsed),
+            'evaluations': None if evaluations is None else int(evaluations),
+            'iteration': None if iteration is None else int(iteration),
+            'objective_value': None if objective_value is None else float(objective_value),
+        })
+
+    def __len__(self):
+        return len(self.events)
+
+    def record(self, elapsed, objective_value, evaluations=0, iteration=None):
+        """Registra um evento diretamente (algoritmos sem 'on_improvement')."""
+        self({'elapsed': elapsed, 'evaluations': evaluations, 'iteration': iteration,
+              'objective_value': objective_value})
+
+    def to_dict(self):
+        return {
+            'algorithm': self.algorithm,
+            'instance': self.instance,
+            'seed': self.seed,
+            'events': self.events,
+        }
+
+    def save(self, path):
+        """Grava o traço em JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+def load_trace(path):
+    """Lê um traço gravado por TraceRecorder.save (dicionário de to_dict)."""
+    with open(path) as f:
+        trace = json.load(f)
+    if 'events' not in trace:
+        raise ValueError(f"Arquivo '{path}' não é um traço de execução (falta o campo 'events').")
+    return trace
@@ -1,13 +1,85 @@
+import heapq
 import os
 import sys
 import random
+from array import array
+from itertools import compress
 
-def read_kpf_instance(filepath):
+from solution_bitset import SolutionBitset
+
+# Assinatura dos arquivos de instância no formato binário (binary_instance.py)
+KPF_BINARY_MAGIC = b'KPFB'
+
+class _ForfeitRow(dict):
+    """Linha esparsa da matriz de penalidades: pares ausentes custam 0."""
+    __slots__ = ()
+
+    def __missing__(self, key):
+        return 0
+
+class SparseForfeitMatrix:
+    """
+    Representação esparsa da matriz de custos de penalidade (nI x nI).
+
+    Cada linha é um dicionário {item_vizinho: custo}, de modo que a memória
+    ocupada é O(nI + nP) em vez de O(nI^2). O acesso matrix[i][j] continua
+    funcionando (pares sem penalidade devolvem 0), então qualquer código
+    escrito para a matriz densa aceita esta representação sem alterações.
+    """
+    __slots__ = ('rows', '_csr')
+
+    def __init__(self, num_items):
+        self.rows = [_ForfeitRow() for _ in range(num_items)]
+        self._csr = None
+
+    @classmethod
+    def from_csr(cls, indptr, indices, costs):
+        """
+        Cria a matriz a partir de arrays CSR simétricos (ver get_forfeit_csr).
+        As linhas são montadas sob demanda, no primeiro acesso a cada item,
+        então a criação é O(nI) independentemente de nP.
+        """
+        matrix = cls.__new__(cls)
+        matrix.rows = [None] * (len(indptr) - 1)
+        matrix._csr = (indptr, indices, costs)
+        return matrix
+
+    def _build_row(self, item_idx):
+        indptr, indices, costs = self._csr
+        begin, end = int(indptr[item_idx]), int(indptr[item_idx + 1])
+        row = _ForfeitRow(zip(map(int, indices[begin:end]), map(int, costs[begin:end])))
+        self.rows[item_idx] = row
+        return row
+
+    def __getitem__(self, item_idx):
+        row = self.rows[item_idx]
+        if row is None:
+            row = self._build_row(item_idx)
+        return row
+
+    def __len__(self):
+        return len(self.rows)
+
+    def iter_rows(self):
+        """Percorre as linhas (dicionários {vizinho: custo}) de todos os itens."""
+        for item_idx in range(len(self.rows)):
+            yield self[item_idx]
+
+    def set_cost(self, id1, id2, cost):
+        """Registra a penalidade do par {id1, id2} (a matriz é simétrica)."""
+        self[id1][id2] = cost
+        self[id2][id1] = cost
+
+def read_kpf_instance(filepath, sparse=None):
     """
     Lê um arquivo de instância do Problema da Mochila com Penalidades (KPF).
 
     Args:
         filepath (str): O caminho para o arquivo da instância.
+        sparse (bool | None): Se True, armazena as penalidades em uma SparseForfeitMatrix
+                       (memória O(nI + nP)) em vez da matriz densa nI x nI.
+                       None usa o padrão do formato: densa para arquivos texto
+                       e esparsa para arquivos binários.
 
     Returns:
         dict: Um dicionário contendo os dados da instância:
@@ -16,43 +88,61 @@ def read_kpf_instance(filepath):
             'capacity' (int): Capacidade da mochila (kS).
             'profits' (list): Lista de lucros dos itens.
             'weights' (list): Lista de pesos dos itens.
-            'forfeit_costs_matrix' (list of lists): Matriz de custos de penalidade (nI x nI).
+            'forfeit_costs_matrix' (list of lists | SparseForfeitMatrix):
+                Matriz de custos de penalidade (nI x nI), densa ou esparsa.
             'filepath': Caminho do arquivo lido.
+        Arquivos no formato binário (ver binary_instance.py) são reconhecidos
+        pelo cabeçalho e carregados via mmap.
     """
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
+    with open(filepath, 'rb') as f:
+        is_binary = f.read(len(KPF_BINARY_MAGIC)) == KPF_BINARY_MAGIC
+    if is_binary:
+        from binary_instance import read_kpf_binary_instance
+        return read_kpf_binary_instance(filepath, sparse=sparse is not False)
 
-    # Linha 1: nI, nP, kS
-    nI, nP, kS = map(int, lines[0].strip().split())
+    with open(filepath, 'r') as f:
+        lines = _InstanceLineReader(f)
 
-    # Linha 2: lucros dos itens
-    item_profits = list(map(int, lines[1].strip().split()))
+        # Linha 1: nI, nP, kS
+        nI, nP, kS = _read_int_line(lines, filepath, 'cabeçalho (nI nP kS)', 3)
 
-    # Linha 3: pesos dos itens
-    item_weights = list(map(int, lines[2].strip().split()))
+        # Linha 2: lucros dos itens
+        item_profits = _read_int_line(lines, filepath, 'lucros', nI)
 
-    # Matriz de custos de penalidade (inicializada com zeros)
-    forfeit_costs_matrix = [[0] * nI for _ in range(nI)]
+        # Linha 3: pesos dos itens
+        item_weights = _read_int_line(lines, filepath, 'pesos', nI)
 
-    line_idx = 3
-    for _ in range(nP):
-        # Linha: nA_i fC_i nI_i (e.g., "1 100 2")
-        # nA_i é sempre 1, nI_i é sempre 2, conforme a descrição do README.
-        parts = lines[line_idx].strip().split()
-        fC_i = int(parts[1])  # Custo da penalidade
-        line_idx += 1
+        # Pares de penalidade, guardados em arrays compactos na ordem do arquivo
+        pair_first = array('q')
+        pair_second = array('q')
+        pair_costs = array('q')
+        for _ in range(nP):
+            # Linha: nA_i fC_i nI_i (e.g., "1 100 2")
+            # nA_i é sempre 1, nI_i é sempre 2, conforme a descrição do README.
+            _, fC_i, _ = _read_int_line(lines, filepath, 'penalidade (1 custo 2)', 3)
 
-        # Linha: id_0_0 id_0_1 (e.g., "item_idx1 item_idx2")
-        # Os IDs são 0-indexed.
-        id1, id2 = map(int, lines[line_idx].strip().split())
-        line_idx += 1
+            # Linha: id_0_0 id_0_1 (e.g., "item_idx1 item_idx2")
+            # Os IDs são 0-indexed.
+            id1, id2 = _read_int_line(lines, filepath, 'par de itens', 2)
+            if not (0 <= id1 < nI and 0 <= id2 < nI):
+                raise ValueError(f"{filepath}, linha {lines.line_number}: "
+                                 f"item fora do intervalo [0, {nI}) no par ({id1}, {id2}).")
+            pair_first.append(id1)
+            pair_second.append(id2)
+            pair_costs.append(fC_i)
 
-        # Armazena o custo da penalidade na matriz
-        # A penalidade fC_i aplica-se se ambos id1 e id2 estiverem na solução.
-        forfeit_costs_matrix[id1][id2] = fC_i
-        forfeit_costs_matrix[id2][id1] = fC_i # A matriz é simétrica
+    # A penalidade fC_i aplica-se se ambos id1 e id2 estiverem na solução.
+    # Pares repetidos no arquivo ficam com o último custo lido.
+    if sparse:
+        indptr, indices, costs = _pairs_to_csr(nI, pair_first, pair_second, pair_costs)
+        forfeit_costs_matrix = SparseForfeitMatrix.from_csr(indptr, indices, costs)
+    else:
+        forfeit_costs_matrix = [[0] * nI for _ in range(nI)]
+        for id1, id2, fC_i in zip(pair_first, pair_second, pair_costs):
+            forfeit_costs_matrix[id1][id2] = fC_i
+            forfeit_costs_matrix[id2][id1] = fC_i # A matriz é simétrica
 
-    return {
+    instance_data = {
         'num_items': nI,
         'num_forfeits': nP,
         'capacity': kS,
@@ -61,13 +151,178 @@ def read_kpf_instance(filepath):
         'forfeit_costs_matrix': forfeit_costs_matrix,
         'filepath': filepath
     }
+    if sparse:
+        instance_data['forfeit_csr'] = (indptr, indices, costs)
+    return instance_data
+
+class _InstanceLineReader:
+    """
+    Percorre as linhas de um arquivo aberto sem carregá-lo inteiro na memória,
+    guardando o número da última linha lida (para as mensagens de erro).
+    """
+    __slots__ = ('_file', 'line_number')
+
+    def __init__(self, f):
+        self._file = f
+        self.line_number = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._file)
+        self.line_number += 1
+        return line
 
-def load_instances_from_directory(directory_path):
+def _read_int_line(lines, filepath, description, expected_count):
+    """
+    Lê a próxima linha de 'lines' como uma lista de 'expected_count' inteiros.
+    Lança ValueError indicando a linha do arquivo se ela faltar ou for inválida.
+    """
+    line = next(lines, None)
+    if line is None:
+        raise ValueError(f"{filepath}, linha {lines.line_number + 1}: fim de arquivo inesperado "
+                         f"(esperada a linha de {description}).")
+    try:
+        values = list(map(int, line.split()))
+    except ValueError:
+        raise ValueError(f"{filepath}, linha {lines.line_number}: valor não inteiro na linha "
+                         f"de {description}: {line.strip()[:60]!r}") from None
+    if len(values) != expected_count:
+        raise ValueError(f"{filepath}, linha {lines.line_number}: esperados {expected_count} "
+                         f"valores na linha de {description}, encontrados {len(values)}.")
+    return values
+
+def _pairs_to_csr(num_items, pair_first, pair_second, pair_costs):
+    """
+    Monta o CSR simétrico (o mesmo de get_forfeit_csr) a partir dos pares na
+    ordem do arquivo. Pares repetidos ficam com o último custo e pares de custo
+    zero são descartados, como na matriz densa.
+    """
+    # Contagem de vizinhos e posições iniciais (counting sort, estável)
+    degree = array('q', bytes(8 * (num_items + 1)))
+    for id1, id2 in zip(pair_first, pair_second):
+        degree[id1 + 1] += 1
+        degree[id2 + 1] += 1
+    for item_idx in range(num_items):
+        degree[item_idx + 1] += degree[item_idx]
+    position = array('q', degree)
+    raw_indices = array('q', bytes(8 * degree[num_items]))
+    raw_costs = array('q', raw_indices)
+    for id1, id2, cost in zip(pair_first, pair_second, pair_costs):
+        raw_indices[position[id1]] = id2
+        raw_costs[position[id1]] = cost
+        position[id1] += 1
+        raw_indices[position[id2]] = id1
+        raw_costs[position[id2]] = cost
+        position[id2] += 1
+    del position
+
+    # Remove repetições linha a linha (o último custo prevalece)
+    indptr = array('q', [0])
+    indices = array('q')
+    costs = array('q')
+    for item_idx in range(num_items):
+        begin, end = degree[item_idx], degree[item_idx + 1]
+        row = dict(zip(raw_indices[begin:end], raw_costs[begin:end]))
+        for neighbor_idx, cost in row.items():
+            if cost != 0:
+                indices.append(neighbor_idx)
+                costs.append(cost)
+        indptr.append(len(indices))
+    return indptr, indices, costs
+
+def _build_forfeit_neighbors(forfeit_costs_matrix):
+    """Listas de vizinhos (item_vizinho, custo) de cada item, a partir da matriz densa ou esparsa."""
+    if isinstance(forfeit_costs_matrix, SparseForfeitMatrix):
+        return [[(j, cost) for j, cost in row.items() if cost != 0]
+                for row in forfeit_costs_matrix.iter_rows()]
+    return [[(j, cost) for j, cost in enumerate(row) if cost != 0]
+            for row in forfeit_costs_matrix]
+
+def get_forfeit_neighbors(instance_data):
+    """
+    Retorna, para cada item, a lista de pares (item_vizinho, custo) com que ele
+    tem penalidade. A lista é calculada uma única vez e guardada em
+    instance_data['forfeit_neighbors'].
+    Complexidade: O(nI + nP) para a matriz esparsa, O(nI^2) para a densa.
+    """
+    neighbors = instance_data.get('forfeit_neighbors')
+    if neighbors is None:
+        neighbors = _build_forfeit_neighbors(instance_data['forfeit_costs_matrix'])
+        instance_data['forfeit_neighbors'] = neighbors
+    return neighbors
+
+# Semente fixa das chaves de Zobrist: o hash de uma solução é o mesmo em
+# qualquer execução (e não consome o gerador global 'random')
+_ZOBRIST_SEED = 0x4B5046
+
+def get_zobrist_keys(instance_data):
+    """
+    Retorna uma chave aleatória de 64 bits por item (hashing de Zobrist): o hash
+    de um conjunto de itens é o XOR das chaves dos seus itens, atualizado em
+    O(1) a cada adição/remoção. Guardadas em instance_data['zobrist_keys'].
+    """
+    keys = instance_data.get('zobrist_keys')
+    if keys is None:
+        rng = random.Random(_ZOBRIST_SEED)
+        keys = [rng.getrandbits(64) for _ in range(instance_data['num_items'])]
+        instance_data['zobrist_keys'] = keys
+    return keys
+
+def get_forfeit_csr(instance_data):
+    """
+    Retorna as listas de vizinhos no formato CSR, como três arrays contíguos de
+    inteiros de 64 bits (array('q')): 'indptr' (nI + 1), 'indices' e 'costs'.
+    Os vizinhos do item i ficam em indices[indptr[i]:indptr[i + 1]].
+    Os arrays podem ser vistos pelo NumPy sem cópia (numpy.frombuffer).
+    O resultado é guardado em instance_data['forfeit_csr'].
+    """
+    csr = instance_data.get('forfeit_csr')
+    if csr is None:
+        neighbors = get_forfeit_neighbors(instance_data)
+        indptr = array('q', [0])
+        indices = array('q')
+        costs = array('q')
+        for item_neighbors in neighbors:
+            for neighbor_idx, cost in item_neighbors:
+                indices.append(neighbor_idx)
+                costs.append(cost)
+            indptr.append(len(indices))
+        csr = (indptr, indices, costs)
+        instance_data['forfeit_csr'] = csr
+    return csr
+
+def get_forfeit_pairs(instance_data):
+    """
+    Retorna os pares com penalidade na forma canônica, sem repetição: três
+    arrays('q') 'first', 'second' e 'costs', com first[k] < second[k].
+    O custo de uma solução x é a soma de costs[k] sobre os pares com os dois
+    itens em x (a forma quadrática x^T F x / 2). Calculado a partir do CSR e
+    guardado em instance_data['forfeit_pairs'].
+    """
+    pairs = instance_data.get('forfeit_pairs')
+    if pairs is None:
+        indptr, indices, costs = get_forfeit_csr(instance_data)
+        first, second, pair_costs = array('q'), array('q'), array('q')
+        for item_idx in range(len(indptr) - 1):
+            for position in range(indptr[item_idx], indptr[item_idx + 1]):
+                neighbor_idx = indices[position]
+                if item_idx < neighbor_idx:
+                    first.append(item_idx)
+                    second.append(neighbor_idx)
+                    pair_costs.append(costs[position])
+        pairs = (first, second, pair_costs)
+        instance_data['forfeit_pairs'] = pairs
+    return pairs
+
+def load_instances_from_directory(directory_path, sparse=None):
     """
     Carrega todas as instâncias de um diretório especificado.
 
     Args:
         directory_path (str): O caminho para o diretório contendo os arquivos de instância.
+        sparse (bool | None): Repassado para read_kpf_instance.
 
     Returns:
         list: Uma lista de dicionários, onde cada dicionário representa uma instância lida.
@@ -82,7 +337,7 @@ def load_instances_from_directory(directory_path):
         filepath = os.path.join(directory_path, filename)
         if os.path.isfile(filepath):
             try:
-                instance_data = read_kpf_instance(filepath)
+                instance_data = read_kpf_instance(filepath, sparse=sparse)
                 instances.append(instance_data)
                 print(f"  Lida instância: {filename}")
             except Exception as e:
@@ -103,7 +358,12 @@ def print_forfeit_pairs(instance_data):
     print("\n--- Conjuntos de Penalidade (Pares e Custos) ---")
     found_penalties = False
     for i in range(num_items):
-        for j in range(i + 1, num_items): # Começa de i + 1 para pegar apenas pares (i, j) onde i < j
+        if isinstance(forfeit_costs_matrix, SparseForfeitMatrix):
+            # Percorre apenas os vizinhos do item, em vez da linha inteira
+            partners = sorted(j for j in forfeit_costs_matrix[i] if j > i)
+        else:
+            partners = range(i + 1, num_items) # Começa de i + 1 para pegar apenas pares (i, j) onde i < j
+        for j in partners:
             cost = forfeit_costs_matrix[i][j]
             if cost > 0:
                 print(f"  Item {i}, Item {j} = {cost}")
@@ -117,6 +377,15 @@ def calculate_solution_value(solution_indices, profits, forfeit_costs_matrix):
     current_profit = sum(profits[i] for i in solution_indices)
     
     current_forfeit_cost = 0
+    if isinstance(forfeit_costs_matrix, SparseForfeitMatrix):
+        # Percorre só os vizinhos de cada item: O(soma dos graus) em vez de O(s^2)
+        solution_set = set(solution_indices)
+        for idx1 in solution_indices:
+            for idx2, cost in forfeit_costs_matrix[idx1].items():
+                if idx1 < idx2 and idx2 in solution_set:
+                    current_forfeit_cost += cost
+        return current_profit, current_forfeit_cost, current_profit - current_forfeit_cost
+
     # Itera sobre pares únicos na solução para somar penalidades
     for i in range(len(solution_indices)):
         for j in range(i + 1, len(solution_indices)):
@@ -130,9 +399,23 @@ def calculate_solution_value(solution_indices, profits, forfeit_costs_matrix):
 def _calculate_item_penalty_with_solution(item_idx, solution_set, forfeit_costs_matrix):
     """
     Calcula o custo de penalidade total que um item 'item_idx' teria com
-    todos os itens em 'solution_set'.
-    Complexidade: O(s), onde s = len(solution_set)
+    todos os itens em 'solution_set' (set ou SolutionBitset).
+    Complexidade: O(s), onde s = len(solution_set), ou O(grau do item)
+    com a matriz esparsa. Com um SolutionBitset e a matriz densa, a linha do
+    item é filtrada pelas flags em C (O(n), sem laço em Python).
     """
+    if isinstance(solution_set, SolutionBitset):
+        row = forfeit_costs_matrix[item_idx]
+        if isinstance(forfeit_costs_matrix, SparseForfeitMatrix):
+            flags = solution_set.flags
+            return sum(cost for sol_item, cost in row.items() if flags[sol_item])
+        return sum(compress(row, solution_set.flags))
+
+    if isinstance(forfeit_costs_matrix, SparseForfeitMatrix):
+        row = forfeit_costs_matrix[item_idx]
+        if len(row) < len(solution_set):
+            return sum(cost for sol_item, cost in row.items() if sol_item in solution_set)
+
     penalty = 0
     # Este loop garante que somamos a penalidade para cada par único {item_idx, sol_item}
     for sol_item in solution_set:
@@ -157,51 +440,87 @@ def _perturbation(solution_indices, instance_data, strength=0.2):
         num_to_remove = 1 # Garante que pelo menos um item seja removido
 
     # Destruir: remove 'num_to_remove' itens aleatórios
-    items_to_remove = set(random.sample(solution_indices, k=min(num_to_remove, len(solution_indices))))
-    perturbed_solution = [item for item in solution_indices if item not in items_to_remove]
+    solution = SolutionBitset(instance_data['num_items'], solution_indices)
+    for item_idx in random.sample(solution_indices, k=min(num_to_remove, len(solution_indices))):
+        solution.discard(item_idx)
+    flags = solution.flags
+    perturbed_solution = [item for item in solution_indices if flags[item]]
     
     current_weight = calculate_solution_weight(perturbed_solution, instance_data['weights'])
     
     # Reconstruir: adiciona os melhores itens possíveis com o espaço disponível
-    available_for_fill = set(range(instance_data['num_items'])) - set(perturbed_solution)
-
-    while True:
-        best_item_to_add = select_best_penalized_item_to_add(
-            available_for_fill, perturbed_solution,
-            current_weight, instance_data['capacity'],
-            instance_data['profits'], instance_data['weights'], instance_data['forfeit_costs_matrix']
-        )
-        if best_item_to_add is not None:
-            perturbed_solution.append(best_item_to_add)
-            current_weight += instance_data['weights'][best_item_to_add]
-            available_for_fill.remove(best_item_to_add)
-        else:
-            break
+    available_for_fill = solution.complement()
+
+    penalty_aware_greedy_fill(
+        perturbed_solution, available_for_fill,
+        current_weight, instance_data['capacity'],
+        instance_data['profits'], instance_data['weights'], instance_data['forfeit_costs_matrix'],
+        forfeit_neighbors=get_forfeit_neighbors(instance_data)
+    )
             
     return perturbed_solution
 
+def _perturbation_state(state, strength=0.2):
+    """
+    Perturbação (Destruir e Reconstruir) sobre um SolutionState, modificado no
+    lugar: mesmos itens e mesma ordem de _perturbation, mas o objetivo é
+    atualizado por deltas a cada remoção/adição, sem recálculo completo.
+    """
+    if not state.items:
+        return state
+
+    num_to_remove = int(len(state.items) * strength)
+    if num_to_remove == 0:
+        num_to_remove = 1 # Garante que pelo menos um item seja removido
+
+    # Destruir: remove 'num_to_remove' itens aleatórios
+    for item_idx in random.sample(state.items, k=min(num_to_remove, len(state.items))):
+        state.remove(item_idx)
+
+    # Novo ponto de partida: a busca local volta a olhar todos os itens
+    state.clear_dont_look()
+
+    # Reconstruir: adiciona os melhores itens possíveis com o espaço disponível
+    penalty_aware_greedy_fill_state(state)
+    return state
+
 def _calculate_penalized_metric(item_idx, current_solution_set,
                                  profits, weights, forfeit_costs_matrix):
     """
     Calcula a métrica (lucro_penalizado / peso) para um item,
-    considerando penalidades com a solução atual.
+    considerando penalidades com a solução atual (set ou SolutionBitset).
     """
     if item_idx < 0 or item_idx >= len(profits):
         return -sys.float_info.max
 
+    if isinstance(current_solution_set, SolutionBitset):
+        penalty = _calculate_item_penalty_with_solution(item_idx, current_solution_set, forfeit_costs_matrix)
+        return _penalized_ratio(profits[item_idx] - penalty, weights[item_idx])
+
     penalized_profit = profits[item_idx]
-    for sol_item_idx in current_solution_set:
-        if sol_item_idx < 0 or sol_item_idx >= len(profits): continue
-        penalized_profit -= forfeit_costs_matrix[item_idx][sol_item_idx]
+    row = forfeit_costs_matrix[item_idx]
+    if isinstance(forfeit_costs_matrix, SparseForfeitMatrix) and len(row) < len(current_solution_set):
+        # Percorre só os vizinhos do item (sempre índices válidos)
+        for sol_item_idx, cost in row.items():
+            if sol_item_idx in current_solution_set:
+                penalized_profit -= cost
+    else:
+        for sol_item_idx in current_solution_set:
+            if sol_item_idx < 0 or sol_item_idx >= len(profits): continue
+            penalized_profit -= row[sol_item_idx]
 
-    if weights[item_idx] <= 0:
-        if penalized_profit > 0 and weights[item_idx] == 0:
+    return _penalized_ratio(penalized_profit, weights[item_idx])
+
+def _penalized_ratio(penalized_profit, weight):
+    """Razão lucro_penalizado / peso, com o tratamento de pesos não positivos."""
+    if weight <= 0:
+        if penalized_profit > 0 and weight == 0:
             return sys.float_info.max
-        elif penalized_profit == 0 and weights[item_idx] == 0: # Neutro se lucro líquido for 0 e peso 0
+        elif penalized_profit == 0 and weight == 0: # Neutro se lucro líquido for 0 e peso 0
              return 0.0
         else: # Peso negativo ou zero com lucro líquido não positivo
             return -sys.float_info.max
-    return penalized_profit / weights[item_idx]
+    return penalized_profit / weight
 
 def select_best_penalized_item_to_add(available_items_set,
                                       current_solution_list, # Lista para manter a ordem se necessário, ou set
@@ -214,13 +533,17 @@ def select_best_penalized_item_to_add(available_items_set,
     best_item_idx = None
     best_metric = -sys.float_info.max # Não adiciona se a melhor métrica for < 0
 
-    current_solution_set = set(current_solution_list)
+    current_solution_set = SolutionBitset(len(profits), current_solution_list)
+    in_solution = current_solution_set.flags
     
-    # Ordena para determinismo no desempate
-    sorted_available_items = sorted(list(available_items_set))
+    # Ordena para determinismo no desempate (um SolutionBitset já itera em ordem)
+    if isinstance(available_items_set, SolutionBitset):
+        sorted_available_items = available_items_set.to_list()
+    else:
+        sorted_available_items = sorted(available_items_set)
 
     for item_idx in sorted_available_items:
-        if item_idx in current_solution_set: # Já está na solução
+        if in_solution[item_idx]: # Já está na solução
             continue
         if current_weight + weights[item_idx] <= capacity:
             metric = _calculate_penalized_metric(item_idx, current_solution_set,
@@ -232,4 +555,138 @@ def select_best_penalized_item_to_add(available_items_set,
     # Adiciona apenas se a melhor métrica for não negativa
     if best_item_idx is not None and best_metric >= 0:
         return best_item_idx
-    return None
\ No newline at end of file
+    return None
+
+def penalty_aware_greedy_fill(solution_list, available_items_set,
+                              current_weight, capacity,
+                              profits, weights, forfeit_costs_matrix,
+                              forfeit_neighbors=None):
+    """
+    Completa 'solution_list' de forma gulosa, adicionando repetidamente o item
+    que select_best_penalized_item_to_add escolheria, até que nenhum item caiba
+    ou a melhor métrica seja negativa. Modifica 'solution_list' e
+    'available_items_set' (set ou SolutionBitset) no lugar e retorna o peso
+    final.
+
+    Os itens ficam em um max-heap indexado pela métrica penalizada. Ao adicionar
+    um item, apenas os seus vizinhos de penalidade são reavaliados (as entradas
+    antigas ficam no heap e são descartadas quando chegam ao topo). Como o peso
+    da solução só cresce, um item que não cabe pode ser descartado de vez.
+    Complexidade: O((n + nP) log n), contra O(n^2 * s) do laço com
+    select_best_penalized_item_to_add. O desempate (menor índice) é o mesmo.
+
+    Args:
+        forfeit_neighbors (list, opcional): Listas de vizinhos de
+            get_forfeit_neighbors; calculadas a partir da matriz se omitidas.
+    """
+    current_solution_set = SolutionBitset(len(profits), solution_list)
+    in_solution = current_solution_set.flags
+    candidates = [item_idx for item_idx in available_items_set if not in_solution[item_idx]]
+
+    if any(weights[item_idx] < 0 for item_idx in candidates):
+        # Com pesos negativos o peso da solução pode diminuir: usa a busca completa
+        while True:
+            best_item_to_add = select_best_penalized_item_to_add(
+                available_items_set, solution_list, current_weight, capacity,
+                profits, weights, forfeit_costs_matrix
+            )
+            if best_item_to_add is None:
+                return current_weight
+            solution_list.append(best_item_to_add)
+            current_weight += weights[best_item_to_add]
+            available_items_set.remove(best_item_to_add)
+
+    if forfeit_neighbors is None:
+        forfeit_neighbors = _build_forfeit_neighbors(forfeit_costs_matrix)
+
+    # Penalidade de cada item com a solução parcial recebida
+    penalty_with_solution = {}
+    for sol_item_idx in current_solution_set:
+        for neighbor_idx, cost in forfeit_neighbors[sol_item_idx]:
+            penalty_with_solution[neighbor_idx] = penalty_with_solution.get(neighbor_idx, 0) + cost
+
+    current_metric = {}
+    heap = []
+    for item_idx in candidates:
+        metric = _penalized_ratio(profits[item_idx] - penalty_with_solution.get(item_idx, 0), weights[item_idx])
+        current_metric[item_idx] = metric
+        heap.append((-metric, item_idx))
+    heapq.heapify(heap)
+
+    while heap:
+        neg_metric, item_idx = heapq.heappop(heap)
+        if current_metric.get(item_idx) != -neg_metric:
+            continue  # Entrada desatualizada ou item já adicionado/descartado
+        if current_weight + weights[item_idx] > capacity:
+            del current_metric[item_idx]  # Nunca mais caberá
+            continue
+        if -neg_metric < 0:
+            break  # Melhor métrica negativa: não adiciona
+
+        solution_list.append(item_idx)
+        current_weight += weights[item_idx]
+        available_items_set.discard(item_idx)
+        del current_metric[item_idx]
+
+        for neighbor_idx, cost in forfeit_neighbors[item_idx]:
+            penalty_with_solution[neighbor_idx] = penalty_with_solution.get(neighbor_idx, 0) + cost
+            if neighbor_idx in current_metric:
+                metric = _penalized_ratio(profits[neighbor_idx] - penalty_with_solution[neighbor_idx],
+                                          weights[neighbor_idx])
+                current_metric[neighbor_idx] = metric
+                heapq.heappush(heap, (-metric, neighbor_idx))
+
+    return current_weight
+
+def penalty_aware_greedy_fill_state(state):
+    """
+    Versão de penalty_aware_greedy_fill sobre um SolutionState: escolhe os
+    mesmos itens, na mesma ordem, usando a penalidade com a solução já mantida
+    pelo estado, e os adiciona com state.add (objetivo atualizado por deltas).
+    Retorna o peso final.
+    """
+    profits = state.profits
+    weights = state.weights
+    capacity = state.capacity
+    penalty_with_solution = state.penalty_with_solution
+    in_solution = state.in_solution
+    candidates = [item_idx for item_idx in range(len(in_solution)) if not in_solution[item_idx]]
+
+    if any(weights[item_idx] < 0 for item_idx in candidates):
+        # Com pesos negativos usa o preenchimento por listas (busca completa)
+        solution_list = list(state.items)
+        penalty_aware_greedy_fill(solution_list, set(candidates), state.total_weight, capacity,
+                                  profits, weights, state.forfeit_costs_matrix, state.neighbors)
+        for item_idx in solution_list[len(state.items):]:
+            state.add(item_idx)
+        return state.total_weight
+
+    current_metric = {}
+    heap = []
+    for item_idx in candidates:
+        metric = _penalized_ratio(profits[item_idx] - penalty_with_solution[item_idx], weights[item_idx])
+        current_metric[item_idx] = metric
+        heap.append((-metric, item_idx))
+    heapq.heapify(heap)
+
+    while heap:
+        neg_metric, item_idx = heapq.heappop(heap)
+        if current_metric.get(item_idx) != -neg_metric:
+            continue  # Entrada desatualizada ou item já adicionado/descartado
+        if state.total_weight + weights[item_idx] > capacity:
+            del current_metric[item_idx]  # Nunca mais caberá
+            continue
+        if -neg_metric < 0:
+            break  # Melhor métrica negativa: não adiciona
+
+        state.add(item_idx)
+        del current_metric[item_idx]
+
+        for neighbor_idx, _ in state.neighbors[item_idx]:
+            if neighbor_idx in current_metric:
+                metric = _penalized_ratio(profits[neighbor_idx] - penalty_with_solution[neighbor_idx],
+                                          weights[neighbor_idx])
+                current_metric[neighbor_idx] = metric
+                heapq.heappush(heap, (-metric, neighbor_idx))
+
+    return state.total_weight